@@ -0,0 +1,233 @@
+# --- APIクライアントプールとレート制御 ---
+# APIキーごとにクライアントをプロセス全体で1つだけ作り、全セッション・ワーカースレッドで共有する。
+# プロバイダ/モデルごとのトークンバケットで送信ペースを抑え、429や一時的な5xxは
+# Retry-After を尊重しつつジッター付きの指数バックオフで再試行する。
+# openai / google.generativeai は読み込みに時間がかかるため、最初にクライアントを作るときに読み込む。
+
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+MAX_RETRIES = int(os.getenv("MANGA_PRO_MAX_RETRIES", "5"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# プロバイダごとの毎分リクエスト数の上限（契約プランに合わせて環境変数で変更する）
+RATE_LIMITS_PER_MINUTE = {
+    "openai": int(os.getenv("MANGA_PRO_OPENAI_RPM", "60")),
+    "gemini": int(os.getenv("MANGA_PRO_GEMINI_RPM", "60")),
+    "mock": int(os.getenv("MANGA_PRO_MOCK_RPM", "60000")),
+}
+
+_lock = threading.Lock()
+_openai_clients = {}
+_gemini_models = {}
+_rate_limiters = {}
+
+
+def _key_digest(api_key):
+    # APIキーそのものを辞書のキーとして持ち回らない
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+# --- クライアントプール ---
+def get_openai_client(api_key):
+    import openai
+
+    with _lock:
+        key = _key_digest(api_key)
+        if key not in _openai_clients:
+            # 再試行はこのモジュールで行うため、SDK側の自動再試行は無効にする
+            _openai_clients[key] = openai.OpenAI(api_key=api_key, max_retries=0)
+        return _openai_clients[key]
+
+
+# --- Gemini SDK の互換シム ---
+# 内部APIでキーごとのクライアントを作れることを確かめた SDK のバージョン（requirements.txt の範囲と合わせる）
+GEMINI_PER_KEY_CLIENT_VERSIONS = ("0.8.",)
+
+
+def _gemini_per_key_client(api_key):
+    """api_key 専用の生成用クライアント。使える SDK でなければ None
+
+    google.generativeai の公開APIはプロセス全体の genai.configure しかなく、GenerativeModel は最初の呼び出し時に
+    その時点の設定のクライアントを掴むため、別のキーのセッションが同時に使うと混ざる。確かめたバージョンでは
+    内部の _ClientManager でキーごとのクライアントを作る。それ以外のバージョンでは内部APIに触れず None を返す
+    """
+    import google.generativeai as genai
+    from google.generativeai import client as genai_client
+
+    if not genai.__version__.startswith(GEMINI_PER_KEY_CLIENT_VERSIONS) or not hasattr(genai_client, "_ClientManager"):
+        return None
+    manager = genai_client._ClientManager()
+    manager.configure(api_key=api_key)
+    return manager.get_default_client("generative")
+
+
+def get_gemini_model(api_key, model_id):
+    import google.generativeai as genai
+
+    with _lock:
+        key = (_key_digest(api_key), model_id)
+        if key not in _gemini_models:
+            client = _gemini_per_key_client(api_key)
+            if client is None:
+                # 公開APIだけで動かす。キーはプロセス全体の設定になるので、同時に別のキーを使うと混ざることがある
+                genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(model_id)
+            if client is not None:
+                model._client = client
+            _gemini_models[key] = model
+        return _gemini_models[key]
+
+
+# --- レート制御 ---
+class TokenBucket:
+    """毎分 rate_per_minute 回のペースで呼び出しを許可する。短時間のバーストは capacity 回まで"""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, rate_per_minute // 6)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        # 429を受けたら、同じバケットを使う他のスレッド・セッションもまとめて待たせる
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 1.0) - seconds * self.rate
+
+
+def get_rate_limiter(provider, model):
+    with _lock:
+        key = (provider, model)
+        if key not in _rate_limiters:
+            _rate_limiters[key] = TokenBucket(RATE_LIMITS_PER_MINUTE.get(provider, 60))
+        return _rate_limiters[key]
+
+
+# --- 再試行 ---
+# SDKがまだ読み込まれていなければ、そのSDKの例外が起きることもない
+def _openai_module():
+    return sys.modules.get("openai")
+
+
+def _google_exceptions():
+    return sys.modules.get("google.api_core.exceptions")
+
+
+def _status_code(error):
+    openai, google_exceptions = _openai_module(), _google_exceptions()
+    if openai and isinstance(error, openai.APIStatusError):
+        return error.status_code
+    if google_exceptions and isinstance(error, google_exceptions.GoogleAPICallError):
+        return error.code
+    # その他（モックバックエンドなど）は status_code 属性があれば使う
+    return getattr(error, "status_code", None)
+
+
+def _retry_after(error):
+    """サーバーが指定した待ち時間（秒）。指定がなければ None"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(headers["retry-after"]).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    # Gemini は RetryInfo をエラー詳細に含めることがある
+    for detail in getattr(error, "details", None) or []:
+        retry_delay = getattr(detail, "retry_delay", None)
+        if retry_delay is not None:
+            return retry_delay.seconds + retry_delay.nanos / 1e9
+    return None
+
+
+def is_rate_limited(error):
+    return _status_code(error) == 429
+
+
+def retry_delay(error, attempt):
+    """再試行までの待ち時間（秒）。再試行すべきでないエラーなら None"""
+    openai, google_exceptions = _openai_module(), _google_exceptions()
+    retryable = (
+        (openai is not None and isinstance(error, openai.APIConnectionError))
+        or (google_exceptions is not None and isinstance(error, google_exceptions.RetryError))
+        or _status_code(error) in RETRYABLE_STATUS_CODES
+    )
+    if not retryable:
+        return None
+    backoff = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+    server_delay = _retry_after(error)
+    if server_delay is not None:
+        return min(BACKOFF_MAX_SECONDS, server_delay) + random.uniform(0, BACKOFF_BASE_SECONDS)
+    return backoff
+
+
+def _handle_failure(limiter, error, attempt, max_retries):
+    delay = retry_delay(error, attempt)
+    if delay is None or attempt >= max_retries:
+        raise error
+    if is_rate_limited(error):
+        # 待ち時間はバケット側に持たせ、次の acquire で自分も含めて待つ
+        limiter.pause(delay)
+    else:
+        time.sleep(delay)
+
+
+def call_with_retry(provider, model, fn, max_retries=MAX_RETRIES):
+    """レート制御の下で fn() を呼び、一時的なエラーはバックオフして再試行する"""
+    limiter = get_rate_limiter(provider, model)
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        try:
+            return fn()
+        except Exception as e:
+            _handle_failure(limiter, e, attempt, max_retries)
+
+
+def stream_with_retry(provider, model, fn, max_retries=MAX_RETRIES):
+    """call_with_retry のストリーミング版。fn() はチャンクを返すイテラブル。
+
+    最初のチャンクを受け取る前のエラーだけを再試行する（途中まで表示した応答を重複させない）。
+    """
+    limiter = get_rate_limiter(provider, model)
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        produced = False
+        try:
+            for chunk in fn():
+                produced = True
+                yield chunk
+            return
+        except Exception as e:
+            if produced:
+                raise
+            _handle_failure(limiter, e, attempt, max_retries)
@@ -0,0 +1,167 @@
+# --- AI呼び出しエンジン ---
+# manga_pro_app.py から利用される、Streamlitに依存しないモデル呼び出し処理。
+# ワーカースレッドからも安全に呼べるよう、st.session_state や st.error には触れない。
+
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import ai_cache
+import ai_clients
+import ai_providers
+
+# 生成パラメータ（応答キャッシュのキーにも含める）
+GENERATION_CONFIG = {"temperature": 0.7, "max_tokens": 4000}
+
+# ページ別評価の同時実行数（UIのスライダー初期値と上限）
+DEFAULT_PAGE_CONCURRENCY = 4
+MAX_PAGE_CONCURRENCY = 16
+
+
+# ページのバッチ評価: 1ページの評価に見込む出力トークン数と、1リクエストのページ数の上限
+PAGE_BATCH_OUTPUT_TOKENS = 700
+MAX_PAGE_BATCH_SIZE = 8
+# プロンプト本文に見込む入力トークン数（バッチ評価の上限計算用）
+PROMPT_TOKEN_BUDGET = 2000
+
+
+class AIConfigError(Exception):
+    """APIキー未設定やサポート外モデルなど、呼び出し前に判明する設定エラー"""
+
+
+def generate(model, prompt_text, images=None, providers=None,
+             prompt_key=None, cache=None, read_cache=True):
+    """整形済みプロンプトと画像をモデルに送り、応答テキストを返す。失敗時は例外を送出する。
+
+    images は data(バイト列) と mime_type を持つ画像（page_store.PageImage）のリスト。
+    providers は ai_providers.build_providers で作る {プロバイダ名: Provider}。
+
+    cache を渡すと同一入力の応答を再利用する。read_cache=False のときは
+    キャッシュを読まずに呼び出し、結果だけを保存し直す（再生成用）。
+    """
+    key = None
+    if cache is not None:
+        key = ai_cache.make_key(prompt_key, prompt_text, model, images, GENERATION_CONFIG)
+        if read_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+    response_text = _call_model(model, prompt_text, images, providers)
+    if cache is not None and response_text:
+        cache.put(key, response_text, model)
+    return response_text
+
+
+def stream_generate(model, prompt_text, images=None, providers=None,
+                    prompt_key=None, cache=None, read_cache=True):
+    """generate のストリーミング版。応答テキストを届いた順にチャンクで返すジェネレータ。
+
+    キャッシュヒット時は保存済みの全文を1チャンクで返す。途中で打ち切られた応答は保存しない。
+    """
+    key = None
+    if cache is not None:
+        key = ai_cache.make_key(prompt_key, prompt_text, model, images, GENERATION_CONFIG)
+        if read_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+    chunks = []
+    for chunk in _stream_model(model, prompt_text, images, providers):
+        chunks.append(chunk)
+        yield chunk
+    response_text = "".join(chunks)
+    if cache is not None and response_text:
+        cache.put(key, response_text, model)
+
+
+def resolve_provider(model, providers):
+    """モデル名に対応するプロバイダを返す。未設定やサポート外なら AIConfigError"""
+    provider_name = ai_providers.route_model(model)
+    if provider_name is None:
+        raise AIConfigError(f"サポートされていないモデルです: {model}")
+    provider = (providers or {}).get(provider_name)
+    if provider is None:
+        raise AIConfigError(ai_providers.MISSING_PROVIDER_MESSAGES[provider_name])
+    return provider
+
+
+def _call_model(model, prompt_text, images, providers):
+    # レート制御と、429・一時的な5xxの再試行は ai_clients が受け持つ
+    provider = resolve_provider(model, providers)
+    return ai_clients.call_with_retry(
+        provider.name, model, lambda: provider.generate(model, prompt_text, images, GENERATION_CONFIG)
+    )
+
+
+def _stream_model(model, prompt_text, images, providers):
+    provider = resolve_provider(model, providers)
+    return ai_clients.stream_with_retry(
+        provider.name, model, lambda: provider.stream(model, prompt_text, images, GENERATION_CONFIG)
+    )
+
+
+def evaluate_concurrently(jobs, worker, max_workers=DEFAULT_PAGE_CONCURRENCY):
+    """jobs ({キー: workerへのキーワード引数}) を最大 max_workers 並列で実行し、
+    完了した順に (キー, 結果, 例外) を返すジェネレータ。
+
+    途中でイテレーションが打ち切られた場合（Streamlitの再実行など）は、
+    まだ開始していないジョブをキャンセルして呼び出し元をブロックしない。
+    """
+    if not jobs:
+        return
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))), thread_name_prefix="page_eval")
+    try:
+        futures = {executor.submit(worker, **kwargs): key for key, kwargs in jobs.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                yield key, future.result(), None
+            except Exception as e:
+                yield key, None, e
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def max_page_batch_size(model):
+    """モデルの画像枚数・コンテキスト長・出力長の上限から、1回のバッチ評価に含められるページ数を求める"""
+    limits = ai_providers.MODEL_LIMITS.get(ai_providers.route_model(model))
+    if not limits:
+        return 1
+    by_output = limits["max_output_tokens"] // PAGE_BATCH_OUTPUT_TOKENS
+    by_context = (limits["context_tokens"] - limits["max_output_tokens"] - PROMPT_TOKEN_BUDGET) // limits["tokens_per_image"]
+    return max(1, min(MAX_PAGE_BATCH_SIZE, limits["max_images"], by_output, by_context))
+
+
+def parse_page_batch(response_text, page_numbers):
+    """バッチ評価の応答（ページごとのJSON）を {ページ番号: 評価テキスト} に分ける。
+
+    コードブロックで囲まれていても読み取る。読み取れなかったページや対象外のページは含めない。
+    """
+    if not response_text:
+        return {}
+    # 前置きやコードブロックの開始行は読み飛ばし、最初の { または [ からJSONを1つ読む
+    # （評価本文の中にもコードブロックがあり得るため、閉じのフェンスは探さない）
+    text = response_text
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return {}
+    try:
+        data, _ = json.JSONDecoder().raw_decode(text[min(starts):])
+    except ValueError:
+        return {}
+    entries = data.get("pages", []) if isinstance(data, dict) else data
+    results = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            page_number = int(entry.get("page_number"))
+        except (TypeError, ValueError):
+            continue
+        evaluation = entry.get("evaluation")
+        if page_number in page_numbers and isinstance(evaluation, str) and evaluation.strip():
+            # 点数は1ページ単位の評価と同じく、本文末尾のJSONブロックとして付ける
+            if isinstance(entry.get("scores"), dict):
+                evaluation = f"{evaluation.rstrip()}\n\n```json\n{json.dumps({'scores': entry['scores']}, ensure_ascii=False)}\n```"
+            results[page_number] = evaluation
+    return results
@@ -0,0 +1,229 @@
+# --- AIプロバイダ ---
+# モデル呼び出しの実装をプロバイダごとのアダプタに分ける。ai_engine はモデル名から
+# プロバイダを選び、レート制御・再試行・キャッシュを共通で適用する。
+# MockProvider は外部APIを呼ばずに決まった応答を返すローカルのスタブで、
+# オフラインでの動作確認とベンチマーク (benchmarks/) に使う。
+
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+
+SYSTEM_MESSAGE = "あなたは漫画制作のプロフェッショナルアシスタントです。"
+
+GEMINI_SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+]
+
+# モデル名に含まれる文字列 → プロバイダ名。上から順に判定する
+MODEL_ROUTES = [("gpt", "openai"), ("gemini", "gemini"), ("mock", "mock")]
+MISSING_PROVIDER_MESSAGES = {
+    "openai": "OpenAI APIキーが設定されていないか、無効です。",
+    "gemini": "Google APIキーが設定されていないか、無効です。",
+    "mock": "モックバックエンドが有効になっていません (MANGA_PRO_MOCK_BACKEND=1)。",
+}
+
+# プロバイダごとの1リクエストの上限（画像枚数・コンテキスト長・出力長）と、画像1枚の入力トークンの目安。
+# ページのバッチ評価で1回に送るページ数の決定に使う
+MODEL_LIMITS = {
+    "openai": {"max_images": 10, "context_tokens": 128000, "max_output_tokens": 4000, "tokens_per_image": 1100},
+    "gemini": {"max_images": 16, "context_tokens": 1000000, "max_output_tokens": 8192, "tokens_per_image": 258},
+    "mock": {"max_images": 16, "context_tokens": 128000, "max_output_tokens": 8192, "tokens_per_image": 258},
+}
+
+# モックバックエンド（環境変数で有効化・調整する）
+MOCK_BACKEND_ENABLED = os.getenv("MANGA_PRO_MOCK_BACKEND", "") == "1"
+MOCK_MODEL_ID = "mock-editor"
+MOCK_LATENCY_SECONDS = float(os.getenv("MANGA_PRO_MOCK_LATENCY", "0.5"))
+MOCK_LATENCY_PER_IMAGE_SECONDS = float(os.getenv("MANGA_PRO_MOCK_LATENCY_PER_IMAGE", "0.1"))
+MOCK_FAILURE_RATE = float(os.getenv("MANGA_PRO_MOCK_FAILURE_RATE", "0"))
+# 再試行の回数を覚えておく入力の数の上限（成功した入力はその場で忘れる）
+MOCK_TRACKED_ATTEMPTS = 1024
+
+
+def route_model(model):
+    """モデル名に対応するプロバイダ名。対応がなければ None"""
+    for marker, provider_name in MODEL_ROUTES:
+        if marker in model.lower():
+            return provider_name
+    return None
+
+
+class Provider:
+    """プロバイダの共通インターフェース。images は data と mime_type を持つ画像のリスト"""
+    name = None
+
+    def generate(self, model, prompt_text, images, generation_config):
+        raise NotImplementedError
+
+    def stream(self, model, prompt_text, images, generation_config):
+        # ストリーミングに対応しないプロバイダは全文を1チャンクで返す
+        yield self.generate(model, prompt_text, images, generation_config)
+
+
+class OpenAIProvider(Provider):
+    name = "openai"
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _messages(prompt_text, images):
+        user_messages = [{"type": "text", "text": prompt_text}]
+        for i, image in enumerate(images or []):
+            # OpenAIはdata URLでしか受け付けないため、ここで初めてbase64にする
+            image_b64 = base64.b64encode(image.data).decode("utf-8")
+            user_messages.append({"type": "text", "text": f"これは{i+1}ページ目の画像です。"})
+            user_messages.append({"type": "image_url", "image_url": {"url": f"data:{image.mime_type};base64,{image_b64}"}})
+        return [{"role": "system", "content": SYSTEM_MESSAGE}, {"role": "user", "content": user_messages}]
+
+    def _create(self, model, prompt_text, images, generation_config, **kwargs):
+        return self.client.chat.completions.create(
+            model=model, messages=self._messages(prompt_text, images),
+            temperature=generation_config["temperature"], max_tokens=generation_config["max_tokens"], **kwargs
+        )
+
+    def generate(self, model, prompt_text, images, generation_config):
+        return self._create(model, prompt_text, images, generation_config).choices[0].message.content
+
+    def stream(self, model, prompt_text, images, generation_config):
+        for chunk in self._create(model, prompt_text, images, generation_config, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+
+    def __init__(self, gemini_model):
+        # Gemini はモデルごとにオブジェクトを持つため、セッションで選ばれたモデルを使う
+        self.gemini_model = gemini_model
+
+    @staticmethod
+    def _contents(prompt_text, images):
+        # Geminiには画像のバイト列をMIMEタイプ付きのインラインデータとしてそのまま渡す
+        request_contents = [prompt_text]
+        for i, image in enumerate(images or []):
+            request_contents.append(f"これは{i+1}ページ目の画像です。")
+            request_contents.append({"mime_type": image.mime_type, "data": image.data})
+        return request_contents
+
+    def _generate_content(self, prompt_text, images, generation_config, **kwargs):
+        return self.gemini_model.generate_content(
+            self._contents(prompt_text, images),
+            safety_settings=GEMINI_SAFETY_SETTINGS, generation_config={"temperature": generation_config["temperature"]}, **kwargs
+        )
+
+    def generate(self, model, prompt_text, images, generation_config):
+        return self._generate_content(prompt_text, images, generation_config).text
+
+    def stream(self, model, prompt_text, images, generation_config):
+        response = self._generate_content(prompt_text, images, generation_config, stream=True)
+        produced = False
+        for chunk in response:
+            # 最終チャンクは終了理由のみでテキストを持たないことがある
+            if chunk.parts:
+                produced = True
+                yield chunk.text
+        if not produced:
+            raise ValueError(f"Geminiから応答テキストが返されませんでした: {response.prompt_feedback}")
+
+
+class MockServiceError(Exception):
+    """モックが模擬する一時的なサーバーエラー（ai_clients の再試行対象）"""
+
+    def __init__(self, status_code=503):
+        super().__init__(f"mock backend error {status_code}")
+        self.status_code = status_code
+
+
+class MockProvider(Provider):
+    """外部APIを呼ばない決定的なスタブ。
+
+    応答と失敗の有無は入力（プロンプトと画像）と seed、その入力が成功するまでの何回目の呼び出しかで決まる。待ち時間は
+    latency + 画像枚数 × latency_per_image 秒。failure_rate の割合で MockServiceError を送出する。
+    """
+    name = "mock"
+
+    def __init__(self, latency=MOCK_LATENCY_SECONDS, latency_per_image=MOCK_LATENCY_PER_IMAGE_SECONDS,
+                 failure_rate=MOCK_FAILURE_RATE, seed=0, chunk_count=8):
+        self.latency = latency
+        self.latency_per_image = latency_per_image
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.chunk_count = chunk_count
+        self._attempts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, prompt_text, images):
+        h = hashlib.sha256(f"{self.seed}:{prompt_text}".encode("utf-8"))
+        for image in images or []:
+            h.update(image.data)
+        return h.hexdigest()
+
+    def _respond(self, prompt_text, images):
+        digest = self._digest(prompt_text, images)
+        # 同じ入力の n 回目の呼び出しは毎回同じ結果になる（再試行すれば成功することもある）。
+        # 回数は失敗が続いている入力の分だけを古い順に上限まで持つ
+        with self._lock:
+            attempt = self._attempts.pop(digest, 0)
+            self._attempts[digest] = attempt + 1
+            if len(self._attempts) > MOCK_TRACKED_ATTEMPTS:
+                self._attempts.popitem(last=False)
+        rng = random.Random(f"{digest}:{attempt}")
+        time.sleep(self.latency + self.latency_per_image * len(images or []))
+        if rng.random() < self.failure_rate:
+            raise MockServiceError(rng.choice([429, 500, 503]))
+        with self._lock:
+            self._attempts.pop(digest, None)
+        batch_pages = re.search(r"対象ページ: ([\d, ]+)", prompt_text)
+        if batch_pages:
+            # バッチ評価のプロンプトにはページごとのJSONで答える
+            return json.dumps({"pages": [
+                {"page_number": int(page), "evaluation": self._review(rng, digest, prompt_text, images[i:i + 1] if images else [])}
+                for i, page in enumerate(batch_pages.group(1).replace(" ", "").split(","))
+            ]}, ensure_ascii=False)
+        return self._review(rng, digest, prompt_text, images)
+
+    @staticmethod
+    def _review(rng, digest, prompt_text, images):
+        stars = rng.randint(1, 5)
+        return (
+            f"1. **総合評価** {'★' * stars}{'☆' * (5 - stars)}\n"
+            f"2. **良い点・優れている点**\nモック応答 {digest[:12]}（画像 {len(images or [])}枚, プロンプト {len(prompt_text)}文字）\n"
+            "3. **改善すべき点**\nモック応答のため具体的な指摘はありません。\n"
+            "4. **具体的な改善提案**\n実際のモデルに切り替えて評価してください。\n"
+            "5. **総括とアドバイス**\nこれはローカルのモックバックエンドによる応答です。\n"
+            f"\n```json\n{json.dumps({'overall': stars})}\n```\n"
+        )
+
+    def generate(self, model, prompt_text, images, generation_config):
+        return self._respond(prompt_text, images)
+
+    def stream(self, model, prompt_text, images, generation_config):
+        text = self._respond(prompt_text, images)
+        size = max(1, len(text) // self.chunk_count)
+        for start in range(0, len(text), size):
+            yield text[start:start + size]
+
+
+def build_providers(openai_client=None, gemini_model=None, mock=None):
+    """利用可能なプロバイダを {プロバイダ名: Provider} で返す。mock=None のときは環境変数に従う"""
+    providers = {}
+    if openai_client:
+        providers["openai"] = OpenAIProvider(openai_client)
+    if gemini_model:
+        providers["gemini"] = GeminiProvider(gemini_model)
+    if mock is None and MOCK_BACKEND_ENABLED:
+        mock = MockProvider()
+    if mock:
+        providers["mock"] = mock
+    return providers
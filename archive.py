@@ -0,0 +1,129 @@
+# --- データのアーカイブ ---
+# スタジオのデータを zip にまとめて書き出し・読み込みする。レコードはセクションごとの NDJSON（1行1件）、
+# 評価対象のページ画像は pages/<ページID> に元のバイナリのまま入れる（base64 にしない）。
+# 書き出しはストアのカーソルから1件ずつ、画像も1枚ずつ書き込むので、データ全体をメモリに載せない。
+# 読み込みも NDJSON を1行ずつ読み、storage に1つのトランザクションで書き込む。
+#
+#   python archive.py export backup.zip
+#   python archive.py import backup.zip
+
+import argparse
+import io
+import json
+import tempfile
+import zipfile
+from datetime import datetime
+
+import page_store
+import storage
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+PAGES_DIR = "pages/"
+# セクション → エクスポート画面の表示名
+SECTION_LABELS = {
+    "projects": "プロジェクト", "tasks": "タスク一覧", "characters": "キャラクター",
+    "world_settings": "世界観設定", "idea_bank": "アイデアバンク", "evaluations": "評価履歴",
+}
+
+
+class ArchiveError(ValueError):
+    """読み込めないアーカイブ（形式のバージョンが新しい、ページIDと内容が一致しないなど）"""
+
+
+def _section_member(section):
+    return f"{section}.ndjson"
+
+
+def write_archive(fileobj, sections=storage.RECORD_SECTIONS, include_pages=True):
+    """fileobj に zip を書き出し、マニフェスト（件数など）を返す"""
+    counts = {section: 0 for section in storage.RECORD_SECTIONS if section in sections}
+    # 画像は評価を書き終えてから1枚ずつ入れる。ここで持つのはページIDだけ
+    page_ids = set()
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        current, member = None, None
+        for section, record in storage.get_store().export_records(sections):
+            if section != current:
+                if member is not None:
+                    member.close()
+                current, member = section, zf.open(_section_member(section), "w", force_zip64=True)
+            member.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            counts[section] += 1
+            if section == "evaluations":
+                page_ids.update(record.get("page_ids", []))
+        if member is not None:
+            member.close()
+        pages = 0
+        if include_pages:
+            for page_id in sorted(page_ids):
+                if page_store.has_page(page_id):
+                    # 画像は圧縮済みの形式なので、zip 側では圧縮しない
+                    zf.writestr(PAGES_DIR + page_id, page_store.get_page_bytes(page_id), compress_type=zipfile.ZIP_STORED)
+                    pages += 1
+        manifest = {"format_version": FORMAT_VERSION, "exported_at": datetime.now().isoformat(), "counts": counts, "pages": pages}
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+    return manifest
+
+
+def archive_file(sections=storage.RECORD_SECTIONS, include_pages=True):
+    """一時ファイルに書き出したアーカイブを先頭に戻して返す（ダウンロードボタンの data に渡す）"""
+    f = tempfile.TemporaryFile()
+    write_archive(f, sections, include_pages)
+    f.seek(0)
+    return f
+
+
+def _iter_records(zf):
+    names = set(zf.namelist())
+    for section in storage.RECORD_SECTIONS:
+        if _section_member(section) not in names:
+            continue
+        with zf.open(_section_member(section)) as raw:
+            for line in io.TextIOWrapper(raw, encoding="utf-8"):
+                if line.strip():
+                    yield section, json.loads(line)
+
+
+def read_archive(fileobj):
+    """write_archive で書き出した zip を読み込み、(セクションごとの件数, ページ数) を返す"""
+    with zipfile.ZipFile(fileobj) as zf:
+        names = zf.namelist()
+        if MANIFEST_NAME in names:
+            manifest = json.loads(zf.read(MANIFEST_NAME))
+            if manifest.get("format_version", FORMAT_VERSION) > FORMAT_VERSION:
+                raise ArchiveError(f"新しい形式のアーカイブです (形式 {manifest['format_version']})。アプリを更新してください。")
+        # 評価がページを参照するため、画像を先に戻す
+        pages = 0
+        for name in names:
+            if name.startswith(PAGES_DIR) and not name.endswith("/"):
+                page_id = name[len(PAGES_DIR):]
+                if page_store.put_page(zf.read(name)) != page_id:
+                    raise ArchiveError(f"ページ画像 {page_id} の内容がIDと一致しません。")
+                pages += 1
+        counts = storage.get_store().import_records(_iter_records(zf))
+    return counts, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スタジオのデータを zip に書き出す・zip から読み込む")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="データを zip に書き出す")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--sections", default=",".join(storage.RECORD_SECTIONS), help="書き出すセクション（カンマ区切り）")
+    export_parser.add_argument("--no-pages", action="store_true", help="ページ画像を含めない")
+    import_parser = subparsers.add_parser("import", help="zip からデータを読み込む")
+    import_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        with open(args.path, "wb") as f:
+            manifest = write_archive(f, args.sections.split(","), include_pages=not args.no_pages)
+        print(json.dumps(manifest, ensure_ascii=False, indent=2))
+    else:
+        with open(args.path, "rb") as f:
+            counts, pages = read_archive(f)
+        print(json.dumps({"counts": counts, "pages": pages}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# --- AI呼び出しフローのベンチマーク ---
+# モックバックエンド (ai_providers.MockProvider) を使い、外部APIを呼ばずに
+# 原稿評価・アイデア生成・シナリオ生成の各フローの待ち時間・スループット・メモリを計測する。
+#
+#   python benchmarks/bench_ai_flows.py
+#   python benchmarks/bench_ai_flows.py --pages 10,30 --concurrency 1,4,8 --latency 0.5 --failure-rate 0.05
+#
+# 評価フローはページ数 × 同時実行数ごとに、1ページずつの評価とバッチ評価を比較する。
+# アイデア・シナリオは同時実行数ごとに計測する。p50/p95 はAPIへの1リクエストあたりの所要時間。
+
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# ページ画像や派生画像は一時ディレクトリに書き出す（実データのストアを汚さない）
+_workdir = tempfile.mkdtemp(prefix="manga_pro_bench_")
+os.environ.setdefault("MANGA_PRO_DATA_DIR", os.path.join(_workdir, "data"))
+os.environ.setdefault("MANGA_PRO_CACHE_DIR", os.path.join(_workdir, "cache"))
+
+from PIL import Image  # noqa: E402
+
+import ai_engine  # noqa: E402
+import ai_providers  # noqa: E402
+import evaluation  # noqa: E402
+import page_store  # noqa: E402
+from prompts import build_prompt  # noqa: E402
+
+MODEL = ai_providers.MOCK_MODEL_ID
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_pages(count, seed):
+    # 実際のスキャン画像に近いサイズになるよう、ノイズ入りのB5相当(1.5倍描画)の画像を作る
+    rng = random.Random(seed)
+    page_ids = []
+    for i in range(count):
+        img = Image.effect_noise((1063, 1512), 40 + rng.randint(0, 20)).convert("RGB")
+        buf = io.BytesIO()
+        img.save(buf, "PNG")
+        page_ids.append(page_store.put_page(buf.getvalue()))
+    return page_ids
+
+
+class RecordingMock(ai_providers.MockProvider):
+    """呼び出しごとの所要時間と送信したプロンプトの文字数を記録するモック"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.reset()
+
+    def reset(self):
+        self.latencies, self.prompt_chars, self.images = [], 0, 0
+
+    def generate(self, model, prompt_text, images, generation_config):
+        started = time.perf_counter()
+        try:
+            return super().generate(model, prompt_text, images, generation_config)
+        finally:
+            with self._lock:
+                self.latencies.append(time.perf_counter() - started)
+                self.prompt_chars += len(prompt_text)
+                self.images += len(images or [])
+
+
+def count_failures(results):
+    return sum(1 for _, _, error in results if error)
+
+
+def page_evaluation_flow(providers, page_ids, concurrency, batch_size):
+    return count_failures(evaluation.iter_page_evaluations(
+        MODEL, page_ids, list(range(len(page_ids))),
+        evaluation.page_prompt_args(["コマ割りのリズムと視線誘導"], ""), {},
+        {"providers": providers}, concurrency, batch_size
+    ))
+
+
+def text_flow(providers, prompt_key, prompt_args, requests, concurrency):
+    # 同時に操作している複数のユーザーを想定し、入力を少しずつ変えた呼び出しを並列に送る
+    def worker(prompt_text):
+        return ai_engine.generate(MODEL, prompt_text, providers=providers)
+
+    call_jobs = {i: {"prompt_text": build_prompt(prompt_key, **{k: f"{v} #{i}" for k, v in prompt_args.items()})} for i in range(requests)}
+    return count_failures(ai_engine.evaluate_concurrently(call_jobs, worker, max_workers=concurrency))
+
+
+def measure(mock, name, params, fn):
+    mock.reset()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    failures = fn()
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    return {
+        "flow": name, **params, "requests": len(mock.latencies), "failures": failures,
+        "p50_s": percentile(mock.latencies, 50), "p95_s": percentile(mock.latencies, 95),
+        "wall_s": wall, "req_per_s": (len(mock.latencies) / wall) if wall else 0.0,
+        "prompt_kchars": mock.prompt_chars / 1000, "peak_traced_mb": peak / 1024 / 1024,
+    }
+
+
+def print_table(rows):
+    columns = ["flow", "pages", "concurrency", "batch", "requests", "failures", "p50_s", "p95_s", "wall_s", "req_per_s", "prompt_kchars", "peak_traced_mb"]
+    print(" ".join(f"{c:>14}" for c in columns))
+    for row in rows:
+        cells = []
+        for c in columns:
+            value = row.get(c, "-")
+            cells.append(f"{value:>14.3f}" if isinstance(value, float) else f"{value!s:>14}")
+        print(" ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="モックバックエンドでAI呼び出しフローを計測する")
+    parser.add_argument("--pages", default="1,10,30", help="評価フローのページ数（カンマ区切り）")
+    parser.add_argument("--concurrency", default="1,4,8", help="同時実行数（カンマ区切り）")
+    parser.add_argument("--requests", type=int, default=16, help="アイデア・シナリオフローの呼び出し回数")
+    parser.add_argument("--latency", type=float, default=0.2, help="モックの1呼び出しあたりの待ち時間(秒)")
+    parser.add_argument("--latency-per-image", type=float, default=0.02, help="モックの画像1枚あたりの追加待ち時間(秒)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="モックが一時エラーを返す割合")
+    parser.add_argument("--batch-size", type=int, default=0, help="バッチ評価の1リクエストあたりのページ数（0はモデルの上限から自動）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="結果をJSONで書き出すパス")
+    args = parser.parse_args()
+
+    page_counts = [int(p) for p in args.pages.split(",")]
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+    mock = RecordingMock(
+        latency=args.latency, latency_per_image=args.latency_per_image, failure_rate=args.failure_rate, seed=args.seed
+    )
+    providers = ai_providers.build_providers(mock=mock)
+    batch_size = args.batch_size or ai_engine.max_page_batch_size(MODEL)
+
+    pages = make_pages(max(page_counts), args.seed)
+    # 派生画像の生成を計測から外すため、先に一度作っておく
+    for page_id in pages:
+        page_store.get_model_image_part(page_id)
+
+    tracemalloc.start()
+    rows = []
+    for page_count in page_counts:
+        for concurrency in concurrencies:
+            for batch in sorted({1, min(batch_size, page_count)}):
+                rows.append(measure(mock, "page_evaluation", {"pages": page_count, "concurrency": concurrency, "batch": batch},
+                                    lambda: page_evaluation_flow(providers, pages[:page_count], concurrency, batch)))
+    for concurrency in concurrencies:
+        rows.append(measure(mock, "idea", {"concurrency": concurrency}, lambda: text_flow(
+            providers, "manga_master",
+            {"input_content": "ジャンル: ファンタジー, ターゲット: 少年向け", "requirements": "アイデアを3つ提案してください。"},
+            args.requests, concurrency)))
+        rows.append(measure(mock, "scenario", {"concurrency": concurrency}, lambda: text_flow(
+            providers, "scenario_writer",
+            {"scenario_base": "主人公が伝説の剣を発見するシーン", "scene_details": "洞窟の奥で緊張感のある対峙"},
+            args.requests, concurrency)))
+    tracemalloc.stop()
+
+    print_table(rows)
+    print(f"\nmax RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# --- 起動時間のベンチマーク ---
+# Streamlit の AppTest でアプリを実行し、コールドスタート（新しいプロセスでの最初の実行）と
+# メニューごとの初回表示・再表示にかかる時間、その時点で読み込まれている重いライブラリを計測する。
+#
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --repeat 5 --menus "🏠 ダッシュボード,👥 チーム管理"
+#
+# 各計測は別プロセスで行う（import のキャッシュが効かない状態から測るため）。値は repeat 回の中央値。
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 読み込みに時間がかかるライブラリ。初回表示の時点で読み込まれているかを記録する
+HEAVY_MODULES = ["pandas", "plotly.express", "openai", "google.generativeai", "fitz"]
+
+
+def measure_menu(menu):
+    """子プロセス側: ダッシュボードでの起動と menu の初回表示・再表示を計測して dict で返す"""
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, "manga_pro_app.py"), default_timeout=120)
+    at.run()
+    row = {"menu": menu, "cold_start": time.perf_counter() - started}
+    if menu != at.sidebar.radio[0].value:
+        started = time.perf_counter()
+        at.sidebar.radio[0].set_value(menu).run()
+        row["first_render"] = time.perf_counter() - started
+    else:
+        row["first_render"] = row["cold_start"]
+    started = time.perf_counter()
+    at.run()
+    row["rerun"] = time.perf_counter() - started
+    row["errors"] = [e.value for e in at.exception]
+    row["loaded"] = [name for name in HEAVY_MODULES if name in sys.modules]
+    return row
+
+
+def run_child(menu, workdir):
+    env = dict(os.environ, MANGA_PRO_DATA_DIR=os.path.join(workdir, "data"), MANGA_PRO_CACHE_DIR=os.path.join(workdir, "cache"))
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", menu],
+                            env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_table(rows):
+    print(f"{'menu':<24} {'cold_start':>11} {'first_render':>13} {'rerun':>9}  loaded")
+    for row in rows:
+        print(f"{row['menu']:<24} {row['cold_start']:>11.3f} {row['first_render']:>13.3f} {row['rerun']:>9.3f}  {', '.join(row['loaded']) or '-'}")
+        for error in row["errors"]:
+            print(f"  ⚠️ {error}")
+
+
+def main():
+    import screens
+
+    parser = argparse.ArgumentParser(description="アプリの起動時間とメニューごとの初回表示時間を計測する")
+    parser.add_argument("--menus", default=",".join(screens.MENUS), help="計測するメニュー（カンマ区切り）")
+    parser.add_argument("--repeat", type=int, default=3, help="メニューごとの計測回数（中央値を表示する）")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="結果をJSONで書き出すパス")
+    args = parser.parse_args()
+
+    if args.child:
+        import logging
+        logging.disable(logging.CRITICAL)
+        print(json.dumps(measure_menu(args.child), ensure_ascii=False))
+        return
+
+    rows = []
+    # 保存データは一時ディレクトリに置き、全メニューで共有する（初回のDB作成は最初の1回だけ計測に入る）
+    workdir = tempfile.mkdtemp(prefix="manga_pro_bench_")
+    for menu in args.menus.split(","):
+        runs = [run_child(menu, workdir) for _ in range(args.repeat)]
+        row = {key: statistics.median(run[key] for run in runs) for key in ("cold_start", "first_render", "rerun")}
+        row.update(menu=menu, loaded=runs[-1]["loaded"], errors=runs[-1]["errors"])
+        rows.append(row)
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# --- 締切インデックス ---
+# 未完了タスクの締切日を (プロジェクト, ステータス) ごとのソート済みリストで持ち、
+# 「期限超過」「N日以内」「直近N件」を二分探索で引けるようにする。
+# タスクの追加・変更・削除のたびに storage から差分で更新される。
+
+import heapq
+import itertools
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime, timedelta
+
+DONE_STATUS = "完了"
+
+
+def parse_end_date(value):
+    """'YYYY-MM-DD' を date にする。読めない値は None"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+class DeadlineIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (project_id, status) -> [(締切日の序数, task_id)]（昇順）
+        self._lists = {}
+        # task_id -> (リストのキー, ソートキー, 表示用の情報)
+        self._entries = {}
+
+    @classmethod
+    def from_tasks(cls, rows):
+        """(project_id, task) の組からまとめて作る"""
+        index = cls()
+        for project_id, task in rows:
+            index._insert(project_id, task)
+        for entries in index._lists.values():
+            entries.sort()
+        return index
+
+    # --- 更新 ---
+    def _insert(self, project_id, task, keep_sorted=False):
+        end_date = parse_end_date(task.get("end_date"))
+        status = task.get("status") or "未着手"
+        if end_date is None or status == DONE_STATUS:
+            return
+        list_key, sort_key = (project_id, status), (end_date.toordinal(), task["id"])
+        entry = {
+            "task_id": task["id"], "project_id": project_id, "task_name": task.get("task_name"),
+            "assignee": task.get("assignee"), "status": status, "end_date": end_date,
+        }
+        entries = self._lists.setdefault(list_key, [])
+        if keep_sorted:
+            insort(entries, sort_key)
+        else:
+            entries.append(sort_key)
+        self._entries[task["id"]] = (list_key, sort_key, entry)
+
+    def _remove(self, task_id):
+        found = self._entries.pop(task_id, None)
+        if found is None:
+            return
+        list_key, sort_key, _ = found
+        entries = self._lists[list_key]
+        del entries[bisect_left(entries, sort_key)]
+        if not entries:
+            del self._lists[list_key]
+
+    def upsert(self, project_id, task):
+        with self._lock:
+            self._remove(task["id"])
+            self._insert(project_id, task, keep_sorted=True)
+
+    def remove(self, task_id):
+        with self._lock:
+            self._remove(task_id)
+
+    def replace_project(self, project_id, tasks):
+        with self._lock:
+            for task_id in [task_id for task_id, (list_key, _, _) in self._entries.items() if list_key[0] == project_id]:
+                self._remove(task_id)
+            for task in tasks:
+                self._insert(project_id, task, keep_sorted=True)
+
+    # --- 検索 ---
+    def _ranges(self, start, end, project_id):
+        # 各リストで締切日が [start, end) に入る範囲（start/end が None なら端まで）
+        for (list_project_id, _), entries in self._lists.items():
+            if project_id is not None and list_project_id != project_id:
+                continue
+            lo = 0 if start is None else bisect_left(entries, (start.toordinal(),))
+            hi = len(entries) if end is None else bisect_left(entries, (end.toordinal(),))
+            if lo < hi:
+                yield entries, lo, hi
+
+    def count(self, start=None, end=None, project_id=None):
+        with self._lock:
+            return sum(hi - lo for _, lo, hi in self._ranges(start, end, project_id))
+
+    def between(self, start=None, end=None, project_id=None, limit=None):
+        """締切日が [start, end) の未完了タスクを締切の早い順に返す"""
+        with self._lock:
+            merged = heapq.merge(*(map(entries.__getitem__, range(lo, hi)) for entries, lo, hi in self._ranges(start, end, project_id)))
+            return [dict(self._entries[task_id][2]) for _, task_id in itertools.islice(merged, limit)]
+
+    def overdue(self, today=None, project_id=None):
+        return self.between(end=today or date.today(), project_id=project_id)
+
+    def due_within(self, days, today=None, project_id=None):
+        today = today or date.today()
+        return self.between(today, today + timedelta(days=days + 1), project_id)
+
+    def count_due_within(self, days, today=None, project_id=None):
+        today = today or date.today()
+        return self.count(today, today + timedelta(days=days + 1), project_id)
+
+    def next_deadlines(self, n, today=None, project_id=None):
+        return self.between(today or date.today(), project_id=project_id, limit=n)
@@ -0,0 +1,286 @@
+# --- 原稿評価の処理 ---
+# 全体評価・分割評価・ページ別評価のAI呼び出しと、バックグラウンドジョブとしての実行。
+# Streamlitに依存しないため、ワーカースレッドやベンチマークからもそのまま呼べる。
+
+import contextlib
+import functools
+
+import ai_engine
+import page_store
+import scores
+import storage
+from prompts import build_prompt
+
+
+# --- 評価の保存 ---
+def attach_scores(record):
+    """評価結果から点数を取り出して記録に付け、表示用の本文からは点数のJSONを取り除く"""
+    # 抽出済み（前回から再利用したページなど）はそのまま残す
+    if record.get("result") and "scores" not in record:
+        record["result"], record["scores"] = scores.extract_scores(record["result"])
+    for chunk_res in record.get("chunk_results", []):
+        chunk_res["result"], _ = scores.extract_scores(chunk_res["result"])
+    for page_res in record.get("page_results", []):
+        if "scores" not in page_res:
+            page_res["result"], page_res["scores"] = scores.extract_scores(page_res["result"])
+    return record
+
+def save_evaluation(record):
+    storage.get_store().save_evaluation(attach_scores(record))
+
+def backfill_scores(evaluations):
+    """点数の記録がない過去の評価から点数を抽出して保存し直す。更新した件数を返す"""
+    updated = 0
+    for record in evaluations:
+        if "scores" in record or any("scores" in page_res for page_res in record.get("page_results", [])):
+            continue
+        save_evaluation(record)
+        updated += 1
+    return updated
+
+
+def generate_for_pages(model, prompt_text, page_ids, image_options, **call_args):
+    # ワーカースレッド内で画像を読み込み、同時にメモリに載るページを同時実行数までに抑える
+    images = [page_store.get_model_image_part(page_id, **image_options) for page_id in page_ids]
+    return ai_engine.generate(model, prompt_text, images, **call_args)
+
+
+# --- 長い原稿の分割評価 (map-reduce) ---
+# テキストとページをパートに分け、各パートを manuscript_evaluator で並列に評価したあと、
+# 部分評価を manuscript_reducer で1つの評価に統合する。1回のリクエストに収まらない原稿向け。
+CHUNK_PAGES = 8
+CHUNK_TEXT_CHARS = 12000
+
+def split_text(text, max_chars=CHUNK_TEXT_CHARS):
+    # 段落（行）の区切りで max_chars 以下に分ける。1行が長すぎる場合だけ途中で切る
+    parts, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                parts.append(current); current = ""
+            parts.append(line[:max_chars]); line = line[max_chars:]
+        if len(current) + len(line) > max_chars:
+            parts.append(current); current = ""
+        current += line
+    if current.strip():
+        parts.append(current)
+    return [part for part in parts if part.strip()]
+
+def split_manuscript(text_content, page_ids, pages_per_chunk=CHUNK_PAGES, text_chars=CHUNK_TEXT_CHARS):
+    """原稿をパートのリストに分ける。各パートは label, text, page_ids, first_page (1始まり) を持つ"""
+    text_parts = split_text(text_content, text_chars) if text_content.strip() else []
+    chunks = [
+        {"label": f"テキスト {i+1}/{len(text_parts)}", "text": part, "page_ids": [], "first_page": None}
+        for i, part in enumerate(text_parts)
+    ]
+    for start in range(0, len(page_ids), pages_per_chunk):
+        chunk_page_ids = page_ids[start:start + pages_per_chunk]
+        chunks.append({"label": f"P.{start+1}-{start+len(chunk_page_ids)}", "text": "", "page_ids": chunk_page_ids, "first_page": start + 1})
+    return chunks
+
+def needs_chunking(text_content, page_ids):
+    return len(page_ids) > CHUNK_PAGES or len(text_content) > CHUNK_TEXT_CHARS
+
+def chunk_evaluation_jobs(chunks, prompt_args):
+    # evaluate_concurrently に渡すジョブ。パートの位置づけを特別な指示に追記する
+    chunk_jobs = {}
+    for i, chunk in enumerate(chunks):
+        note = f"これは長い原稿を{len(chunks)}パートに分けたうちの「{chunk['label']}」です。このパートの範囲で評価してください。"
+        if chunk["first_page"]:
+            note += f"画像の1ページ目は原稿全体のP.{chunk['first_page']}にあたります。ページに言及するときは原稿全体の通し番号を使ってください。"
+        args = dict(prompt_args, page_count=len(chunk["page_ids"]), special_instructions=f"{prompt_args.get('special_instructions') or ''}\n{note}".strip())
+        chunk_jobs[i] = {"prompt_text": build_prompt("manuscript_evaluator", chunk["text"], **args), "page_ids": chunk["page_ids"]}
+    return chunk_jobs
+
+def reducer_prompt_args(chunks, chunk_results, prompt_args):
+    partial_reviews = "\n\n".join(
+        f"=== パート「{chunks[i]['label']}」の部分評価 ===\n{chunk_results[i]}" for i in sorted(chunk_results)
+    )
+    missing = [chunks[i]["label"] for i in range(len(chunks)) if i not in chunk_results]
+    if missing:
+        partial_reviews += f"\n\n（注: {', '.join(missing)} は評価を取得できなかったため含まれていません）"
+    return dict(prompt_args, chunk_count=len(chunks), partial_reviews=partial_reviews)
+
+
+# --- ページ別評価 ---
+# 1ページずつ page_evaluator で評価するか、batch_size ページずつ page_batch_evaluator で
+# まとめて評価する（プロンプトの重複を減らす）。どちらも (ページindex, 結果, 例外) をページ単位で返す。
+def page_prompt_args(evaluation_points, focus_areas):
+    return {"evaluation_points": ", ".join(evaluation_points), "focus_areas": focus_areas if focus_areas else "特になし"}
+
+def evaluate_page_batch(model, page_indices, page_ids, prompt_args, image_options, call_args):
+    """page_indices のページをまとめて評価し、{ページindex: 評価} を返す。
+    応答から読み取れなかったページは1ページずつ評価し直す。
+    """
+    page_numbers = [page_idx + 1 for page_idx in page_indices]
+    prompt_text = build_prompt(
+        "page_batch_evaluator", page_numbers=", ".join(map(str, page_numbers)),
+        image_map=", ".join(f"{i+1}枚目の画像=P.{number}" for i, number in enumerate(page_numbers)), **prompt_args
+    )
+    response = generate_for_pages(model, prompt_text, page_ids, image_options, **dict(call_args, prompt_key="page_batch_evaluator"))
+    parsed = ai_engine.parse_page_batch(response, page_numbers)
+    results = {}
+    for page_idx, page_id in zip(page_indices, page_ids):
+        if page_idx + 1 in parsed:
+            results[page_idx] = parsed[page_idx + 1]
+        else:
+            results[page_idx] = generate_for_pages(
+                model, build_prompt("page_evaluator", page_number=page_idx + 1, **prompt_args), [page_id], image_options,
+                **dict(call_args, prompt_key="page_evaluator")
+            )
+    return results
+
+def iter_page_evaluations(model, page_ids, page_indices, prompt_args, image_options, call_args, concurrency, batch_size=1):
+    """page_indices のページを最大 concurrency 並列で評価し、完了した順に (ページindex, 結果, 例外) を返す"""
+    if batch_size <= 1:
+        page_worker = functools.partial(generate_for_pages, model, image_options=image_options, **dict(call_args, prompt_key="page_evaluator"))
+        page_jobs = {
+            page_idx: {"prompt_text": build_prompt("page_evaluator", page_number=page_idx + 1, **prompt_args), "page_ids": [page_ids[page_idx]]}
+            for page_idx in page_indices
+        }
+        with contextlib.closing(ai_engine.evaluate_concurrently(page_jobs, page_worker, max_workers=concurrency)) as results:
+            yield from results
+        return
+
+    batch_worker = functools.partial(evaluate_page_batch, model, prompt_args=prompt_args, image_options=image_options, call_args=call_args)
+    batch_jobs = {}
+    for start in range(0, len(page_indices), batch_size):
+        batch = tuple(page_indices[start:start + batch_size])
+        batch_jobs[batch] = {"page_indices": batch, "page_ids": [page_ids[page_idx] for page_idx in batch]}
+    with contextlib.closing(ai_engine.evaluate_concurrently(batch_jobs, batch_worker, max_workers=concurrency)) as results:
+        for batch, batch_results, error in results:
+            for page_idx in batch:
+                yield (page_idx, None, error) if error else (page_idx, batch_results.get(page_idx), None)
+
+
+# --- 差分評価 ---
+# 修正版の原稿を前回のページ別評価と比べ、変更のないページ（ページID = SHA-256 が一致）は前回の結果を再利用する。
+# 知覚ハッシュが近いページは「小さな変更」とする。吹き出しの追加や1コマの描き直しでも距離は数ビットなので、
+# 既定では変更ありとして評価し直し、前回の結果を使うのは利用者が選んだときだけ
+SIMILAR_HASH_DISTANCE = 4
+PAGE_STATUS_LABELS = {"unchanged": "✅ 変更なし", "similar": "≈ 小さな変更", "changed": "✏️ 変更あり", "new": "🆕 新規"}
+REUSED_MATCH_LABELS = {"unchanged": "ページに変更なし", "similar": "小さな変更のみ"}
+
+def _source_files(page_infos):
+    return {info.split(" - P.")[0] for info in page_infos if info}
+
+def find_previous_evaluation(evaluations, project_id, page_info_list, evaluation_points):
+    """同じプロジェクト（未指定なら同じファイル名）で、同じ評価観点の直近のページ別評価を返す"""
+    files = _source_files(page_info_list)
+    for record in sorted(evaluations, key=lambda r: r["timestamp"], reverse=True):
+        if record.get("type") != "ページ別評価" or not record.get("page_results") or "page_ids" not in record:
+            continue
+        if record.get("evaluation_points") != evaluation_points:
+            continue
+        if project_id:
+            if record.get("project_id") == project_id:
+                return record
+        elif files & _source_files(record.get("page_infos") or [r.get("page_info") for r in record["page_results"]]):
+            return record
+    return None
+
+def page_hashes(page_ids):
+    return [page_store.perceptual_hash(page_id) for page_id in page_ids]
+
+def diff_pages(page_ids, previous):
+    """各ページを前回の評価と比べ、{status, previous_index} のリストを返す。
+    previous_index は再利用する（または比較対象の）前回のページ位置で、新規ページは None。
+    """
+    previous_ids = previous["page_ids"]
+    previous_hashes = previous.get("page_hashes") or [
+        page_store.perceptual_hash(page_id) if page_store.has_page(page_id) else None for page_id in previous_ids
+    ]
+    evaluated = {r["page_number"] - 1 for r in previous["page_results"]}
+    exact = {}
+    for i, page_id in enumerate(previous_ids):
+        if i in evaluated:
+            exact.setdefault(page_id, i)
+    diffs = []
+    for idx, page_id in enumerate(page_ids):
+        if page_id in exact:
+            diffs.append({"status": "unchanged", "previous_index": exact[page_id]})
+            continue
+        page_hash = page_store.perceptual_hash(page_id)
+        distance, nearest = min(
+            ((page_store.hash_distance(page_hash, previous_hashes[i]), i) for i in evaluated if i < len(previous_hashes) and previous_hashes[i]),
+            default=(None, None)
+        )
+        if distance is not None and distance <= SIMILAR_HASH_DISTANCE:
+            diffs.append({"status": "similar", "previous_index": nearest})
+        elif idx < len(previous_ids):
+            diffs.append({"status": "changed", "previous_index": idx})
+        else:
+            diffs.append({"status": "new", "previous_index": None})
+    return diffs
+
+def reused_page_results(previous, diffs, page_indices, page_info_list, include_similar=False):
+    """変更のないページ（include_similar なら小さな変更のページも）について、
+    前回の評価結果をこのページ番号に付け替えて返す {ページindex: page_result}"""
+    previous_results = {r["page_number"] - 1: r for r in previous["page_results"]}
+    statuses = ("unchanged", "similar") if include_similar else ("unchanged",)
+    reused = {}
+    for page_idx in page_indices:
+        diff = diffs[page_idx]
+        if diff["status"] in statuses and diff["previous_index"] in previous_results:
+            reused[page_idx] = dict(
+                previous_results[diff["previous_index"]], page_number=page_idx + 1,
+                page_info=page_info_list[page_idx], reused_from=previous["id"], reused_match=diff["status"]
+            )
+    return reused
+
+
+# --- バックグラウンド評価ジョブ ---
+# jobs.JobQueue のワーカースレッドで実行される。st.* には触れず、結果は永続ストレージに保存する
+def run_overall_evaluation_job(job, model, prompt_text, page_ids, image_options, call_args, record):
+    job.update(0, 1, "AI編集者が総合的に評価中...")
+    record["result"] = generate_for_pages(model, prompt_text, page_ids, image_options, **call_args)
+    job.check_cancelled()
+    save_evaluation(record)
+    job.update(1, 1, "評価履歴に保存しました")
+    return record["id"]
+
+def run_chunked_evaluation_job(job, model, chunks, prompt_args, image_options, call_args, concurrency, record):
+    total, chunk_results = len(chunks) + 1, {}
+    chunk_worker = functools.partial(generate_for_pages, model, image_options=image_options, **dict(call_args, prompt_key="manuscript_evaluator"))
+    job.update(0, total, f"{len(chunks)}パートを最大{concurrency}並列で評価中...")
+    # 取り消しや設定エラーで抜けたときも、未着手のパートを取り消してから戻る
+    with contextlib.closing(ai_engine.evaluate_concurrently(chunk_evaluation_jobs(chunks, prompt_args), chunk_worker, max_workers=concurrency)) as results:
+        for done, (chunk_idx, result, error) in enumerate(results, start=1):
+            job.check_cancelled()
+            if isinstance(error, ai_engine.AIConfigError):
+                raise error
+            elif result:
+                chunk_results[chunk_idx] = result
+            job.update(done, total, f"{done}/{len(chunks)}パート完了")
+    if not chunk_results:
+        raise RuntimeError("部分評価を1つも取得できませんでした。")
+    job.update(len(chunks), total, "部分評価を統合中...")
+    record["result"] = ai_engine.generate(
+        model, build_prompt("manuscript_reducer", **reducer_prompt_args(chunks, chunk_results, prompt_args)),
+        **dict(call_args, prompt_key="manuscript_reducer")
+    )
+    record["chunk_results"] = [{"label": chunks[i]["label"], "result": chunk_results[i]} for i in sorted(chunk_results)]
+    job.check_cancelled()
+    save_evaluation(record)
+    job.update(total, total, "評価履歴に保存しました")
+    return record["id"]
+
+def run_page_evaluation_job(job, page_evaluations, page_info_list, record):
+    # page_evaluations は iter_page_evaluations に渡す引数（評価はこのワーカースレッドで始まる）
+    # record["page_results"] には前回から再利用したページが入っていることがある
+    total, failed, page_results = len(page_evaluations["page_indices"]), 0, list(record["page_results"])
+    job.update(0, total, f"{total}ページを最大{page_evaluations['concurrency']}並列で評価中...")
+    for done, (page_idx, result, error) in enumerate(iter_page_evaluations(**page_evaluations), start=1):
+        job.check_cancelled()
+        if isinstance(error, ai_engine.AIConfigError):
+            raise error
+        elif error:
+            failed += 1
+        elif result:
+            page_results.append({"page_number": page_idx + 1, "page_info": page_info_list[page_idx], "result": result})
+        job.update(done, total, f"{done}/{total}ページ完了" + (f" (失敗 {failed}ページ)" if failed else ""))
+    if not page_results:
+        raise RuntimeError("評価結果を1ページも取得できませんでした。")
+    record["page_results"] = sorted(page_results, key=lambda r: r["page_number"])
+    save_evaluation(record)
+    return record["id"]
@@ -0,0 +1,183 @@
+# --- バックグラウンドジョブ ---
+# 時間のかかるAI評価をStreamlitのスクリプト実行とは別のワーカースレッドで動かす。
+# 状態・進捗・結果はジョブテーブル（永続ストレージと同じSQLiteファイル）に記録するため、
+# 画面の再実行やメニュー移動で中断されず、ジョブを投入したセッションから進捗を確認・キャンセルできる。
+# 同じDBを複数のプロセスが使うこともあるため、ジョブには投入したキュー（プロセス）を owner として記録し、
+# 実行中のキューは定期的に heartbeat を更新する。heartbeat が途絶えたキューのジョブだけを失敗扱いにする。
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import storage
+
+JOB_WORKERS = int(os.getenv("MANGA_PRO_JOB_WORKERS", "2"))
+HEARTBEAT_SECONDS = 5
+# この間 heartbeat のないジョブは、投入したプロセスが終了したものとみなす
+STALE_SECONDS = 30
+ACTIVE_STATUSES = ("queued", "running", "cancelling")
+STATUS_LABELS = {
+    "queued": "⏳ 待機中", "running": "🔄 実行中", "cancelling": "🛑 キャンセル中",
+    "done": "✅ 完了", "failed": "❌ 失敗", "cancelled": "🚫 キャンセル済み",
+}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """ジョブ関数に渡されるハンドル。進捗の報告とキャンセルの確認に使う"""
+
+    def __init__(self, queue, job_id):
+        self.id = job_id
+        self._queue = queue
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def update(self, progress, total=None, message=None):
+        self._queue._update(self.id, progress=progress, total=total, message=message)
+
+
+class JobQueue:
+    def __init__(self, path, workers=JOB_WORKERS):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT, title TEXT, status TEXT, progress INTEGER, total INTEGER, "
+            "message TEXT, result_id TEXT, error TEXT, created_at REAL, updated_at REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("owner", "TEXT"), ("session_id", "TEXT"), ("heartbeat", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_session ON jobs(session_id, created_at)")
+        self._conn.commit()
+        self.owner = storage.new_id()
+        self._swept_at = 0.0
+        self._fail_orphaned()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._futures = {}
+        threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True).start()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            with self._lock:
+                if self._jobs:
+                    self._conn.execute(
+                        f"UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN {ACTIVE_STATUSES}", (time.time(), self.owner)
+                    )
+                    self._conn.commit()
+
+    def _fail_orphaned(self):
+        # 投入したプロセスが終了して（heartbeat が途絶えて）再開できないジョブを失敗扱いにする。
+        # 他のプロセスで実行中のジョブには触れない
+        now = time.time()
+        with self._lock:
+            if now - self._swept_at < HEARTBEAT_SECONDS:
+                return
+            self._swept_at = now
+            self._conn.execute(
+                f"UPDATE jobs SET status = 'failed', error = 'サーバーの再起動により中断されました' "
+                f"WHERE status IN {ACTIVE_STATUSES} AND (owner IS NULL OR (owner != ? AND COALESCE(heartbeat, 0) < ?))",
+                (self.owner, now - STALE_SECONDS)
+            )
+            self._conn.commit()
+
+    def submit(self, kind, title, fn, *args, session_id=None, **kwargs):
+        """fn(job, *args, **kwargs) をバックグラウンドで実行する。fn の戻り値は result_id として保存される。
+        session_id は投入したセッション（list_jobs / has_active の絞り込みに使う）"""
+        job = Job(self, storage.new_id())
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, title, status, progress, total, message, created_at, updated_at, owner, session_id, heartbeat) "
+                "VALUES (?, ?, ?, 'queued', 0, 0, '', ?, ?, ?, ?, ?)",
+                (job.id, kind, title, now, now, self.owner, session_id, now)
+            )
+            self._conn.commit()
+            self._jobs[job.id] = job
+            self._futures[job.id] = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        try:
+            job.check_cancelled()
+            self._update(job.id, status="running")
+            result_id = fn(job, *args, **kwargs)
+            self._update(job.id, status="done", result_id=result_id)
+        except JobCancelled:
+            self._update(job.id, status="cancelled")
+        except Exception as e:
+            self._update(job.id, status="failed", error=str(e))
+        finally:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+                self._futures.pop(job.id, None)
+
+    def _update(self, job_id, **fields):
+        fields = {k: v for k, v in fields.items() if v is not None}
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            future = self._futures.get(job_id)
+        if job is None:
+            return
+        job._cancel_event.set()
+        # まだ開始していなければその場で取り消せる
+        if future is not None and future.cancel():
+            self._update(job_id, status="cancelled")
+            with self._lock:
+                self._jobs.pop(job_id, None)
+                self._futures.pop(job_id, None)
+        else:
+            self._update(job_id, status="cancelling")
+
+    def list_jobs(self, session_id, limit=10):
+        """session_id のセッションが投入したジョブを新しい順に返す"""
+        self._fail_orphaned()
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM jobs WHERE session_id = ? ORDER BY created_at DESC LIMIT ?", (session_id, limit))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def has_active(self, session_id):
+        self._fail_orphaned()
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT 1 FROM jobs WHERE session_id = ? AND status IN {ACTIVE_STATUSES} LIMIT 1", (session_id,)
+            ).fetchone() is not None
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            # ジョブテーブルは永続ストレージのDBファイルに同居させる（スキーマ作成を先に済ませる）
+            storage.get_store()
+            _job_queue = JobQueue(storage.DB_PATH)
+        return _job_queue
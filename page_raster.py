@@ -0,0 +1,165 @@
+# --- PDFラスタライズ ---
+# PDFの各ページを複数のワーカープロセスで並列に画像化し、ページストアに保存する。
+# 結果は (ファイルハッシュ, ページ, 倍率) ごとに記録するため、同じPDFを再度開いても再描画しない。
+# ワーカーはページIDだけを返すので、親プロセスが全ページの画像を同時に抱えることはない。
+# PyMuPDF (fitz) は読み込みに時間がかかるため、PDFを開くときに初めて読み込む。
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+
+import ai_cache
+import page_store
+
+RASTER_SCALE = 1.5
+RASTER_WORKERS = int(os.getenv("MANGA_PRO_RASTER_WORKERS", str(min(4, os.cpu_count() or 1))))
+# これ以下のページ数ならワーカーを起動せずにその場で描画する
+INLINE_RENDER_PAGES = 4
+RASTER_DIR = os.path.join(ai_cache.CACHE_DIR, "raster")
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            os.makedirs(RASTER_DIR, exist_ok=True)
+            # 以前の版はアップロードされたPDFをここに残していた（描画済みのページは索引から引けるので不要）
+            shutil.rmtree(os.path.join(RASTER_DIR, "pdf"), ignore_errors=True)
+            _index = sqlite3.connect(os.path.join(RASTER_DIR, "index.sqlite3"), check_same_thread=False)
+            _index.execute("PRAGMA journal_mode=WAL")
+            _index.execute(
+                "CREATE TABLE IF NOT EXISTS rendered_pages ("
+                "file_hash TEXT, scale REAL, page INTEGER, page_id TEXT, PRIMARY KEY (file_hash, scale, page))"
+            )
+            _index.commit()
+        return _index
+
+
+def _lookup(file_hash, scale):
+    index = _get_index()
+    with _index_lock:
+        rows = index.execute("SELECT page, page_id FROM rendered_pages WHERE file_hash = ? AND scale = ?", (file_hash, scale)).fetchall()
+    return {page: page_id for page, page_id in rows if page_store.has_page(page_id)}
+
+
+def _record(file_hash, scale, page, page_id):
+    index = _get_index()
+    with _index_lock:
+        index.execute("INSERT OR REPLACE INTO rendered_pages VALUES (?, ?, ?, ?)", (file_hash, scale, page, page_id))
+        index.commit()
+
+
+# --- ワーカープロセス側 ---
+# Streamlitは実行中のスクリプトを __main__ として差し替えるため、multiprocessing の spawn では
+# 各ワーカーでアプリ全体が再実行されてしまい、fork はマルチスレッドのサーバーでは安全でない。
+# そこでこのファイル自体を独立したワーカープロセスとして起動する。
+# PyMuPDF は警告を標準出力に書くことがあるため、結果行には目印を付ける
+_RESULT_PREFIX = "PAGE"
+
+
+def _render_pages(pdf_path, scale, pages):
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        for page in pages:
+            pix = doc[page].get_pixmap(matrix=fitz.Matrix(scale, scale))
+            yield page, page_store.put_page(pix.tobytes("png"))
+
+
+def _worker_main(argv):
+    pdf_path, scale, pages = argv[0], float(argv[1]), [int(p) for p in argv[2:]]
+    for page, page_id in _render_pages(pdf_path, scale, pages):
+        print(f"{_RESULT_PREFIX}\t{page}\t{page_id}", flush=True)
+
+
+# --- 親プロセス側 ---
+def _start_worker(pdf_path, scale, pages):
+    return subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), pdf_path, str(scale), *map(str, pages)],
+        stdout=subprocess.PIPE, text=True
+    )
+
+
+def _read_result(worker, page):
+    for line in worker.stdout:
+        fields = line.rstrip("\n").split("\t")
+        if len(fields) == 3 and fields[0] == _RESULT_PREFIX and int(fields[1]) == page:
+            return fields[2]
+    raise RuntimeError(f"PDFの{page + 1}ページ目の描画に失敗しました。")
+
+
+def rasterize_pdf(pdf_bytes, scale=RASTER_SCALE):
+    """PDFの各ページを (ページ番号(0始まり), ページID) としてページ順に返すジェネレータ。
+
+    描画済みのページはキャッシュから即座に返し、残りは複数のワーカープロセスで並列に描画する。
+    イテレーションが途中で打ち切られた場合は、ワーカーを停止する。
+    """
+    import fitz  # PyMuPDF
+
+    file_hash = file_digest(pdf_bytes)
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        page_count = doc.page_count
+    cached = _lookup(file_hash, scale)
+    missing = [page for page in range(page_count) if page not in cached]
+    if not missing:
+        for page in range(page_count):
+            yield page, cached[page]
+        return
+
+    # 描画するページがあるときだけ、ワーカーが開けるようにPDFを一時ファイルに書き出し、描画が終われば消す
+    fd, pdf_path = tempfile.mkstemp(prefix="manga_pro_", suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        f.write(pdf_bytes)
+    del pdf_bytes
+    workers = []
+    try:
+        if len(missing) <= INLINE_RENDER_PAGES:
+            rendered = _render_pages(pdf_path, scale, missing)
+            try:
+                for page in range(page_count):
+                    if page in cached:
+                        yield page, cached[page]
+                    else:
+                        page, page_id = next(rendered)
+                        _record(file_hash, scale, page, page_id)
+                        yield page, page_id
+            finally:
+                # PDFを開いたままだと一時ファイルを消せない環境がある
+                rendered.close()
+            return
+
+        # ワーカーごとにページを飛び飛びに割り当てる。各ワーカーは昇順に描画するので、
+        # 次に必要なページを担当するワーカーの出力を1行読めばそのページの結果が得られる
+        worker_count = min(RASTER_WORKERS, len(missing))
+        workers = [_start_worker(pdf_path, scale, missing[i::worker_count]) for i in range(worker_count)]
+        owner = {page: workers[i % worker_count] for i, page in enumerate(missing)}
+        for page in range(page_count):
+            if page in cached:
+                yield page, cached[page]
+                continue
+            page_id = _read_result(owner[page], page)
+            _record(file_hash, scale, page, page_id)
+            yield page, page_id
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.kill()
+            worker.stdout.close()
+            worker.wait()
+        os.remove(pdf_path)
+
+
+if __name__ == "__main__":
+    _worker_main(sys.argv[1:])
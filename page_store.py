@@ -0,0 +1,137 @@
+# --- ページ画像ストア ---
+# アップロードされたページ画像を内容のハッシュ(SHA-256)をIDとしてディスクに1度だけ保存する。
+# 評価履歴はページIDのみを保持し、画像は表示やエクスポートの時点で読み込む。
+# 表示用のサムネイルとAI送信用の縮小画像は原本から生成し、別途ディスクにキャッシュする。
+
+import base64
+import functools
+import hashlib
+import io
+import os
+import tempfile
+from collections import namedtuple
+
+from PIL import Image
+
+# AIに渡す画像。バイト列のまま扱い、base64化は必要な経路（OpenAI）でのみ行う
+PageImage = namedtuple("PageImage", ["data", "mime_type"])
+
+DATA_DIR = os.getenv("MANGA_PRO_DATA_DIR", ".manga_pro_data")
+PAGE_STORE_DIR = os.path.join(DATA_DIR, "pages")
+DERIVED_DIR = os.path.join(DATA_DIR, "derived")
+
+# プレビュー・履歴のサムネイル（表示幅120px程度の2倍まで）
+THUMBNAIL_MAX_EDGE = 240
+THUMBNAIL_QUALITY = 70
+# AIに送る画像の既定値（長辺px, JPEG品質）。サイドバーから変更できる
+MODEL_IMAGE_MAX_EDGE = 1280
+MODEL_IMAGE_QUALITY = 85
+
+
+def _page_path(page_id):
+    return os.path.join(PAGE_STORE_DIR, page_id[:2], page_id)
+
+
+def _write_atomic(path, data):
+    # 書き込み途中のファイルを他のセッションが読まないよう、一時ファイルから置き換える
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def put_page(img_bytes):
+    """画像バイト列を保存してページIDを返す。同じ内容の画像は1度しか書き込まない。"""
+    page_id = hashlib.sha256(img_bytes).hexdigest()
+    path = _page_path(page_id)
+    if not os.path.exists(path):
+        _write_atomic(path, img_bytes)
+    return page_id
+
+
+def has_page(page_id):
+    return os.path.exists(_page_path(page_id))
+
+
+def get_page_bytes(page_id):
+    with open(_page_path(page_id), "rb") as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=16)
+def get_page_b64(page_id):
+    return base64.b64encode(get_page_bytes(page_id)).decode("utf-8")
+
+
+def page_mime_type(img_bytes):
+    if img_bytes[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if img_bytes[:4] == b"RIFF" and img_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
+def page_data_url(page_id):
+    """st.image にそのまま渡せる data URL（見つからない場合は None）"""
+    if not has_page(page_id):
+        return None
+    b64 = get_page_b64(page_id)
+    return f"data:{page_mime_type(base64.b64decode(b64[:16]))};base64,{b64}"
+
+
+# --- 派生画像 ---
+def _derive(page_id, name, max_edge, image_format, quality):
+    path = os.path.join(DERIVED_DIR, page_id[:2], f"{page_id}_{name}")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    with Image.open(io.BytesIO(get_page_bytes(page_id))) as img:
+        img = img.convert("RGB")
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, image_format, quality=quality)
+    data = buf.getvalue()
+    _write_atomic(path, data)
+    return data
+
+
+def get_thumbnail(page_id):
+    return _derive(page_id, f"t{THUMBNAIL_MAX_EDGE}.webp", THUMBNAIL_MAX_EDGE, "WEBP", THUMBNAIL_QUALITY)
+
+
+def thumbnail_data_url(page_id):
+    if not has_page(page_id):
+        return None
+    return f"data:image/webp;base64,{base64.b64encode(get_thumbnail(page_id)).decode('utf-8')}"
+
+
+def get_model_image(page_id, max_edge=MODEL_IMAGE_MAX_EDGE, quality=MODEL_IMAGE_QUALITY):
+    """AIに送る縮小済みJPEG。長辺 max_edge 以下に収め、原本より大きくはしない。"""
+    return _derive(page_id, f"m{max_edge}q{quality}.jpg", max_edge, "JPEG", quality)
+
+
+def get_model_image_part(page_id, max_edge=MODEL_IMAGE_MAX_EDGE, quality=MODEL_IMAGE_QUALITY):
+    return PageImage(get_model_image(page_id, max_edge, quality), "image/jpeg")
+
+
+# --- 差分検出 ---
+# ページIDは内容の完全一致しか判定できないため、再書き出しや軽微な圧縮の違いを吸収する知覚ハッシュ(dHash)も使う
+PERCEPTUAL_HASH_SIZE = 8
+
+
+@functools.lru_cache(maxsize=1024)
+def perceptual_hash(page_id):
+    """64bitの dHash を16進文字列で返す。キャッシュ済みのサムネイルから計算する"""
+    size = PERCEPTUAL_HASH_SIZE
+    with Image.open(io.BytesIO(get_thumbnail(page_id))) as img:
+        pixels = list(img.convert("L").resize((size + 1, size), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            bits = (bits << 1) | (pixels[row * (size + 1) + col] > pixels[row * (size + 1) + col + 1])
+    return f"{bits:0{size * size // 4}x}"
+
+
+def hash_distance(hash_a, hash_b):
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
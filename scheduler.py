@@ -0,0 +1,303 @@
+# --- スケジューラ ---
+# プロジェクトのタスクを依存関係（depends_on）の DAG として、開始日・終了日・余裕日数（スラック）を計算する。
+# 同じ担当者の作業は重ならないように順番を決め（資源の平準化）、その前後関係も辺として扱う。
+# タスクを1つ変更したときは、後続（依存先と同じ担当者の次のタスク）の日程と先行タスクの余裕だけを計算し直す。
+#
+# 日付は date の序数で持つ。終了日は「開始日 + 期間（日）」で、後続はその日から開始できる。
+
+import heapq
+from collections import defaultdict
+from datetime import date, datetime
+
+PINNED_STATUSES = ("完了", "進行中")  # 開始済みのタスクは記録された開始日から動かさない
+DONE_STATUS = "完了"
+RISK_SLACK_DAYS = 2
+
+
+class ScheduleError(ValueError):
+    pass
+
+
+def _ordinal(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date().toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def _iso(ordinal):
+    return date.fromordinal(ordinal).strftime("%Y-%m-%d")
+
+
+def task_duration(task):
+    """期間（日）。記録がなければ開始日と終了日の差から求める。最低1日"""
+    if task.get("duration"):
+        return max(1, int(task["duration"]))
+    start, end = _ordinal(task.get("start_date")), _ordinal(task.get("end_date"))
+    return max(1, end - start) if start and end else 1
+
+
+class Scheduler:
+    def __init__(self, tasks, project_start=None, deadline=None):
+        self.tasks = {task["id"]: task for task in tasks}
+        self.project_start = _ordinal(project_start) or date.today().toordinal()
+        self.deadline = _ordinal(deadline)
+        self.preds = {}
+        self.succs = defaultdict(set)
+        for task_id in self.tasks:
+            self._link(task_id)
+        self.es, self.ef, self.ls = {}, {}, {}
+        self.rank = {}
+        self.resource_prev, self.resource_next = {}, {}
+        self._schedule()
+
+    # --- グラフ ---
+    def _link(self, task_id):
+        depends_on = self.tasks[task_id].get("depends_on") or []
+        self.preds[task_id] = [d for d in dict.fromkeys(depends_on) if d in self.tasks and d != task_id]
+        for pred in self.preds[task_id]:
+            self.succs[pred].add(task_id)
+
+    def _unlink(self, task_id):
+        for pred in self.preds.pop(task_id, []):
+            self.succs[pred].discard(task_id)
+
+    def _all_succs(self, task_id):
+        following = self.resource_next.get(task_id)
+        return [*self.succs[task_id], following] if following else list(self.succs[task_id])
+
+    def _all_preds(self, task_id):
+        previous = self.resource_prev.get(task_id)
+        return [*self.preds[task_id], previous] if previous else list(self.preds[task_id])
+
+    def _reaches(self, source, target):
+        stack, seen = [source], {source}
+        while stack:
+            node = stack.pop()
+            if node == target:
+                return True
+            for succ in self.succs[node]:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return False
+
+    def would_cycle(self, task_id, depends_on):
+        """task_id の前工程を depends_on にすると循環するか"""
+        return any(pred == task_id or self._reaches(task_id, pred) for pred in depends_on if pred in self.tasks)
+
+    # --- 日程の計算 ---
+    def duration(self, task_id):
+        return task_duration(self.tasks[task_id])
+
+    def _dep_earliest(self, task_id):
+        # 依存関係と開始日の指定だけから見た最早開始日（担当者の空きは考えない）
+        task = self.tasks[task_id]
+        recorded_start = _ordinal(task.get("start_date"))
+        if task.get("status") in PINNED_STATUSES and recorded_start:
+            return recorded_start
+        # 未着手のタスクは記録された開始日を起点にしない（平準化で後ろにずれた日付から前に戻れなくなるため）。
+        # 開始可能日の指定（なければプロジェクト開始日）と前工程の終了日だけから決める
+        candidates = [self.ef[pred] for pred in self.preds[task_id]]
+        candidates.append(_ordinal(task.get("not_before")) or self.project_start)
+        return max(candidates)
+
+    def _forward(self, task_id):
+        task = self.tasks[task_id]
+        start = self._dep_earliest(task_id)
+        previous = self.resource_prev.get(task_id)
+        if previous and task.get("status") not in PINNED_STATUSES:
+            start = max(start, self.ef[previous])
+        self.es[task_id], self.ef[task_id] = start, start + self.duration(task_id)
+
+    def _horizon(self):
+        return self.deadline or max(self.ef.values(), default=self.project_start)
+
+    def _backward_one(self, task_id, horizon):
+        finish = min([self.ls[succ] for succ in self._all_succs(task_id)] + [horizon])
+        self.ls[task_id] = finish - self.duration(task_id)
+
+    def _backward_all(self):
+        horizon = self._horizon()
+        for task_id in sorted(self.tasks, key=self.rank.get, reverse=True):
+            self._backward_one(task_id, horizon)
+        self._computed_horizon = horizon
+
+    def _schedule(self):
+        """依存関係の順に、後続の長いタスクを優先して担当者ごとに並べる（シリアル法）"""
+        order, indegree = [], {task_id: len(preds) for task_id, preds in self.preds.items()}
+        queue = [task_id for task_id, count in indegree.items() if count == 0]
+        while queue:
+            task_id = queue.pop()
+            order.append(task_id)
+            for succ in self.succs[task_id]:
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    queue.append(succ)
+        if len(order) < len(self.tasks):
+            raise ScheduleError("タスクの依存関係が循環しています。")
+        tail = {}
+        for task_id in reversed(order):
+            tail[task_id] = self.duration(task_id) + max((tail[succ] for succ in self.succs[task_id]), default=0)
+
+        position = {task_id: i for i, task_id in enumerate(self.tasks)}
+        self.es, self.ef, self.rank = {}, {}, {}
+        self.resource_prev, self.resource_next = {}, {}
+        last_by_assignee = {}
+        remaining = {task_id: len(preds) for task_id, preds in self.preds.items()}
+        ready = [(self._dep_earliest(task_id), -tail[task_id], position[task_id], task_id) for task_id, count in remaining.items() if count == 0]
+        heapq.heapify(ready)
+        while ready:
+            _, _, _, task_id = heapq.heappop(ready)
+            assignee = self.tasks[task_id].get("assignee")
+            if assignee in last_by_assignee:
+                previous = last_by_assignee[assignee]
+                self.resource_prev[task_id], self.resource_next[previous] = previous, task_id
+            last_by_assignee[assignee] = task_id
+            self.rank[task_id] = len(self.rank)
+            self._forward(task_id)
+            for succ in self.succs[task_id]:
+                remaining[succ] -= 1
+                if remaining[succ] == 0:
+                    heapq.heappush(ready, (self._dep_earliest(succ), -tail[succ], position[succ], succ))
+        self._backward_all()
+
+    def _propagate(self, forward_from, backward_from):
+        """forward_from の後続の日程と、backward_from の先行の最遅開始日を順位の順に計算し直す"""
+        queue = [(self.rank[task_id], task_id) for task_id in set(forward_from)]
+        heapq.heapify(queue)
+        seen = set()
+        while queue:
+            _, task_id = heapq.heappop(queue)
+            if task_id in seen:
+                continue
+            seen.add(task_id)
+            before = (self.es.get(task_id), self.ef.get(task_id))
+            self._forward(task_id)
+            if (self.es[task_id], self.ef[task_id]) != before or task_id in forward_from:
+                for succ in self._all_succs(task_id):
+                    heapq.heappush(queue, (self.rank[succ], succ))
+        horizon = self._horizon()
+        if horizon != self._computed_horizon:
+            self._backward_all()
+            return
+        queue = [(-self.rank[task_id], task_id) for task_id in set(backward_from)]
+        heapq.heapify(queue)
+        seen = set()
+        while queue:
+            _, task_id = heapq.heappop(queue)
+            if task_id in seen:
+                continue
+            seen.add(task_id)
+            before = self.ls.get(task_id)
+            self._backward_one(task_id, horizon)
+            if self.ls[task_id] != before or task_id in backward_from:
+                for pred in self._all_preds(task_id):
+                    heapq.heappush(queue, (-self.rank[pred], pred))
+
+    def _apply(self, task_ids):
+        # 計算した日程をタスクに書き戻し、実際に変わったタスクのIDを返す
+        changed = set()
+        for task_id in task_ids:
+            task = self.tasks[task_id]
+            start, end = _iso(self.es[task_id]), _iso(self.ef[task_id])
+            if (task.get("start_date"), task.get("end_date")) != (start, end):
+                task["start_date"], task["end_date"] = start, end
+                changed.add(task_id)
+        return changed
+
+    # --- 変更 ---
+    def reschedule(self):
+        """担当者ごとの順番も含めて全体を組み直す"""
+        self._schedule()
+        return self._apply(self.tasks)
+
+    def update(self, task_id, previous_assignee=None):
+        """task_id の期間・前工程・開始日の指定・担当者を変更した後に呼ぶ。日程が変わったタスクのIDを返す"""
+        task = self.tasks[task_id]
+        if self.would_cycle(task_id, task.get("depends_on") or []):
+            raise ScheduleError("前工程に後続のタスクが含まれているため、依存関係が循環します。")
+        old_preds = self.preds.get(task_id, [])
+        self._unlink(task_id)
+        self._link(task_id)
+        if previous_assignee != task.get("assignee") and previous_assignee is not None:
+            # 担当者が変わると担当者ごとの並びが変わるので組み直す
+            return self.reschedule()
+        if any(self.rank[pred] > self.rank[task_id] for pred in self.preds[task_id]):
+            # 今の順位より後のタスクを前工程にした場合も組み直す
+            return self.reschedule()
+        self._propagate([task_id], [task_id, *old_preds, *self.preds[task_id]])
+        return self._apply(self._downstream(task_id))
+
+    def add_task(self, task):
+        """タスクを追加し、その担当者の最後に並べる"""
+        task_id = task["id"]
+        self.tasks[task_id] = task
+        self._link(task_id)
+        same_assignee = [other for other in self.rank if self.tasks[other].get("assignee") == task.get("assignee") and other not in self.resource_next]
+        if same_assignee:
+            previous = same_assignee[0]
+            self.resource_prev[task_id], self.resource_next[previous] = previous, task_id
+        # 削除で番号が空いても既存の順位と重ならないよう、最大の順位の次にする
+        self.rank[task_id] = max(self.rank.values(), default=-1) + 1
+        self._propagate([task_id], [task_id, *self._all_preds(task_id)])
+        return self._apply([task_id])
+
+    def remove_task(self, task_id):
+        """タスクを削除する。前工程から外れたタスクと、日程が変わったタスクのIDを返す"""
+        followers = list(self.succs.pop(task_id, set()))
+        for follower in followers:
+            self.tasks[follower]["depends_on"] = [d for d in self.tasks[follower].get("depends_on", []) if d != task_id]
+            self._unlink(follower)
+            self._link(follower)
+        previous, following = self.resource_prev.pop(task_id, None), self.resource_next.pop(task_id, None)
+        if previous:
+            self.resource_next.pop(previous, None)
+        if following:
+            self.resource_prev.pop(following, None)
+        if previous and following:
+            self.resource_prev[following], self.resource_next[previous] = previous, following
+        preds = self.preds.get(task_id, [])
+        self._unlink(task_id)
+        for table in (self.tasks, self.succs, self.rank, self.es, self.ef, self.ls):
+            table.pop(task_id, None)
+        forward_from = [*followers, following] if following else followers
+        self._propagate(forward_from, [*preds, previous] if previous else preds)
+        return set(followers) | self._apply(self._downstream(*forward_from))
+
+    def _downstream(self, *task_ids):
+        stack, seen = list(task_ids), set(task_ids)
+        while stack:
+            for succ in self._all_succs(stack.pop()):
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return seen
+
+    # --- 参照 ---
+    def slack(self, task_id):
+        """締切（なければ予測完了日）までの余裕日数"""
+        return self.ls[task_id] - self.es[task_id]
+
+    def risk(self, task_id):
+        if self.tasks[task_id].get("status") == DONE_STATUS:
+            return None
+        slack = self.slack(task_id)
+        if slack < 0:
+            return "遅延リスク"
+        if slack <= RISK_SLACK_DAYS:
+            return "余裕わずか"
+        return None
+
+    def critical_path(self):
+        """余裕日数が最小の未完了タスク（クリティカルパス）を開始順に返す"""
+        open_ids = [task_id for task_id in self.tasks if self.tasks[task_id].get("status") != DONE_STATUS]
+        if not open_ids:
+            return []
+        least = min(self.slack(task_id) for task_id in open_ids)
+        return sorted((task_id for task_id in open_ids if self.slack(task_id) == least), key=lambda task_id: (self.es[task_id], self.rank[task_id]))
+
+    def projected_end(self):
+        return date.fromordinal(max(self.ef.values())) if self.ef else None
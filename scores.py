@@ -0,0 +1,67 @@
+# --- 評価スコアの抽出 ---
+# AIの評価結果から観点ごとの点数(1〜5)を取り出す。プロンプトで末尾に出力させたJSONブロックを優先し、
+# 無い場合や壊れている場合は Markdown 中の ★ 評価から読み取る。
+# 抽出したJSONブロックは表示用の本文から取り除く。
+
+import json
+import re
+
+# page_evaluator / page_batch_evaluator の評価項目（プロンプトの項目名と一致させる）
+PAGE_CRITERIA = [
+    "コマ割り・レイアウト", "構図・アングル", "キャラクター表現", "背景・環境",
+    "台詞・文字", "演出・効果", "全体の印象",
+]
+OVERALL_CRITERION = "総合評価"
+
+# 本文に ``` を含まない（＝末尾の）コードブロックだけを対象にする。前にある別の {...} のブロックまで取り込まない
+_SCORE_BLOCK = re.compile(r"```(?:json)?\s*(\{(?:(?!```).)*\})\s*```\s*$", re.S)
+_STAR_LINE = re.compile(r"\*\*([^*\n]+?)\*\*[^★☆\n]*?([★☆]{2,})")
+
+
+def _valid_score(value):
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    return score if 1 <= score <= 5 else None
+
+
+def normalize_scores(data):
+    """{"overall": n, "criteria": {観点: n}} 形式、または {観点: n} 形式を {観点: 点数} にする"""
+    if not isinstance(data, dict):
+        return {}
+    scores = {}
+    if "overall" in data and _valid_score(data["overall"]) is not None:
+        scores[OVERALL_CRITERION] = _valid_score(data["overall"])
+    criteria = data.get("criteria", data.get("scores", data))
+    if isinstance(criteria, dict):
+        for criterion, value in criteria.items():
+            score = _valid_score(value)
+            if score is not None and criterion not in ("overall", "criteria", "scores"):
+                scores[str(criterion).strip()] = score
+    return scores
+
+
+def scores_from_stars(text):
+    """Markdown の「**観点**: ★★★☆☆」のような行から点数を読み取る（JSONが無い場合の予備）"""
+    scores = {}
+    for criterion, stars in _STAR_LINE.findall(text or ""):
+        criterion = re.sub(r"^[\d.\s]+", "", criterion).strip(" :：")
+        if criterion and criterion not in scores and "★" in stars:
+            scores[criterion] = float(min(5, stars.count("★")))
+    return scores
+
+
+def extract_scores(text):
+    """(スコアのJSONブロックを除いた本文, {観点: 点数}) を返す"""
+    if not text:
+        return text, {}
+    match = _SCORE_BLOCK.search(text.rstrip())
+    if match:
+        try:
+            scores = normalize_scores(json.loads(match.group(1)))
+        except ValueError:
+            scores = {}
+        if scores:
+            return text.rstrip()[:match.start()].rstrip(), scores
+    return text, scores_from_stars(text)
@@ -0,0 +1,24 @@
+# --- 画面 ---
+# サイドバーのメニューごとの画面モジュール。各モジュールの render() が画面を描画する。
+# モジュールは選ばれたメニューを初めて表示するときに読み込むため、pandas / plotly などの
+# 重いライブラリはそれを使う画面を開くまで読み込まれない。
+
+import importlib
+
+# メニュー名 → screens 配下のモジュール名（サイドバーにはこの順で並ぶ）
+MENUS = {
+    "🏠 ダッシュボード": "dashboard",
+    "🚀 新規プロジェクト": "new_project",
+    "💡 アイデア工房": "ideas",
+    "📝 シナリオ作成": "scenario",
+    "👥 キャラクター工房": "characters",
+    "🌍 世界観設定": "world",
+    "📅 スケジュール管理": "schedule",
+    "👥 チーム管理": "team",
+    "📊 分析・レポート": "analytics",
+    "✍️ アイデア・原稿評価": "review",
+}
+
+
+def render(menu):
+    importlib.import_module(f"{__name__}.{MENUS[menu]}").render()
@@ -0,0 +1,88 @@
+# --- キャラクター工房 ---
+
+from datetime import datetime
+
+import plotly.graph_objects as go
+import streamlit as st
+
+import storage
+from screens.common import AVAILABLE_MODELS, call_generative_ai, filter_by_hits, page_window, search_hits
+
+def render():
+    st.title("👥 キャラクター工房")
+    ai_model = st.selectbox("使用するAIモデル", AVAILABLE_MODELS, key="char_model")
+    # ... (以降のロジックは変更なし)
+    tab1, tab2, tab3 = st.tabs(["キャラクター作成", "キャラクター一覧", "キャラクターアーク設計"])
+    with tab1:
+        st.subheader("🎨 新規キャラクター作成")
+        with st.form("character_form"):
+            char_name = st.text_input("キャラクター名")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                char_age = st.number_input("年齢", 0, 120, 16)
+            with col2:
+                char_gender = st.selectbox("性別", ["男性", "女性", "その他", "不明"])
+            with col3:
+                char_role = st.selectbox("役割", ["主人公", "ヒロイン", "相棒", "ライバル", "師匠", "敵役", "その他"])
+            personality = st.text_area("性格・内面（キーワードでOK）", placeholder="例：クール、負けず嫌い、実は寂しがり屋、猫が好き")
+            backstory = st.text_area("バックストーリー（キーワードでOK）", placeholder="例：孤児院育ち、謎の組織に追われている、失われた記憶")
+            abilities = st.text_area("能力・スキル", placeholder="例：炎を操る能力、天才的なハッキング技術")
+            submitted = st.form_submit_button("🎨 キャラクターを生成", type="primary")
+            if submitted and char_name:
+                with st.spinner(f"{ai_model}がキャラクターを構築中..."):
+                    response = call_generative_ai(
+                        "character_developer", model=ai_model,
+                        character_info=f"名前: {char_name}, 年齢: {char_age}, 性別: {char_gender}, 役割: {char_role}, 性格: {personality}, 背景: {backstory}, 能力: {abilities}"
+                    )
+                    if response:
+                        new_char = {"name": char_name, "details": response, "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")}
+                        st.session_state.characters.append(new_char)
+                        storage.get_store().add_asset("character", new_char)
+                        st.success(f"キャラクター「{char_name}」が作成され、一覧に追加されました！")
+                        st.balloons()
+    with tab2:
+        st.subheader("📜 キャラクター一覧")
+        if not st.session_state.characters:
+            st.info("まだ作成されたキャラクターがいません。")
+        else:
+            hits = search_hits("character", "character_search")
+            matched = filter_by_hits(st.session_state.characters, hits)
+            if hits is not None:
+                st.caption(f"{len(matched)}件が一致しました。")
+            for char in page_window(matched, "character_page"):
+                if hits is not None:
+                    st.markdown(hits[char['id']])
+                # 本文と削除ボタンは展開されたときにだけ描画する
+                entry = st.expander(f"👤 {char['name']}", key=f"character_entry_{char['id']}", on_change="rerun")
+                if not entry.open:
+                    continue
+                with entry:
+                    st.markdown(char['details'])
+                    if st.button("削除", key=f"del_char_{char['id']}", type="secondary"):
+                        st.session_state.characters.remove(char)
+                        storage.get_store().delete_asset(char)
+                        st.rerun()
+    with tab3:
+        # この機能はAIを使用しないため、モデル選択は不要
+        st.subheader("📈 キャラクターアーク設計")
+        if not st.session_state.characters:
+            st.warning("先に「キャラクター作成」タブでキャラクターを作成してください。")
+        else:
+            char_names = [c['name'] for c in st.session_state.characters]
+            arc_character = st.selectbox("対象キャラクター", char_names)
+            start_point = st.text_area("開始時点の状態", placeholder="物語開始時のキャラクターの状態、価値観、欠点など")
+            end_point = st.text_area("到達点", placeholder="物語終了時に到達すべき状態、成長した姿など")
+            key_events = st.text_area("成長のきっかけとなる重要イベント（箇条書き）", placeholder="例：\n- 師匠との出会い\n- ライバルへの敗北\n- 守るべきものができる")
+            if st.button("📈 成長アークを生成"):
+                with st.spinner("成長の軌跡を設計中..."):
+                    st.success(f"{arc_character}のキャラクターアークが設計されました！")
+                    st.markdown(f"#### {arc_character}の成長物語")
+                    st.write(f"**【序盤】** {start_point}")
+                    st.write("**【転機】**")
+                    st.code(key_events, language='markdown')
+                    st.write(f"**【終盤】** {end_point}")
+                    stages = ["序盤", "転機", "クライマックス", "終盤"]
+                    growth_values = [20, 50, 80, 100]
+                    fig = go.Figure(go.Scatter(x=stages, y=growth_values, mode='lines+markers', name='成長曲線', line=dict(color='royalblue', width=3), marker=dict(size=10)))
+                    fig.update_layout(title=f"{arc_character}の成長アーク", xaxis_title="物語の進行", yaxis_title="成長度", height=400)
+                    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,161 @@
+# --- 画面共通の処理 ---
+# APIキーとAI呼び出し、利用できるモデルの一覧、評価記録のエクスポートなど複数の画面で使うもの。
+# AI SDK はここでは読み込まず、最初にAIを呼び出したときに ai_clients が読み込む。
+
+import json
+import os
+
+import streamlit as st
+
+import ai_cache
+import ai_clients
+import ai_engine
+import ai_providers
+import page_store
+import storage
+from prompts import build_prompt
+
+# ★★★ モデル名変更箇所 1 ★★★
+# GeminiモデルのIDを最新のものに
+GEMINI_MODEL_ID = "gemini-2.0-flash"  #  <- ここを修正！
+
+# --- API設定と呼び出し関数 ---
+
+def api_key(provider):
+    # provider は "openai" / "google"。サイドバーの入力を環境変数より優先する
+    return st.session_state.get(f'{provider}_api_key') or os.getenv(f'{provider.upper()}_API_KEY')
+
+
+def openai_client():
+    # クライアント（と SDK の読み込み）は最初にAIを呼び出すときに作る。以降は ai_clients のプールから返る
+    openai_api_key = api_key('openai')
+    if not openai_api_key:
+        return None
+    try:
+        return ai_clients.get_openai_client(openai_api_key)
+    except Exception:
+        return None
+
+
+def gemini_model():
+    google_api_key = api_key('google')
+    if not google_api_key:
+        return None
+    try:
+        # ★★★ モデル名変更箇所 2 ★★★
+        return ai_clients.get_gemini_model(google_api_key, GEMINI_MODEL_ID)
+    except Exception as e:
+        # プレビューモデルでエラーが出た場合に備えて、エラーメッセージを具体的に表示
+        if "not found" in str(e).lower():
+             st.error(f"モデル '{GEMINI_MODEL_ID}' が見つかりません。APIキーがこのモデルへのアクセス権を持っているか確認してください。")
+        else:
+             st.error(f"Google Gemini APIの初期化に失敗: {e}")
+        return None
+
+
+def response_cache_options():
+    # サイドバーの「キャッシュを使用」がオフのときは読み込みだけをスキップし、新しい応答で上書きする
+    return {"cache": ai_cache.get_response_cache(), "read_cache": st.session_state.get('use_response_cache', True)}
+
+
+def ai_call_args(prompt_key):
+    # ワーカースレッドやバックグラウンドジョブに渡せるよう、セッション依存の設定をここで確定させる
+    return dict(
+        providers=ai_providers.build_providers(openai_client=openai_client(), gemini_model=gemini_model()),
+        prompt_key=prompt_key, **response_cache_options()
+    )
+
+
+def call_generative_ai(prompt_key, model, text_content="", images=None, stream=None, **kwargs):
+    # stream=None のときはサイドバーの「ストリーミング表示」設定に従う
+    prompt_text = build_prompt(prompt_key, text_content, **kwargs)
+    if stream is None:
+        stream = st.session_state.get('stream_responses', True)
+    call_args = ai_call_args(prompt_key)
+    try:
+        if not stream:
+            return ai_engine.generate(model, prompt_text, images, **call_args)
+        # 届いたチャンクを仮表示し、完了後は呼び出し元の通常表示に任せる
+        placeholder = st.empty()
+        response_text = ""
+        for chunk in ai_engine.stream_generate(model, prompt_text, images, **call_args):
+            response_text += chunk
+            placeholder.markdown(response_text + "▌")
+        placeholder.empty()
+        return response_text or None
+    except ai_engine.AIConfigError as e:
+        st.error(str(e))
+        return None
+    except Exception as e:
+        st.error(f"AIモデル ({model}) の呼び出し中にエラーが発生しました: {e}")
+        return None
+
+
+# ★★★ モデル名変更箇所 3 ★★★
+# UIの選択肢タプルを定義
+AVAILABLE_MODELS = ("gpt-4o", GEMINI_MODEL_ID)
+if ai_providers.MOCK_BACKEND_ENABLED:
+    # オフライン確認用のモックバックエンド (MANGA_PRO_MOCK_BACKEND=1)
+    AVAILABLE_MODELS += (ai_providers.MOCK_MODEL_ID,)
+
+
+def job_session_id():
+    # バックグラウンドジョブを投入したセッションの印。ジョブパネルには自分のセッションのジョブだけを表示する
+    return st.session_state.setdefault('job_session_id', storage.new_id())
+
+
+# --- 評価履歴のページ画像 ---
+# 履歴にはページIDのみを保存する。旧形式（image_data に base64 を直接保持）の記録にも対応する。
+def evaluation_page_count(result):
+    return len(result.get("page_ids", result.get("image_data", [])))
+
+def evaluation_page_images(result):
+    if "page_ids" in result:
+        return [page_store.thumbnail_data_url(page_id) for page_id in result["page_ids"]]
+    return [f"data:image/png;base64,{img_data}" for img_data in result.get("image_data", [])]
+
+def export_evaluation_record(result):
+    # エクスポート時にのみページ画像を base64 に展開する
+    record = dict(result)
+    if "page_ids" in record:
+        record["image_data"] = [page_store.get_page_b64(page_id) if page_store.has_page(page_id) else None for page_id in record["page_ids"]]
+    return record
+
+def evaluation_to_json(result):
+    return json.dumps(export_evaluation_record(result), ensure_ascii=False, indent=2)
+
+
+# --- 検索 ---
+def search_hits(kind, key):
+    """検索ボックスを表示し、入力があれば一致した {doc_id: スニペット} を関連度順に返す。未入力なら None"""
+    query = st.text_input("🔍 検索", key=key, placeholder="キーワードで絞り込み（スペース区切りで AND 検索）")
+    if not query.strip():
+        return None
+    return {hit["doc_id"]: hit["snippet"] for hit in storage.get_store().search(query, kind)}
+
+
+def filter_by_hits(items, hits):
+    """検索中は一致した項目だけを関連度順に返す"""
+    if hits is None:
+        return list(items)
+    rank = {doc_id: n for n, doc_id in enumerate(hits)}
+    return sorted((item for item in items if item.get("id") in rank), key=lambda item: rank[item["id"]])
+
+
+# --- ページ分け ---
+# 一覧は1ページ分だけ描画し、件数が増えても再実行のたびの描画量を一定に保つ
+PAGE_SIZE = 20
+
+
+def page_window(items, key, page_size=PAGE_SIZE):
+    """現在のページに表示する項目を返す。1ページに収まらないときはページ番号の入力欄を表示する"""
+    pages = max(1, -(-len(items) // page_size))
+    if pages == 1:
+        return items
+    # 削除や検索で件数が減ったときは最後のページに合わせる。
+    # セッション状態で値を変えるので value は渡さない（初期値は min_value の1ページ目）
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = pages
+    page = st.number_input(f"ページ（全{pages}ページ・{len(items)}件）", min_value=1, max_value=pages, key=key)
+    start = (page - 1) * page_size
+    return items[start:start + page_size]
@@ -0,0 +1,56 @@
+# --- ダッシュボード ---
+
+import streamlit as st
+
+import storage
+
+def render():
+    # ... (ダッシュボードのコード) ...
+    st.title("📊 プロジェクトダッシュボード")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("総プロジェクト", len(st.session_state.projects))
+    with col2:
+        active = len([p for p in st.session_state.projects if p.get('status') == '進行中'])
+        st.metric("進行中", active)
+    with col3:
+        # 締切インデックスから二分探索で数える（全タスクを走査しない）
+        st.metric("今週の締切", storage.get_store().deadlines().count_due_within(7))
+    with col4:
+        st.metric("チームメンバー", len(st.session_state.team_members))
+    st.subheader("📌 アクティブプロジェクト")
+    active_projects = [p for p in st.session_state.projects if p.get('status') == '進行中']
+    if active_projects:
+        for project in active_projects:
+            with st.expander(f"📖 {project['title']} - {project.get('genre', '未設定')}"):
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    st.write(f"**締切**: {project.get('deadline', '未設定')}")
+                    st.write(f"**担当**: {project.get('assignee', '未定')}")
+                    if 'tasks' in project and project['tasks']:
+                        completed = len([t for t in project['tasks'] if t.get('status') == '完了'])
+                        total = len(project['tasks'])
+                        progress = completed / total if total > 0 else 0
+                        st.progress(progress)
+                        st.caption(f"進捗: {progress*100:.0f}% ({completed}/{total}タスク)")
+                with col2:
+                    if st.button(f"詳細を見る", key=f"view_{project['title']}"):
+                        st.session_state.current_project_title = project['title']
+                        st.success(f"「{project['title']}」を選択しました。「スケジュール管理」メニューに移動して詳細を確認してください。")
+    else:
+        st.info("進行中のプロジェクトはありません")
+    st.subheader("⏰ 直近の締切")
+    next_deadlines = storage.get_store().deadlines().next_deadlines(5)
+    if next_deadlines:
+        project_titles = {p['id']: p['title'] for p in st.session_state.projects}
+        for task in next_deadlines:
+            st.write(f"• {task['end_date']:%m/%d} **{task['task_name']}** ({project_titles.get(task['project_id'], '不明')} / {task['assignee']})")
+    else:
+        st.write("未完了のタスクはありません")
+    st.subheader("📝 最近の活動")
+    activities = [f"「{p['title']}」が作成されました - {p.get('created_at', '日時不明')}" for p in st.session_state.projects[-5:]]
+    if activities:
+        for activity in reversed(activities):
+            st.write(f"• {activity}")
+    else:
+        st.write("まだ活動履歴がありません")
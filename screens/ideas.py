@@ -0,0 +1,120 @@
+# --- アイデア工房 ---
+
+from datetime import datetime
+
+import streamlit as st
+
+import similarity
+import storage
+from screens.common import AVAILABLE_MODELS, call_generative_ai, filter_by_hits, page_window, search_hits
+
+
+# --- 類似アイデア ---
+def similar_ideas(content=None, idea_id=None, duplicates_only=False):
+    """バンク内の似たアイデアを [(アイデア, 類似度)] で返す。idea_id を渡すとそのアイデア自身は除く"""
+    index = storage.get_store().similar_ideas()
+    by_id = {item['id']: item for item in st.session_state.idea_bank}
+    sig = similarity.signature(content if content is not None else by_id[idea_id]['content'])
+    matches = index.near_duplicates(sig, exclude=idea_id) if duplicates_only else index.most_similar(sig, exclude=idea_id)
+    return [(by_id[match_id], score) for match_id, score in matches if match_id in by_id]
+
+
+def duplicate_warning(content):
+    # 保存前に、ほぼ同じアイデアがバンクにあれば知らせる（保存するかどうかは利用者に任せる）
+    duplicates = similar_ideas(content, duplicates_only=True)
+    if duplicates:
+        names = "、".join(f"「{item['title']}」({score:.0%})" for item, score in duplicates)
+        st.warning(f"⚠️ バンクにほぼ同じ内容のアイデアがあります: {names}")
+
+def render():
+    st.title("💡 アイデア工房 - MangaMaster AI")
+    ai_model = st.selectbox("使用するAIモデル", AVAILABLE_MODELS, help="アイデア生成に使用するAIモデルを選択")
+    # ... (以降のロジックは変更なし)
+    tab1, tab2, tab3 = st.tabs(["クイック生成", "詳細生成", "アイデアバンク"])
+    with tab1:
+        st.subheader("クイックアイデア生成")
+        col1, col2 = st.columns(2)
+        with col1:
+            quick_genre = st.selectbox("ジャンル", ["ファンタジー", "SF", "恋愛", "ミステリー", "アクション"], key="q_genre")
+            quick_target = st.selectbox("ターゲット", ["少年向け", "少女向け", "青年向け", "女性向け"], key="q_target")
+        with col2:
+            quick_theme = st.text_input("テーマ/キーワード", placeholder="例：友情、成長、復讐", key="q_theme")
+            quick_length = st.selectbox("想定規模", ["読み切り", "短期連載", "長期連載"], key="q_length")
+        if st.button("💡 クイックアイデアを生成", type="primary"):
+            with st.spinner(f"{ai_model}が考案中..."):
+                response = call_generative_ai(
+                    "manga_master", model=ai_model,
+                    input_content=f"ジャンル: {quick_genre}, ターゲット: {quick_target}, テーマ: {quick_theme}, 想定規模: {quick_length}",
+                    requirements="斬新で商業的にも成功可能な漫画のアイデアを3つ、タイトル、あらすじ、主要キャラクター、セールスポイントを明確にして提案してください。"
+                )
+                if response: st.session_state.generated_content['idea'] = response
+        if 'idea' in st.session_state.generated_content:
+            st.markdown("---")
+            st.markdown(st.session_state.generated_content['idea'])
+            duplicate_warning(st.session_state.generated_content['idea'])
+            if st.button("🏦 このアイデアをバンクに保存", key="save_quick_idea"):
+                new_idea = {"title": f"クイックアイデア - {quick_genre}/{quick_theme}", "content": st.session_state.generated_content['idea'], "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")}
+                st.session_state.idea_bank.append(new_idea)
+                storage.get_store().add_asset("idea", new_idea)
+                st.success("アイデアをバンクに保存しました！")
+                del st.session_state.generated_content['idea']
+    with tab2:
+        st.subheader("詳細アイデア生成")
+        with st.form("detailed_idea_form"):
+            st.text("より詳細な要件を入力して、ユニークな物語を創造します。")
+            col1, col2 = st.columns(2)
+            with col1:
+                genre = st.text_input("ジャンル・サブジャンル", "例: サイバーパンク・ノワール")
+                setting = st.text_area("世界観・舞台設定", "例: 2242年のネオ・キョウト。企業が支配する巨大都市。")
+            with col2:
+                protagonist = st.text_area("主人公の設定", "例: 過去を失ったサイボーグ探偵。")
+                antagonist = st.text_area("敵役・障害", "例: 主人公を改造した巨大複合企業。")
+            plot_twist = st.text_input("物語に入れたい意外な展開", "例: ヒロインが実は敵のスパイだった。")
+            submitted = st.form_submit_button("🌟 詳細アイデアを生成", type="primary")
+            if submitted:
+                with st.spinner(f"{ai_model}が物語を構築中..."):
+                    response = call_generative_ai(
+                        "manga_master", model=ai_model,
+                        input_content=f"ジャンル: {genre}, 世界観: {setting}, 主人公: {protagonist}, 敵役: {antagonist}, 必須要素: {plot_twist}",
+                        requirements="上記の設定を元に、魅力的な連載漫画の第1話のあらすじと、今後の展開の可能性について詳細に提案してください。"
+                    )
+                    if response: st.session_state.generated_content['detailed_idea'] = response
+        if 'detailed_idea' in st.session_state.generated_content:
+            st.markdown("---")
+            st.markdown(st.session_state.generated_content['detailed_idea'])
+            duplicate_warning(st.session_state.generated_content['detailed_idea'])
+            if st.button("🏦 この詳細アイデアをバンクに保存", key="save_detailed_idea"):
+                 new_idea = {"title": f"詳細アイデア - {genre}", "content": st.session_state.generated_content['detailed_idea'], "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")}
+                 st.session_state.idea_bank.append(new_idea)
+                 storage.get_store().add_asset("idea", new_idea)
+                 st.success("アイデアをバンクに保存しました！")
+                 del st.session_state.generated_content['detailed_idea']
+    with tab3:
+        st.subheader("アイデアバンク")
+        if not st.session_state.idea_bank:
+            st.info("まだ保存されたアイデアはありません。")
+        else:
+            hits = search_hits("idea", "idea_search")
+            matched = filter_by_hits(st.session_state.idea_bank, hits)
+            if hits is not None:
+                st.caption(f"{len(matched)}件が一致しました。")
+            for item in page_window(matched, "idea_page"):
+                if hits is not None:
+                    st.markdown(hits[item['id']])
+                # 本文・類似アイデア・削除ボタンは展開されたときにだけ描画する
+                entry = st.expander(f"💡 {item['title']} ({item['created_at']})", key=f"idea_entry_{item['id']}", on_change="rerun")
+                if not entry.open:
+                    continue
+                with entry:
+                    st.markdown(item['content'])
+                    # 類似度の計算は、トグルが押されたアイデアについてだけ行う
+                    if st.toggle("🔗 似たアイデアを表示", key=f"similar_idea_{item['id']}"):
+                        similar = similar_ideas(idea_id=item['id'])
+                        for other, score in similar:
+                            st.caption(f"{score:.0%} 💡 {other['title']} ({other['created_at']})")
+                        if not similar:
+                            st.caption("似たアイデアは見つかりませんでした。")
+                    if st.button("削除", key=f"del_idea_{item['id']}", type="secondary"):
+                        st.session_state.idea_bank.remove(item)
+                        storage.get_store().delete_asset(item)
+                        st.rerun()
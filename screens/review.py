@@ -0,0 +1,561 @@
+# --- アイデア・原稿評価 ---
+# テキスト・原稿画像のAI評価と、評価スコアの推移・評価履歴の表示。
+
+import functools
+import os
+from datetime import datetime
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import ai_engine
+import archive
+import evaluation
+import jobs
+import page_raster
+import page_store
+import scores
+import storage
+from prompts import build_prompt
+from screens.common import (
+    AVAILABLE_MODELS, ai_call_args, call_generative_ai, evaluation_page_count, evaluation_page_images,
+    evaluation_to_json, filter_by_hits, job_session_id, page_window, search_hits,
+)
+
+EVALUATION_OPTIONS = {
+    "プロット / テキスト": {
+        "options": [
+            "コンセプトの魅力", "プロット構成の巧みさ", "キャラクターの深みと成長性",
+            "世界観の独創性", "台詞・ナレーションの質", "テーマの一貫性と訴求力",
+            "商業的ポテンシャル", "読者の引き込み力", "オリジナリティ", "論理的整合性"
+        ],
+        "defaults": ["コンセプトの魅力", "プロット構成の巧みさ", "キャラクターの深みと成長性"]
+    },
+    "ネーム（画像 / PDF）": {
+        "options": [
+            "コマ割りのリズムと視線誘導", "構図のダイナミズムと意図", "キャラクターの表情と感情表現",
+            "演出の斬新さ", "ページ全体の情報量", "台詞と絵の連携", "読者の引き込み",
+            "アクションシーンの迫力", "間の使い方", "ページめくりの演出", "背景の効果的な使用"
+        ],
+        "defaults": ["コマ割りのリズムと視線誘導", "構図のダイナミズムと意図", "キャラクターの表情と感情表現"]
+    },
+    "完成原稿（画像 / PDF）": {
+        "options": [
+            "全体的な画力と魅力", "線の質と表現力（強弱・入り抜き）", "トーンワークと陰影表現",
+            "背景の描き込みと世界観表現", "エフェクトや効果線の使い方", "キャラクターデザインの魅力",
+            "商業誌レベルの完成度", "色彩センス（カラーの場合）", "文字・写植の美しさ", "印刷適性"
+        ],
+        "defaults": ["全体的な画力と魅力", "線の質と表現力（強弱・入り抜き）", "トーンワークと陰影表現"]
+    }
+}
+EVALUATION_STYLES = {
+    "厳格な編集者": "商業誌の基準で厳しく評価し、プロレベルを求める",
+    "励ましの先輩": "良い点を多く見つけて励ましながら、建設的なアドバイスを提供",
+    "技術指導者": "具体的な技術面での改善点を詳細に指摘し、上達方法を提案",
+    "読者目線": "一般読者の視点から面白さや分かりやすさを重視して評価",
+    "新人賞審査員": "新人賞の審査基準で将来性とポテンシャルを重視して評価"
+}
+
+
+# --- アップロードファイルのページ化 ---
+def iter_uploaded_pages(uploaded_files):
+    # 画像/PDFのアップロードを (ページID, ページ情報) としてページ順に返す。PDFは並列に描画される
+    for uploaded_file in uploaded_files:
+        file_ext = os.path.splitext(uploaded_file.name)[1].lower()
+        if file_ext == ".pdf":
+            for i, page_id in page_raster.rasterize_pdf(uploaded_file.getvalue()):
+                yield page_id, f"{uploaded_file.name} - P.{i+1}"
+        elif file_ext in [".png", ".jpg", ".jpeg"]:
+            yield page_store.put_page(uploaded_file.getvalue()), uploaded_file.name
+
+def model_image_options():
+    return {
+        "max_edge": st.session_state.get('model_image_max_edge', page_store.MODEL_IMAGE_MAX_EDGE),
+        "quality": st.session_state.get('model_image_quality', page_store.MODEL_IMAGE_QUALITY),
+    }
+
+
+# --- 評価スコア ---
+def show_scores(score_map):
+    if score_map:
+        st.caption(" | ".join(f"**{criterion}** {score:g}" for criterion, score in score_map.items()))
+
+def project_selectbox(label, key):
+    # 評価をプロジェクトに紐づけると、スコアの推移をプロジェクト単位で見られる
+    project_titles = {project["id"]: project["title"] for project in st.session_state.projects}
+    return st.selectbox(label, [None, *project_titles], format_func=lambda pid: "（なし）" if pid is None else project_titles[pid], key=key)
+
+@st.cache_data(max_entries=16)
+def load_score_frame(revision, project_id=None):
+    # revision が変わったときだけ読み直す（点数はMarkdownを再解析せず、点数テーブルから読む）
+    frame = pd.DataFrame(storage.get_store().load_scores(project_id), columns=storage.SCORE_COLUMNS)
+    frame["evaluated_at"] = pd.to_datetime(frame["evaluated_at"])
+    return frame
+
+@st.cache_data(max_entries=16)
+def score_trend_figures(revision, project_id=None):
+    # 評価ごとの平均点の推移と、観点ごとの平均点。点数が無ければ None
+    score_frame = load_score_frame(revision, project_id)
+    if score_frame.empty:
+        return None
+    per_evaluation = score_frame.groupby(["evaluation_id", "evaluated_at", "model", "type"], as_index=False)["score"].mean()
+    trend = px.line(per_evaluation.sort_values("evaluated_at"), x="evaluated_at", y="score", color="model", symbol="type", markers=True,
+                    labels={"evaluated_at": "評価日時", "score": "平均点", "model": "モデル", "type": "種類"}, range_y=[0.5, 5.5])
+    per_criterion = score_frame.groupby("criterion", as_index=False)["score"].agg(["mean", "count"]).sort_values("mean")
+    criteria = px.bar(per_criterion, x="mean", y="criterion", orientation="h", hover_data=["count"],
+                      labels={"mean": "平均点", "criterion": "観点", "count": "件数"}, range_x=[0, 5])
+    return trend, criteria
+
+# --- 評価履歴 ---
+# プロジェクトの切り替えや履歴1件ごとの操作では、そのフラグメントだけを再実行する
+@st.fragment
+def score_trend_panel():
+    trend_project_id = project_selectbox("プロジェクト", key="score_trend_project")
+    figures = score_trend_figures(storage.get_store().revision(), trend_project_id)
+    if figures is None:
+        st.info("集計できる点数がありません。")
+    else:
+        for fig in figures:
+            st.plotly_chart(fig, use_container_width=True)
+    if st.button("🔄 過去の評価から点数を抽出", help="点数の記録がない過去の評価の本文（★評価）から点数を読み取ります。"):
+        updated = evaluation.backfill_scores(st.session_state.evaluation_results)
+        st.toast(f"{updated}件の評価から点数を抽出しました。")
+        st.rerun()
+
+@st.fragment
+def history_entry(result):
+    icon = "📋" if result["type"] == "全体評価" else "📖"
+    entry_key = result['id']
+    # 本文・画像・ダウンロードは展開されたときにだけ描画する
+    entry = st.expander(f"{icon} {result['type']} - {result['timestamp']} (by {result.get('model', 'N/A')})", key=f"history_entry_{entry_key}", on_change="rerun")
+    if not entry.open:
+        return
+    with entry:
+        # 画像はタブが開かれたときにだけ読み込む
+        tab1, tab2 = st.tabs(["📝 評価結果", "🖼️ 評価対象コンテンツ"], key=f"history_tabs_{entry_key}", on_change="rerun")
+
+        with tab1:
+            if result["type"] == "全体評価":
+                st.markdown(f"**評価スタイル**: {result['evaluation_style']} | **詳細度**: {result['detail_level']}")
+                st.markdown(f"**評価観点**: {', '.join(result['evaluation_points'])}")
+                st.markdown("---")
+                show_scores(result.get("scores"))
+                st.markdown(result['result'])
+                if result.get("chunk_results"):
+                    with st.popover(f"🧩 パートごとの部分評価 ({len(result['chunk_results'])}パート)"):
+                        for chunk_res in result["chunk_results"]:
+                            st.markdown(f"**{chunk_res['label']}**")
+                            st.markdown(chunk_res["result"])
+                            st.divider()
+            elif result["type"] == "ページ別評価":
+                st.markdown(f"**評価ページ数**: {len(result['page_results'])} / {evaluation_page_count(result)}")
+                st.markdown(f"**評価観点**: {', '.join(result['evaluation_points'])}")
+                if result.get('focus_areas'): st.markdown(f"**注目要素**: {result['focus_areas']}")
+                st.markdown("---")
+                for page_res in result['page_results']:
+                    with st.container():
+                        st.subheader(f"📄 {page_res['page_number']}ページ目")
+                        if page_res.get("reused_from"):
+                            # reused_match のない古い記録は、知覚ハッシュが近いだけのページを再利用していることがある
+                            match = evaluation.REUSED_MATCH_LABELS.get(page_res.get("reused_match"))
+                            st.caption(f"♻️ 前回の評価を再利用（{match}）" if match else "♻️ 前回の評価を再利用")
+                        show_scores(page_res.get("scores"))
+                        st.markdown(page_res['result'])
+                        st.divider()
+
+        with tab2:
+            if tab2.open:
+                st.markdown("**評価時に使用されたコンテンツ**")
+                if result.get("text_content"):
+                    st.text_area("テキストコンテンツ", result["text_content"], height=150, disabled=True, key=f"history_text_{entry_key}")
+
+                image_list = evaluation_page_images(result)
+                if image_list:
+                    evaluated_indices = result.get("evaluated_indices", []) if result['type'] == 'ページ別評価' else list(range(len(image_list)))
+
+                    st.write(f"画像コンテンツ ({len(image_list)}ページ)")
+                    cols = st.columns(min(6, len(image_list)))
+                    for j, img_url in enumerate(image_list):
+                        caption = f"P.{j+1}"
+                        use_border = j in evaluated_indices
+                        if img_url is None:
+                            cols[j % 6].caption(f"{caption} (画像が見つかりません)")
+                            continue
+
+                        # 評価対象ページに枠線をつける
+                        if use_border:
+                            cols[j % 6].markdown(f'<div style="border: 2px solid #ff4b4b; padding: 2px; border-radius: 5px; text-align: center;">', unsafe_allow_html=True)
+                            cols[j % 6].image(img_url, width=100)
+                            cols[j % 6].caption(caption)
+                            cols[j % 6].markdown('</div>', unsafe_allow_html=True)
+                        else:
+                            with cols[j % 6]:
+                                st.image(img_url, width=100)
+                                st.caption(caption)
+
+        st.divider()
+        d_col1, d_col2 = st.columns(2)
+        with d_col1:
+            # JSONはダウンロードボタンが押されたときにだけ生成する
+            st.download_button(
+                label="📄 この評価をダウンロード",
+                data=functools.partial(evaluation_to_json, result),
+                file_name=f"evaluation_{result['type'].replace(' ', '_')}_{result['timestamp'].replace(':', '-').replace(' ', '_')}.json",
+                mime="application/json",
+                key=f"download_hist_{entry_key}"
+            )
+        with d_col2:
+            if st.button("🗑️ この評価を削除", key=f"del_hist_{entry_key}", type="secondary"):
+                original_index = -1
+                for idx, item in enumerate(st.session_state.evaluation_results):
+                    if item['id'] == result['id']:
+                        original_index = idx
+                        break
+                if original_index != -1:
+                    st.session_state.evaluation_results.pop(original_index)
+                storage.get_store().delete_evaluation(result)
+                # 件数や一覧が変わるため、履歴画面全体を描画し直す
+                st.rerun()
+
+
+def render():
+    st.title("✍️ 強化版アイデア・原稿評価システム")
+    st.info("📝 テキスト、🖼️ 画像、📄 PDFファイルをアップロードして、プロ編集者レベルのAI評価を受けましょう。")
+    
+    ai_model = st.selectbox("使用するAIモデル", AVAILABLE_MODELS, key="eval_model")
+    # ... (以降の評価ロジックは変更なし)
+    evaluation_mode = st.radio(
+        "評価モードを選択",
+        ["📋 全体評価", "📖 ページ別詳細評価", "📊 評価履歴"],
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+
+    if evaluation_mode == "📋 全体評価":
+        st.header("📋 全体評価")
+        with st.expander("⚙️ 評価設定", expanded=True):
+            col1, col2 = st.columns(2)
+            with col1:
+                eval_type = st.selectbox("評価対象の種類", ["プロット / テキスト", "ネーム（画像 / PDF）", "完成原稿（画像 / PDF）"])
+                evaluation_style_key = st.selectbox("評価者のスタイル", list(EVALUATION_STYLES.keys()), help="評価者の視点とトーンを選択してください")
+                evaluation_style = EVALUATION_STYLES[evaluation_style_key]
+                detail_level = st.select_slider("評価の詳細度", options=["簡潔", "標準", "詳細", "徹底"], value="標準")
+            with col2:
+                current_eval_points = EVALUATION_OPTIONS[eval_type]
+                selected_eval_points = st.multiselect("評価の観点（複数選択可）", current_eval_points["options"], default=current_eval_points["defaults"])
+                special_instructions = st.text_area("特別な指示・注目点", placeholder="例：初心者向けのアドバイス重視、商業性を特に重視、など", height=100)
+                eval_project_id = project_selectbox("関連プロジェクト（任意）", key="eval_project")
+
+        file_types = {"プロット / テキスト": ["txt", "md"], "ネーム（画像 / PDF）": ["png", "jpg", "jpeg", "pdf"], "完成原稿（画像 / PDF）": ["png", "jpg", "jpeg", "pdf"]}
+        uploaded_files = st.file_uploader(f"📁 評価したい「{eval_type}」ファイルをアップロード（複数可）", type=file_types[eval_type], accept_multiple_files=True)
+
+        if uploaded_files:
+            text_content, page_ids = "", []
+            st.markdown("---")
+            st.subheader("📖 アップロードされた内容のプレビュー")
+            for uploaded_file in uploaded_files:
+                if os.path.splitext(uploaded_file.name)[1].lower() in [".txt", ".md"]:
+                    content = uploaded_file.getvalue().decode("utf-8")
+                    text_content += f"\n\n--- ファイル: {uploaded_file.name} ---\n{content}"
+
+            if text_content:
+                with st.expander("📝 テキスト内容を表示"):
+                    st.text_area("読み込まれたテキスト", text_content, height=200, disabled=True)
+
+            # ページは描画できたものから順にプレビューに追加する
+            preview_title = st.empty()
+            preview_cols = st.columns(6)
+            with st.spinner("ファイルを処理中..."):
+                for page_id, _ in iter_uploaded_pages(uploaded_files):
+                    preview_cols[len(page_ids) % 6].image(page_store.thumbnail_data_url(page_id), caption=f"P.{len(page_ids)+1}", width=120)
+                    page_ids.append(page_id)
+                    preview_title.write(f"🖼️ **画像プレビュー** (読み込み中... {len(page_ids)}ページ)")
+            if page_ids:
+                preview_title.write(f"🖼️ **画像プレビュー** ({len(page_ids)}ページ)")
+
+            overall_prompt_args = dict(
+                content_type=eval_type, evaluation_points=", ".join(selected_eval_points),
+                detail_level=detail_level, evaluation_style=evaluation_style,
+                special_instructions=special_instructions, page_count=len(page_ids),
+                evaluation_format="評価は総合評価、良い点、改善点、具体的な提案、総括の5つの項目で構成してください。",
+                page_specific_format=""
+            )
+            # 長い原稿は1回のリクエストに収まらないため、既定で分割評価にする
+            use_chunks = st.checkbox(
+                "🧩 分割して評価（長い原稿向け）", value=evaluation.needs_chunking(text_content, page_ids), key="overall_chunked",
+                help=f"{evaluation.CHUNK_PAGES}ページ / {evaluation.CHUNK_TEXT_CHARS}文字ごとのパートに分けて並列に評価し、最後に1つの評価へ統合します。"
+            )
+            if use_chunks:
+                chunk_col1, chunk_col2 = st.columns(2)
+                with chunk_col1:
+                    pages_per_chunk = st.slider("1パートあたりのページ数", 1, 20, evaluation.CHUNK_PAGES, key="overall_chunk_pages")
+                with chunk_col2:
+                    chunk_concurrency = st.slider("同時評価パート数", 1, ai_engine.MAX_PAGE_CONCURRENCY, ai_engine.DEFAULT_PAGE_CONCURRENCY, key="overall_chunk_concurrency")
+                chunks = evaluation.split_manuscript(text_content, page_ids, pages_per_chunk)
+                st.caption(f"{len(chunks)}パートに分けて評価し、統合評価を作成します（AI呼び出し {len(chunks) + 1}回）。")
+            run_in_background = st.checkbox("🕒 バックグラウンドで実行", value=True, key="overall_background", help="メニューを移動しても評価を続け、完了後に評価履歴へ保存します。")
+            if st.button(f"🤖 AI({ai_model})による「{eval_type}」の全体評価を開始", type="primary", use_container_width=True):
+                result = {
+                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "type": "全体評価",
+                    "model": ai_model, "content_type": eval_type, "evaluation_style": evaluation_style_key,
+                    "detail_level": detail_level, "evaluation_points": selected_eval_points,
+                    "result": None, "text_content": text_content, "page_ids": page_ids, "project_id": eval_project_id
+                }
+                if use_chunks and run_in_background:
+                    jobs.get_job_queue().submit(
+                        "overall_evaluation", f"🧩 分割評価 - {eval_type} ({len(page_ids)}ページ, {len(chunks)}パート)", evaluation.run_chunked_evaluation_job,
+                        ai_model, chunks, overall_prompt_args, model_image_options(), ai_call_args("manuscript_evaluator"), chunk_concurrency, result,
+                        session_id=job_session_id()
+                    )
+                    st.success("🕒 バックグラウンドで評価を開始しました。進捗はサイドバーの「実行中ジョブ」で確認でき、完了すると評価履歴に保存されます。")
+                elif use_chunks:
+                    chunk_worker = functools.partial(evaluation.generate_for_pages, ai_model, image_options=model_image_options(), **ai_call_args("manuscript_evaluator"))
+                    chunk_results = {}
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
+                    status_text.text(f"🔍 {len(chunks)}パートを最大{chunk_concurrency}並列で評価中...")
+                    for done, (chunk_idx, chunk_result, error) in enumerate(ai_engine.evaluate_concurrently(evaluation.chunk_evaluation_jobs(chunks, overall_prompt_args), chunk_worker, max_workers=chunk_concurrency), start=1):
+                        if isinstance(error, ai_engine.AIConfigError):
+                            st.error(str(error))
+                            break
+                        elif error:
+                            st.error(f"パート「{chunks[chunk_idx]['label']}」の評価中にエラーが発生しました ({ai_model}): {error}")
+                        elif chunk_result:
+                            chunk_results[chunk_idx] = chunk_result
+                        progress_bar.progress(done / (len(chunks) + 1))
+                        status_text.text(f"🔍 評価中... ({done}/{len(chunks)}パート完了)")
+                    if chunk_results:
+                        status_text.text("🧩 部分評価を統合中...")
+                        response = call_generative_ai("manuscript_reducer", model=ai_model, **evaluation.reducer_prompt_args(chunks, chunk_results, overall_prompt_args))
+                        progress_bar.progress(1.0)
+                        status_text.empty()
+                        if response:
+                            result["result"] = response
+                            result["chunk_results"] = [{"label": chunks[i]["label"], "result": chunk_results[i]} for i in sorted(chunk_results)]
+                            evaluation.save_evaluation(result)
+                            st.session_state.evaluation_results.append(result)
+                            st.markdown("---")
+                            st.subheader("📊 AI編集者からの総合評価")
+                            show_scores(result.get("scores"))
+                            st.markdown(result["result"])
+                            with st.expander(f"🧩 パートごとの部分評価 ({len(chunk_results)}パート)"):
+                                for chunk_res in result["chunk_results"]:
+                                    st.markdown(f"**{chunk_res['label']}**")
+                                    st.markdown(chunk_res["result"])
+                                    st.divider()
+                            st.success("✅ 評価完了！評価履歴に保存されました。")
+                elif run_in_background:
+                    jobs.get_job_queue().submit(
+                        "overall_evaluation", f"📋 全体評価 - {eval_type} ({len(page_ids)}ページ)", evaluation.run_overall_evaluation_job,
+                        ai_model, build_prompt("manuscript_evaluator", text_content, **overall_prompt_args),
+                        page_ids, model_image_options(), ai_call_args("manuscript_evaluator"), result,
+                        session_id=job_session_id()
+                    )
+                    st.success("🕒 バックグラウンドで評価を開始しました。進捗はサイドバーの「実行中ジョブ」で確認でき、完了すると評価履歴に保存されます。")
+                else:
+                    with st.spinner(f"🔍 AI編集者が総合的に評価中..."):
+                        response = call_generative_ai(
+                            "manuscript_evaluator", model=ai_model, text_content=text_content,
+                            images=[page_store.get_model_image_part(page_id, **model_image_options()) for page_id in page_ids],
+                            **overall_prompt_args
+                        )
+                        if response:
+                            result["result"] = response
+                            evaluation.save_evaluation(result)
+                            st.session_state.evaluation_results.append(result)
+                            st.markdown("---")
+                            st.subheader("📊 AI編集者からの総合評価")
+                            show_scores(result.get("scores"))
+                            st.markdown(result["result"])
+                            st.success("✅ 評価完了！評価履歴に保存されました。")
+
+    elif evaluation_mode == "📖 ページ別詳細評価":
+        st.header("📖 ページ別詳細評価")
+        with st.expander("⚙️ ページ別評価設定", expanded=True):
+            col1, col2 = st.columns(2)
+            with col1:
+                page_eval_type = st.selectbox("評価対象", ["ネーム（画像 / PDF）", "完成原稿（画像 / PDF）"], key="page_eval_type")
+                page_eval_points = st.multiselect("ページ評価の観点", EVALUATION_OPTIONS[page_eval_type]["options"], default=EVALUATION_OPTIONS[page_eval_type]["defaults"], key="page_eval_points")
+                page_project_id = project_selectbox("関連プロジェクト（任意）", key="page_eval_project")
+            with col2:
+                focus_areas = st.text_area("特に注目したい要素", placeholder="例：アクションシーンの迫力、キャラクターの表情など", height=100, key="page_focus_areas")
+                page_concurrency = st.slider("同時評価ページ数", 1, ai_engine.MAX_PAGE_CONCURRENCY, ai_engine.DEFAULT_PAGE_CONCURRENCY, key="page_concurrency", help="複数ページを並列でAIに送信します。APIのレート制限に当たる場合は小さくしてください。")
+                # 上限はモデルの画像枚数・出力長から決まる
+                max_batch_size = ai_engine.max_page_batch_size(ai_model)
+                page_batch_size = 1
+                if max_batch_size > 1 and st.checkbox("📦 複数ページをまとめて評価（バッチモード）", value=False, key="page_batched", help="1回のリクエストで複数ページを評価し、共通の指示文の送信を減らします。ページ数の多い原稿で時間とトークンを節約できます。"):
+                    page_batch_size = st.slider("1リクエストあたりのページ数", 2, max_batch_size, max_batch_size, key="page_batch_size")
+                eval_all_pages = st.checkbox("全ページを一括評価", value=True, key="eval_all")
+                eval_page_range = ""
+                if not eval_all_pages:
+                    eval_page_range = st.text_input("評価ページ指定", placeholder="例: 1,3,5-7", help="カンマ区切り、ハイフンで範囲指定", key="page_range")
+
+        uploaded_files_page = st.file_uploader("📁 ページ別評価用のファイル（画像/PDF）をアップロード", type=["png", "jpg", "jpeg", "pdf"], accept_multiple_files=True)
+
+        if uploaded_files_page:
+            page_ids_page, page_info_list = [], []
+            load_status = st.empty()
+            with st.spinner("ファイルを処理中..."):
+                for page_id, page_info in iter_uploaded_pages(uploaded_files_page):
+                    page_ids_page.append(page_id)
+                    page_info_list.append(page_info)
+                    load_status.text(f"📄 {len(page_ids_page)}ページ読み込み済み...")
+            load_status.empty()
+            
+            st.info(f"✅ {len(page_ids_page)}ページの読み込みが完了しました。")
+            
+            pages_to_evaluate_indices = []
+            if eval_all_pages:
+                pages_to_evaluate_indices = list(range(len(page_ids_page)))
+            elif eval_page_range:
+                try:
+                    for part in eval_page_range.split(','):
+                        if '-' in part:
+                            start, end = map(int, part.split('-'))
+                            pages_to_evaluate_indices.extend(range(start - 1, min(end, len(page_ids_page))))
+                        else:
+                            pages_to_evaluate_indices.append(int(part) - 1)
+                    pages_to_evaluate_indices = sorted(list(set(p for p in pages_to_evaluate_indices if 0 <= p < len(page_ids_page))))
+                except ValueError:
+                    st.error("ページ指定の形式が正しくありません。")
+
+            # 前回の評価（同じプロジェクト/ファイル・同じ観点）があれば、変更のないページの結果を再利用する
+            reused_results = {}
+            previous_evaluation = evaluation.find_previous_evaluation(st.session_state.evaluation_results, page_project_id, page_info_list, page_eval_points)
+            if previous_evaluation and pages_to_evaluate_indices:
+                page_diffs = evaluation.diff_pages(page_ids_page, previous_evaluation)
+                status_counts = {label: sum(1 for d in page_diffs if d["status"] == status) for status, label in evaluation.PAGE_STATUS_LABELS.items()}
+                st.info(f"🔁 前回の評価 ({previous_evaluation['timestamp']}, {previous_evaluation.get('model', 'N/A')}) と比較: " + " / ".join(f"{label} {count}" for label, count in status_counts.items()))
+                reuse_unchanged = st.checkbox("♻️ 変更のないページは前回の評価を再利用", value=True, key="page_incremental", help="画像が前回と完全に同じページは評価せず、変更・追加されたページだけをAIに送ります。")
+                reuse_similar = st.checkbox("≈ 小さな変更のページも前回の評価を再利用", value=False, key="page_incremental_similar", disabled=not reuse_unchanged,
+                                            help="見た目の近いページです。吹き出しの追加やコマの描き直しもここに含まれることがあるため、通常は評価し直してください。")
+                if reuse_unchanged:
+                    reused_results = evaluation.reused_page_results(previous_evaluation, page_diffs, pages_to_evaluate_indices, page_info_list, include_similar=reuse_similar)
+                with st.expander("🔍 前回からの差分"):
+                    changed_indices = [i for i, d in enumerate(page_diffs) if d["status"] != "unchanged"]
+                    if not changed_indices:
+                        st.write("変更されたページはありません。")
+                    for page_idx in changed_indices:
+                        diff = page_diffs[page_idx]
+                        d_col1, d_col2, d_col3 = st.columns([1, 1, 2])
+                        d_col1.markdown(f"**P.{page_idx + 1}** {evaluation.PAGE_STATUS_LABELS[diff['status']]}")
+                        previous_page_ids = previous_evaluation["page_ids"]
+                        if diff["previous_index"] is not None and page_store.has_page(previous_page_ids[diff["previous_index"]]):
+                            d_col2.image(page_store.thumbnail_data_url(previous_page_ids[diff["previous_index"]]), caption="前回", width=100)
+                        d_col3.image(page_store.thumbnail_data_url(page_ids_page[page_idx]), caption="今回", width=100)
+
+            if pages_to_evaluate_indices:
+                indices_to_call = [page_idx for page_idx in pages_to_evaluate_indices if page_idx not in reused_results]
+                st.write(f"**評価対象**: {len(pages_to_evaluate_indices)}ページ ({', '.join(map(lambda x: str(x+1), pages_to_evaluate_indices))})")
+                if reused_results:
+                    st.write(f"**AIに送るページ**: {len(indices_to_call)}ページ ({', '.join(str(i + 1) for i in indices_to_call) or 'なし'}) / 前回の評価を再利用: {len(reused_results)}ページ")
+                run_in_background = st.checkbox("🕒 バックグラウンドで実行", value=True, key="page_background", help="メニューを移動しても評価を続け、完了後に評価履歴へ保存します。")
+                if st.button(f"🔍 {len(pages_to_evaluate_indices)}ページの個別評価を({ai_model})で開始", type="primary", use_container_width=True):
+                    total_pages = len(indices_to_call)
+                    page_evaluations = dict(
+                        model=ai_model, page_ids=page_ids_page, page_indices=indices_to_call,
+                        prompt_args=evaluation.page_prompt_args(page_eval_points, focus_areas),
+                        image_options=model_image_options(), call_args=ai_call_args("page_evaluator"),
+                        concurrency=page_concurrency, batch_size=page_batch_size
+                    )
+                    full_result = {
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "type": "ページ別評価",
+                        "model": ai_model, "content_type": page_eval_type,
+                        "evaluation_points": page_eval_points, "focus_areas": focus_areas,
+                        "page_results": list(reused_results.values()), "page_ids": page_ids_page,
+                        "evaluated_indices": pages_to_evaluate_indices, "project_id": page_project_id,
+                        "page_infos": page_info_list, "page_hashes": evaluation.page_hashes(page_ids_page)
+                    }
+
+                    if not indices_to_call:
+                        # すべてのページが前回から変わっていなければ、AIを呼ばずに保存する
+                        full_result["page_results"] = sorted(full_result["page_results"], key=lambda r: r["page_number"])
+                        evaluation.save_evaluation(full_result)
+                        st.session_state.evaluation_results.append(full_result)
+                        st.success("♻️ 変更されたページがないため、前回の評価を再利用して履歴に保存しました。")
+                    elif run_in_background:
+                        jobs.get_job_queue().submit(
+                            "page_evaluation", f"📖 ページ別評価 - {page_info_list[pages_to_evaluate_indices[0]]} ほか ({total_pages}ページ)",
+                            evaluation.run_page_evaluation_job, page_evaluations, page_info_list, full_result,
+                            session_id=job_session_id()
+                        )
+                        st.success("🕒 バックグラウンドで評価を開始しました。進捗はサイドバーの「実行中ジョブ」で確認でき、完了すると評価履歴に保存されます。")
+                    else:
+                        st.markdown("---")
+                        st.subheader("📖 ページ別詳細評価結果")
+                        page_results = list(reused_results.values())
+                        if reused_results:
+                            st.caption(f"♻️ {len(reused_results)}ページは前回の評価を再利用しました（評価履歴で確認できます）。")
+                        progress_bar = st.progress(0)
+                        status_text = st.empty()
+                        status_text.text(f"🔍 {total_pages}ページを最大{page_concurrency}並列で評価中...")
+
+                        # 完了した順に結果を表示（表示順は前後するが、各結果にページ番号を付ける）
+                        for done, (page_idx, result, error) in enumerate(evaluation.iter_page_evaluations(**page_evaluations), start=1):
+                            if isinstance(error, ai_engine.AIConfigError):
+                                st.error(str(error))
+                                break
+                            elif error:
+                                st.error(f"{page_idx + 1}ページ目の評価中にエラーが発生しました ({ai_model}): {error}")
+                            elif result:
+                                page_results.append({"page_number": page_idx + 1, "page_info": page_info_list[page_idx], "result": result})
+                                with st.expander(f"📄 **{page_idx + 1}ページ目** の評価結果", expanded=True):
+                                    col1, col2 = st.columns([1, 2])
+                                    with col1:
+                                        st.image(page_store.page_data_url(page_ids_page[page_idx]), caption=page_info_list[page_idx])
+                                    with col2:
+                                        page_text, page_scores = scores.extract_scores(result)
+                                        show_scores(page_scores)
+                                        st.markdown(page_text)
+                            progress_bar.progress(done / total_pages)
+                            status_text.text(f"🔍 評価中... ({done}/{total_pages}ページ完了, 直近: {page_idx + 1}ページ目)")
+
+                        status_text.success("✅ 全ページの評価が完了しました！")
+                        if page_results:
+                            full_result["page_results"] = sorted(page_results, key=lambda r: r["page_number"])
+                            evaluation.save_evaluation(full_result)
+                            st.session_state.evaluation_results.append(full_result)
+                            st.success("評価結果を履歴に保存しました。")
+            else:
+                st.warning("評価対象のページがありません。設定を確認してください。")
+
+    elif evaluation_mode == "📊 評価履歴":
+        st.header("📊 評価履歴")
+        if not st.session_state.evaluation_results:
+            st.info("まだ評価履歴がありません。「全体評価」または「ページ別詳細評価」を実行してください。")
+        else:
+            filtered_results = sorted(st.session_state.evaluation_results, key=lambda x: x["timestamp"], reverse=True)
+            
+            st.write(f"総評価数: {len(filtered_results)}件")
+            
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                if st.button("🗑️ 全履歴を削除", type="secondary"):
+                    st.session_state.evaluation_results = []
+                    storage.get_store().clear_evaluations()
+                    st.rerun()
+            with col2:
+                # ZIP（評価の NDJSON とページ画像）はダウンロードボタンが押されたときにだけ生成する
+                st.download_button(
+                    label="📤 全履歴をZIPでエクスポート",
+                    data=functools.partial(archive.archive_file, ["evaluations"]),
+                    file_name=f"manga_pro_evaluation_history_{datetime.now().strftime('%Y%m%d')}.zip",
+                    mime="application/zip",
+                    use_container_width=True
+                )
+
+            with st.expander("📈 スコアの推移"):
+                score_trend_panel()
+            
+            st.divider()
+
+            # 検索中は一致した評価だけを関連度順に表示する（削除・エクスポートは全履歴が対象）
+            hits = search_hits("evaluation", "history_search")
+            matched = filter_by_hits(filtered_results, hits)
+            if hits is not None:
+                st.caption(f"{len(matched)}件が一致しました。")
+            for result in page_window(matched, "history_page"):
+                if hits is not None:
+                    st.markdown(hits[result['id']])
+                history_entry(result)
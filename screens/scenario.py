@@ -0,0 +1,27 @@
+# --- シナリオ作成 ---
+
+import streamlit as st
+
+from screens.common import AVAILABLE_MODELS, call_generative_ai
+
+def render():
+    st.title("📝 シナリオ作成工房")
+    ai_model = st.selectbox("使用するAIモデル", AVAILABLE_MODELS)
+    # ... (以降のロジックは変更なし)
+    with st.form("scenario_form"):
+        st.info("物語の骨子となる情報を入力し、具体的なシーンのシナリオを生成します。")
+        scenario_base = st.text_area("シナリオのベースとなるプロットや状況", height=150, placeholder="例：主人公のアキラが、長年追い求めていた伝説の剣をついに発見するシーン。しかし、そこにはライバルのカイトも現れる。")
+        scene_details = st.text_area("シーンの詳細や演出の要望", height=100, placeholder="例：洞窟の奥深く、剣は台座に突き刺さり青白い光を放っている。アキラとカイトの緊張感のある対峙を強調してほしい。")
+        submitted = st.form_submit_button("📜 シナリオを生成", type="primary")
+        if submitted:
+            with st.spinner(f"{ai_model}が執筆中..."):
+                response = call_generative_ai(
+                    "scenario_writer", model=ai_model,
+                    scenario_base=scenario_base, scene_details=scene_details
+                )
+                if response:
+                    st.session_state.generated_content['scenario'] = response
+    if 'scenario' in st.session_state.generated_content:
+        st.markdown("---")
+        st.subheader("生成されたシナリオ")
+        st.markdown(st.session_state.generated_content['scenario'])
@@ -0,0 +1,210 @@
+# --- スケジュール管理 ---
+# ガントチャート・進捗グラフとタスク管理。日程の再計算は scheduler に任せる。
+
+import functools
+from datetime import datetime
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+import scheduler
+import storage
+
+TASK_STATUS_OPTIONS = ["未着手", "進行中", "完了", "保留"]
+PROGRESS_BAR_COLORS = {'完了': '#28a745', '進行中': '#ffc107', '未着手': '#6c757d'}
+
+def task_frame(tasks):
+    # 必要な列だけを列ごとに集めて DataFrame にする（日付は書式を指定して一括で変換する）
+    df = pd.DataFrame({field: [t.get(field) for t in tasks] for field in ("task_name", "assignee", "start_date", "end_date", "status")})
+    df['Start'] = pd.to_datetime(df['start_date'], format="%Y-%m-%d")
+    df['Finish'] = pd.to_datetime(df['end_date'], format="%Y-%m-%d")
+    return df
+
+def task_status_counts(df):
+    return df['status'].fillna('未着手').value_counts().reindex(TASK_STATUS_OPTIONS, fill_value=0)
+
+def create_gantt_chart(df):
+    if df.empty: return None
+    fig = px.timeline(df, x_start="Start", x_end="Finish", y="task_name", color="assignee", title="プロジェクトスケジュール", labels={"task_name": "タスク", "assignee": "担当者"})
+    fig.update_yaxes(categoryorder="total ascending"); fig.update_layout(height=max(400, len(df) * 30))
+    return fig
+
+def create_progress_chart(df):
+    if df.empty: return None
+    counts = task_status_counts(df)
+    fig = go.Figure(data=[go.Bar(name=status, x=['進捗'], y=[int(counts[status])], marker_color=color) for status, color in PROGRESS_BAR_COLORS.items()])
+    fig.update_layout(barmode='stack', title='タスク進捗状況', yaxis_title='タスク数', height=300)
+    return fig
+
+# task_version はタスクの追加・変更・削除のたびに storage が進める。タスク一覧そのものはハッシュしない
+@st.cache_data(max_entries=32)
+def schedule_charts(project_id, task_version, _tasks):
+    df = task_frame(_tasks)
+    return create_gantt_chart(df), create_progress_chart(df)
+
+def project_scheduler(project):
+    # 自分の書き込みではこのスケジューラを差分で更新し続け、別セッションの変更を読み込んだときだけ作り直す
+    cached = st.session_state.setdefault('schedulers', {}).get(project['id'])
+    if cached is None or cached[0] is not project['tasks'] or cached[1] != project.get('task_version', 0):
+        sched = scheduler.Scheduler(project['tasks'], project_start=project.get('created_at', '')[:10], deadline=project.get('deadline'))
+        cached = remember_scheduler(project, sched)
+    return cached[2]
+
+def remember_scheduler(project, sched):
+    st.session_state.schedulers[project['id']] = (project['tasks'], project.get('task_version', 0), sched)
+    return st.session_state.schedulers[project['id']]
+
+def save_scheduled_tasks(project, sched, task_ids):
+    # 変更したタスクと、日程が動いた後続タスクだけを書き込む
+    storage.get_store().save_tasks(project, [sched.tasks[task_id] for task_id in task_ids])
+    remember_scheduler(project, sched)
+
+def set_task_status(project, task, key):
+    sched = project_scheduler(project)
+    task['status'] = st.session_state[key]
+    save_scheduled_tasks(project, sched, {task['id'], *sched.update(task['id'])})
+
+def remove_task(project, task):
+    sched = project_scheduler(project)
+    changed = sched.remove_task(task['id'])
+    project['tasks'].remove(task)
+    storage.get_store().delete_task(project, task)
+    save_scheduled_tasks(project, sched, changed)
+
+def reschedule_project(project):
+    sched = project_scheduler(project)
+    changed = sched.reschedule()
+    save_scheduled_tasks(project, sched, changed)
+    st.toast(f"{len(changed)}件のタスクの日程を組み直しました。")
+
+def task_label(sched, task_id):
+    task = sched.tasks[task_id]
+    return f"{task['task_name']} ({task['assignee']})"
+
+# タスクの追加・ステータス変更・削除ではこのフラグメントだけを再実行する（チャートや他のタブは描画し直さない）
+@st.fragment
+def task_manager(project):
+    st.subheader("✅ タスク管理")
+    sched = project_scheduler(project)
+    with st.expander("➕ 新規タスク追加"):
+        with st.form("add_task_form", clear_on_submit=True):
+            col1, col2 = st.columns(2)
+            with col1:
+                task_name = st.text_input("タスク名")
+                assignee = st.selectbox("担当者", st.session_state.team_members, key="task_assignee")
+            with col2:
+                start_date = st.date_input("開始可能日", value=datetime.today())
+                duration = st.number_input("期間（日）", min_value=1, value=3)
+            depends_on = st.multiselect("前工程", list(sched.tasks), format_func=functools.partial(task_label, sched), key="task_depends_on")
+            if st.form_submit_button("タスクを追加"):
+                if task_name:
+                    new_task = {
+                        "id": storage.new_id(), "task_name": task_name, "assignee": assignee,
+                        "start_date": start_date.strftime("%Y-%m-%d"), "not_before": start_date.strftime("%Y-%m-%d"),
+                        "duration": int(duration), "depends_on": depends_on, "status": "未着手"
+                    }
+                    project['tasks'].append(new_task)
+                    # 前工程の終了と担当者の空きに合わせて開始日が後ろにずれることがある
+                    sched.add_task(new_task)
+                    save_scheduled_tasks(project, sched, [new_task['id']])
+                    st.toast(f"タスク「{task_name}」を追加しました！（{new_task['start_date']} ~ {new_task['end_date']}）")
+    if 'tasks' in project and project['tasks']:
+        with st.expander("📐 日程・依存関係の編集"):
+            edit_id = st.selectbox("タスク", list(sched.tasks), format_func=functools.partial(task_label, sched), key="schedule_edit_task")
+            edit_task = sched.tasks[edit_id]
+            with st.form(f"edit_task_form_{edit_id}"):
+                e_col1, e_col2 = st.columns(2)
+                with e_col1:
+                    edit_duration = st.number_input("期間（日）", min_value=1, value=scheduler.task_duration(edit_task))
+                    members = list(dict.fromkeys([*st.session_state.team_members, edit_task['assignee']]))
+                    edit_assignee = st.selectbox("担当者", members, index=members.index(edit_task['assignee']))
+                with e_col2:
+                    not_before = edit_task.get('not_before')
+                    edit_not_before = st.date_input("開始可能日（任意）", value=datetime.strptime(not_before, "%Y-%m-%d") if not_before else None)
+                edit_depends_on = st.multiselect("前工程", [task_id for task_id in sched.tasks if task_id != edit_id],
+                                                 default=[d for d in edit_task.get('depends_on', []) if d in sched.tasks],
+                                                 format_func=functools.partial(task_label, sched))
+                if st.form_submit_button("変更して後続の日程を更新"):
+                    if sched.would_cycle(edit_id, edit_depends_on):
+                        st.error("前工程に後続のタスクが含まれているため、依存関係が循環します。")
+                    else:
+                        previous_assignee = edit_task['assignee']
+                        edit_task.update({
+                            "duration": int(edit_duration), "assignee": edit_assignee, "depends_on": edit_depends_on,
+                            "not_before": edit_not_before.strftime("%Y-%m-%d") if edit_not_before else None,
+                        })
+                        changed = sched.update(edit_id, previous_assignee)
+                        save_scheduled_tasks(project, sched, {edit_id, *changed})
+                        st.toast(f"{len(changed)}件のタスクの日程を更新しました。")
+            st.button("🔄 全体を組み直す（担当者ごとの順番も再計算）", key="reschedule_project", on_click=reschedule_project, args=(project,))
+
+        st.markdown("### 📋 タスク一覧")
+        critical = set(sched.critical_path())
+        projected_end = sched.projected_end()
+        at_risk = sum(1 for task_id in sched.tasks if sched.risk(task_id) == "遅延リスク")
+        st.caption(f"予測完了日: {projected_end} / 締切: {project.get('deadline', '未設定')}"
+                   + (f" | ⚠️ 締切に間に合わない見込みのタスク: {at_risk}件" if at_risk else "")
+                   + f" | 🔥 クリティカルパス: {len(critical)}タスク")
+        for task in project['tasks']:
+            # ウィジェットのキーはタスクIDにする（削除で並びがずれても別のタスクの状態を引き継がない）
+            cols = st.columns([4, 2, 2, 1])
+            cols[0].write(f"**{task['task_name']}** ({task['assignee']})")
+            cols[1].write(f"🗓️ {task['start_date']} ~ {task['end_date']}")
+            if task.get('status') != '完了':
+                risk = sched.risk(task['id'])
+                marker = "🔥 " if task['id'] in critical else ("⚠️ " if risk else "")
+                cols[1].caption(f"{marker}余裕 {sched.slack(task['id'])}日" + (f"（{risk}）" if risk else ""))
+            status_key = f"status_{task['id']}"
+            cols[2].selectbox("ステータス", TASK_STATUS_OPTIONS, index=TASK_STATUS_OPTIONS.index(task.get('status', '未着手')), key=status_key,
+                              label_visibility="collapsed", on_change=set_task_status, args=(project, task, status_key))
+            cols[3].button("🗑️", key=f"del_task_{task['id']}", help="タスクを削除", on_click=remove_task, args=(project, task))
+
+
+def render():
+    # ... (スケジュール管理のコード) ...
+    st.title("📅 スケジュール管理")
+    if st.session_state.projects:
+        project_titles = [p['title'] for p in st.session_state.projects]
+        default_index = 0
+        if 'current_project_title' in st.session_state and st.session_state.current_project_title in project_titles:
+            default_index = project_titles.index(st.session_state.current_project_title)
+        selected_project_title = st.selectbox("プロジェクトを選択", project_titles, index=default_index)
+        st.session_state.current_project_title = selected_project_title
+        project_index = next((i for i, p in enumerate(st.session_state.projects) if p['title'] == selected_project_title), None)
+        if project_index is not None:
+            project = st.session_state.projects[project_index]
+            # 開いているタブの中身だけを描画する（タブを切り替えたときに再実行される）
+            tab1, tab2, tab3 = st.tabs(["ガントチャート", "タスク管理", "締切アラート"], key="schedule_tabs", on_change="rerun")
+            if tab1.open:
+                with tab1:
+                    st.subheader("📊 プロジェクトタイムライン")
+                    if 'tasks' in project and project['tasks']:
+                        gantt, progress_chart = schedule_charts(project['id'], project.get('task_version', 0), project['tasks'])
+                        st.plotly_chart(gantt, use_container_width=True)
+                        st.plotly_chart(progress_chart, use_container_width=True)
+                    else:
+                        st.info("このプロジェクトにはタスクがありません。「タスク管理」タブで追加してください。")
+            if tab2.open:
+                with tab2:
+                    task_manager(project)
+            if tab3.open:
+                with tab3:
+                    st.subheader("⏰ 締切アラート")
+                    today = datetime.now().date()
+                    deadline_index = storage.get_store().deadlines()
+                    urgent_tasks = deadline_index.overdue(today, project_id=project['id'])
+                    upcoming_tasks = deadline_index.due_within(7, today, project_id=project['id'])
+                    if urgent_tasks:
+                        st.error("🚨 期限超過タスク")
+                        for task in urgent_tasks:
+                            st.write(f"• **{task['task_name']}** - {(today - task['end_date']).days}日超過 ({task['assignee']})")
+                    if upcoming_tasks:
+                        st.warning("⚠️ 締切間近タスク (7日以内)")
+                        for task in upcoming_tasks:
+                            st.write(f"• **{task['task_name']}** - 残り{(task['end_date'] - today).days}日 ({task['assignee']})")
+                    if not urgent_tasks and not upcoming_tasks:
+                        st.success("✅ 締切間近のタスクはありません。")
+    else:
+        st.info("まずは「新規プロジェクト」メニューからプロジェクトを作成してください。")
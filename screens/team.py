@@ -0,0 +1,93 @@
+# --- チーム管理 ---
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+import storage
+import workload
+
+# --- 作業負荷 ---
+@st.cache_data(max_entries=4)
+def load_task_frame(revision):
+    # revision が変わったときだけ全タスクを読み直す（担当者別・日別の集計はこのフレームから行う）
+    return workload.task_frame(storage.get_store().load_task_rows())
+
+
+def render():
+    # ... (チーム管理のコード) ...
+    st.title("👥 チーム管理")
+    tab1, tab2, tab3 = st.tabs(["メンバー一覧", "役割分担", "作業負荷"])
+    with tab1:
+        st.subheader("チームメンバー")
+        with st.form("add_member"):
+            new_member = st.text_input("新しいメンバー名")
+            if st.form_submit_button("メンバーを追加"):
+                if new_member and new_member not in st.session_state.team_members:
+                    st.session_state.team_members.append(new_member)
+                    storage.get_store().add_team_member(new_member)
+                    st.success(f"{new_member}をチームに追加しました！")
+                    st.rerun()
+        st.markdown("### 現在のチーム")
+        for member in st.session_state.team_members:
+            col1, col2 = st.columns([4, 1])
+            col1.write(f"👤 **{member}**")
+            if col2.button("削除", key=f"del_member_{member}", type="secondary"):
+                st.session_state.team_members.remove(member)
+                storage.get_store().remove_team_member(member)
+                st.rerun()
+    with tab2:
+        st.subheader("役割分担マトリックス (RACIチャート例)")
+        roles_data = {
+            "タスク": ["ストーリー", "キャラデザ", "ネーム", "作画", "仕上げ", "進行管理"],
+            "原作者": ["実行責任者(R)", "承認者(A)", "実行責任者(R)", "協業(C)", "", "情報提供(I)"],
+            "作画担当": ["協業(C)", "実行責任者(R)", "実行責任者(R)", "実行責任者(R)", "協業(C)", "協業(C)"],
+            "アシスタント": ["", "", "", "協業(C)", "実行責任者(R)", ""],
+            "編集者": ["承認者(A)", "承認者(A)", "承認者(A)", "情報提供(I)", "", "実行責任者(R)"]
+        }
+        df_roles = pd.DataFrame(roles_data).set_index("タスク")
+        st.dataframe(df_roles, use_container_width=True)
+        st.caption("R: Responsible (実行責任者), A: Accountable (承認者), C: Consulted (協業), I: Informed (情報提供)")
+    with tab3:
+        st.subheader("作業負荷分析")
+        task_frame = load_task_frame(st.session_state.storage_revision)
+        if not task_frame.empty:
+            assignee_counts = workload.status_counts(task_frame)
+            fig = go.Figure()
+            statuses = ['完了', '進行中', '未着手', '保留']
+            colors = {'完了': '#28a745', '進行中': '#ffc107', '未着手': '#6c757d', '保留': '#17a2b8'}
+            for status in statuses:
+                if status in assignee_counts.columns:
+                    fig.add_trace(go.Bar(name=status, x=assignee_counts.index, y=assignee_counts[status], marker_color=colors.get(status)))
+            fig.update_layout(barmode='stack', title='メンバー別タスク負荷', xaxis_title='メンバー', yaxis_title='タスク数')
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.markdown("#### 📆 期間別の稼働率")
+            today = datetime.today().date()
+            w_col1, w_col2, w_col3 = st.columns([2, 1, 1])
+            with w_col1:
+                period = st.date_input("表示期間", value=(today - timedelta(days=28), today + timedelta(days=56)), key="workload_period")
+            with w_col2:
+                bucket = st.radio("集計単位", list(workload.BUCKETS), index=1, horizontal=True, key="workload_bucket")
+            with w_col3:
+                capacity = st.number_input("1日の対応可能タスク数", min_value=0.5, value=1.0, step=0.5, key="workload_capacity")
+            include_done = st.checkbox("完了タスクを含める", value=True, key="workload_include_done")
+            if len(period) == 2:
+                frame = task_frame if include_done else task_frame[task_frame['status'] != '完了']
+                usage = workload.utilization(workload.daily_load(frame, period[0], period[1] + timedelta(days=1)), bucket, capacity)
+                if usage.empty:
+                    st.info("この期間に予定されているタスクはありません。")
+                else:
+                    # 1.0 を境に、余裕は緑、過剰割り当ては赤で表示する
+                    fig = px.imshow(usage.T, x=usage.index, y=usage.columns, zmin=0, zmax=2,
+                                    color_continuous_scale=[(0, "#e8f5e9"), (0.5, "#ffc107"), (1, "#dc3545")], aspect="auto",
+                                    labels={"x": "期間", "y": "メンバー", "color": "稼働率"})
+                    st.plotly_chart(fig, use_container_width=True)
+                    overloaded = (usage > 1).sum()
+                    if overloaded.any():
+                        st.warning("⚠️ 過剰割り当て: " + ", ".join(f"{member} ({count}期間)" for member, count in overloaded[overloaded > 0].items()))
+        else:
+            st.info("タスクデータがありません。")
@@ -0,0 +1,84 @@
+# --- 世界観設定 ---
+
+from datetime import datetime
+
+import streamlit as st
+
+import storage
+from screens.common import AVAILABLE_MODELS, call_generative_ai, filter_by_hits, page_window, search_hits
+
+def render():
+    st.title("🌍 世界観設定工房")
+    ai_model = st.selectbox("使用するAIモデル", AVAILABLE_MODELS, key="world_model")
+    # ... (以降のロジックは変更なし)
+    tab1, tab2, tab3 = st.tabs(["世界観生成", "設定集", "地図作成支援"])
+    with tab1:
+        st.subheader("世界観の基本設定")
+        with st.form("world_building"):
+            world_name = st.text_input("世界/舞台の名前")
+            world_type = st.selectbox("世界タイプ", ["現実世界ベース", "完全架空世界", "パラレルワールド", "未来世界", "過去世界", "異次元"])
+            col1, col2 = st.columns(2)
+            with col1:
+                geography = st.text_area("地理・環境", placeholder="大陸の配置、気候、特殊な地形など")
+                technology = st.text_area("技術/魔法体系", placeholder="利用可能な技術、魔法の仕組み、制限など")
+            with col2:
+                society = st.text_area("社会・文化", placeholder="政治体制、経済、階級制度など")
+                history = st.text_area("歴史・伝承", placeholder="建国神話、大事件、現在への影響など")
+            special_rules = st.text_area("この世界特有のルール", placeholder="物理法則の違い、特殊な制約、独自の概念など")
+            submitted = st.form_submit_button("🌍 世界観を構築", type="primary")
+        if submitted and world_name:
+            with st.spinner(f"{ai_model}が世界を創造中..."):
+                response = call_generative_ai(
+                    "world_builder", model=ai_model,
+                    world_base=f"世界名: {world_name}, タイプ: {world_type}, 地理: {geography}, 技術: {technology}, 社会: {society}, 歴史: {history}, 特殊ルール: {special_rules}",
+                    additional_requests="矛盾のない、魅力的で独創的な世界観を構築してください。読者がワクワクするような設定を盛り込んでください。"
+                )
+                if response:
+                    st.session_state.generated_content['world'] = {"name": world_name, "content": response}
+        if 'world' in st.session_state.generated_content:
+            st.markdown("---")
+            st.subheader(f"生成された世界観: {st.session_state.generated_content['world']['name']}")
+            st.markdown(st.session_state.generated_content['world']['content'])
+            if st.button("💾 この設定を保存", key="save_world"):
+                world_data = st.session_state.generated_content['world']
+                new_world = {"name": world_data['name'], "content": world_data['content'], "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")}
+                st.session_state.world_settings.append(new_world)
+                storage.get_store().add_asset("world", new_world)
+                st.success("世界観設定を保存しました！")
+                del st.session_state.generated_content['world']
+    with tab2:
+        st.subheader("📚 設定集")
+        if not st.session_state.world_settings:
+            st.info("まだ保存された世界観設定はありません。")
+        else:
+            hits = search_hits("world", "world_search")
+            matched = filter_by_hits(st.session_state.world_settings, hits)
+            if hits is not None:
+                st.caption(f"{len(matched)}件が一致しました。")
+            for setting in page_window(matched, "world_page"):
+                if hits is not None:
+                    st.markdown(hits[setting['id']])
+                # 本文と削除ボタンは展開されたときにだけ描画する
+                entry = st.expander(f"🌍 {setting['name']} ({setting['created_at']})", key=f"world_entry_{setting['id']}", on_change="rerun")
+                if not entry.open:
+                    continue
+                with entry:
+                    st.markdown(setting['content'])
+                    if st.button("削除", key=f"del_world_{setting['id']}", type="secondary"):
+                        st.session_state.world_settings.remove(setting)
+                        storage.get_store().delete_asset(setting)
+                        st.rerun()
+    with tab3:
+        st.subheader("🗺️ 地図作成支援")
+        st.info("地図に含めたい要素を文章で説明すると、AIが具体的な描写や配置のアイデアを提供します。")
+        map_description = st.text_area("地図の説明", height=150, placeholder="例：中央に巨大なクレーター湖があり、その周りを険しい山脈が囲んでいる。北の森にはエルフの隠れ里が、南の平原には人間の王国が広がっている。")
+        if st.button("🗺️ 地図作成ガイドを生成"):
+            with st.spinner(f"{ai_model}が地図のアイデアを考案中..."):
+                response = call_generative_ai(
+                    "world_builder", model=ai_model,
+                    world_base=f"地図のアイデア: {map_description}",
+                    additional_requests="この説明に基づき、より詳細な地理的特徴、都市や村の具体的な位置、街道、ダンジョンなどの興味深い場所のアイデアを箇条書きで提案してください。"
+                )
+                if response:
+                    st.markdown(response)
+            st.warning("※実際の地図は画像編集ソフトで作成してください。")
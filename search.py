@@ -0,0 +1,98 @@
+# --- 全文検索 ---
+# アイデア・キャラクター・世界観・評価履歴の本文を SQLite FTS5 で検索する。
+# 日本語は単語の区切りがないため、文字の連続を2文字ずつずらした n-gram（bi-gram）に分けてから索引し、
+# 検索語も同じように分けてフレーズ検索する（「探偵」「サイバーパンク」のような部分一致を索引で引ける）。
+# 索引は storage が書き込みのたびに差分で更新する。ここでは索引用の文字列とスニペットを作るだけ。
+
+import re
+import unicodedata
+
+# n-gram の作り方や索引する項目を変えたら上げる（起動時に索引を作り直す）
+INDEX_VERSION = 1
+SNIPPET_CHARS = 60
+
+_RUN = re.compile(r"[^\W_]+")
+_MARKDOWN_SPECIAL = re.compile(r"([\\`*_\[\]{}()<>#+\-.!|~$:])")
+
+
+def normalize(text):
+    """全角英数の半角化と小文字化。1文字ずつ変換して文字数を変えない（スニペットの位置合わせのため）"""
+    chars = []
+    for ch in text or "":
+        folded = unicodedata.normalize("NFKC", ch).lower()
+        chars.append(folded if len(folded) == 1 else ch)
+    return "".join(chars)
+
+
+def _grams(run):
+    # "abc" → "ab bc c"。末尾の1文字も残し、1文字の検索語を前方一致で引けるようにする
+    return [run[i:i + 2] for i in range(len(run))]
+
+
+def index_text(text):
+    """索引に入れる文字列（空白区切りの bi-gram）"""
+    return " ".join(gram for run in _RUN.findall(normalize(text)) for gram in _grams(run))
+
+
+def terms(query):
+    """検索語を空白や記号で区切り、正規化した語のリストにする"""
+    return _RUN.findall(normalize(query))
+
+
+def match_expression(query):
+    """FTS5 の MATCH 式。語ごとに bi-gram のフレーズ（1文字なら前方一致）を作り AND でつなぐ。語がなければ None"""
+    phrases = []
+    for term in terms(query):
+        if len(term) == 1:
+            phrases.append(f'"{term}"*')
+        else:
+            phrases.append('"' + " ".join(term[i:i + 2] for i in range(len(term) - 1)) + '"')
+    return " AND ".join(phrases) or None
+
+
+def _escape_markdown(text):
+    return _MARKDOWN_SPECIAL.sub(r"\\\1", text)
+
+
+def snippet(text, query, width=SNIPPET_CHARS):
+    """最初に一致した箇所の前後を切り出し、一致部分を太字にした Markdown を返す。一致しなければ None"""
+    text = " ".join((text or "").split())
+    folded = normalize(text)
+    words = sorted(set(terms(query)), key=len, reverse=True)
+    first = min((pos for pos in (folded.find(word) for word in words) if pos >= 0), default=-1)
+    if first < 0:
+        return None
+    start = max(0, first - width // 3)
+    end = min(len(text), start + width)
+    # 切り出した範囲の一致箇所を長い語から順に印を付け、重なりは先に付けたほうを残す
+    marked = [False] * (end - start)
+    for word in words:
+        pos = folded.find(word, start)
+        while 0 <= pos < end:
+            for i in range(pos, min(pos + len(word), end)):
+                marked[i - start] = True
+            pos = folded.find(word, pos + len(word))
+    parts, i = [], start
+    while i < end:
+        j = i
+        while j < end and marked[j - start] == marked[i - start]:
+            j += 1
+        piece = _escape_markdown(text[i:j])
+        parts.append(f"**{piece}**" if marked[i - start] else piece)
+        i = j
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+
+def document(kind, item):
+    """索引する (タイトル, 本文)。kind はアセットの種類か評価 (evaluation)"""
+    if kind == "idea":
+        return item.get("title") or "", item.get("content") or ""
+    if kind == "character":
+        return item.get("name") or "", item.get("details") or ""
+    if kind == "world":
+        return item.get("name") or "", item.get("content") or ""
+    title = " ".join(str(item[key]) for key in ("type", "content_type", "model", "timestamp") if item.get(key))
+    body = [item.get("result") or "", item.get("text_content") or "", " ".join(item.get("evaluation_points") or [])]
+    body += [chunk.get("result") or "" for chunk in item.get("chunk_results", [])]
+    body += [page.get("result") or "" for page in item.get("page_results", [])]
+    return title, "\n".join(part for part in body if part)
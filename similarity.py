@@ -0,0 +1,125 @@
+# --- アイデアの類似度 ---
+# アイデア本文を文字 3-gram の集合にし、MinHash の署名（NUM_PERM 個の最小ハッシュ値）で Jaccard 係数を推定する。
+# 署名は保存時に一度だけ計算して storage に保存し、SimilarityIndex は全アイデアの署名を NumPy の行列で持つ。
+# 類似検索は行列全体と署名の一致率を一度に比べるだけなので、数万件でも数十ミリ秒で済む。外部APIは使わない。
+
+import threading
+
+import numpy as np
+
+import search
+
+# 署名の作り方を変えたら上げる（保存済みの署名を作り直す）
+SIGNATURE_VERSION = 2
+NUM_PERM = 128
+SHINGLE_CHARS = 3
+# 推定 Jaccard 係数の目安。DUPLICATE 以上はほぼ同じアイデアとして保存時に警告する
+DUPLICATE_THRESHOLD = 0.5
+SIMILAR_THRESHOLD = 0.15
+
+# ハッシュ関数の係数（multiply-shift 方式。奇数の乗数）。再起動しても同じ署名になるよう seed を固定する
+_rng = np.random.default_rng(20240601)
+_MULTIPLIERS = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+_SHINGLE_PRIMES = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)[:SHINGLE_CHARS]
+
+
+def shingle_hashes(text):
+    """正規化した本文の文字 3-gram のハッシュ値（重複なし）。記号と空白の並びは1つの空白にまとめる。
+    3文字に満たない本文は空の配列（比べられる内容がない）"""
+    normalized = " ".join(search.terms(text))
+    codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < SHINGLE_CHARS:
+        return np.empty(0, dtype=np.uint64)
+    windows = np.lib.stride_tricks.sliding_window_view(codes, SHINGLE_CHARS)
+    return np.unique(windows @ _SHINGLE_PRIMES)
+
+
+def signature(text):
+    """MinHash の署名（uint32 × NUM_PERM）。3-gram が1つもない本文は None（どのアイデアとも似ていない扱い）"""
+    hashes = shingle_hashes(text)
+    if hashes.size == 0:
+        return None
+    signatures = np.empty(NUM_PERM, dtype=np.uint32)
+    # 長い本文でも一時配列が大きくなりすぎないよう、ハッシュ関数を分けて計算する
+    for start in range(0, NUM_PERM, 32):
+        block = _MULTIPLIERS[start:start + 32, None] * hashes[None, :] + _OFFSETS[start:start + 32, None]
+        signatures[start:start + 32] = (block >> np.uint64(32)).min(axis=1)
+    return signatures
+
+
+def to_bytes(sig):
+    return sig.astype("<u4").tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = []
+        self._rows = {}
+        self._matrix = np.empty((0, NUM_PERM), dtype=np.uint32)
+
+    @classmethod
+    def from_signatures(cls, rows):
+        """(アイデアID, 署名のバイト列) の組からまとめて作る"""
+        index = cls()
+        rows = list(rows)
+        index._ids = [item_id for item_id, _ in rows]
+        index._rows = {item_id: i for i, item_id in enumerate(index._ids)}
+        if rows:
+            index._matrix = np.frombuffer(b"".join(data for _, data in rows), dtype="<u4").reshape(len(rows), NUM_PERM).astype(np.uint32)
+        return index
+
+    def __len__(self):
+        return len(self._ids)
+
+    # --- 更新 ---
+    def add(self, item_id, sig):
+        with self._lock:
+            row = self._rows.get(item_id)
+            if row is not None:
+                self._matrix[row] = sig
+                return
+            # 行列の容量が足りなければ倍に広げる（追加のたびに全体をコピーしない）
+            if len(self._ids) == len(self._matrix):
+                grown = np.empty((max(16, 2 * len(self._matrix)), NUM_PERM), dtype=np.uint32)
+                grown[:len(self._ids)] = self._matrix
+                self._matrix = grown
+            self._rows[item_id] = len(self._ids)
+            self._matrix[len(self._ids)] = sig
+            self._ids.append(item_id)
+
+    def remove(self, item_id):
+        with self._lock:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                return
+            # 最後の行を空いた位置に移す
+            last_id = self._ids.pop()
+            if last_id != item_id:
+                self._matrix[row] = self._matrix[len(self._ids)]
+                self._ids[row] = last_id
+                self._rows[last_id] = row
+
+    # --- 検索 ---
+    def most_similar(self, sig, limit=5, min_similarity=SIMILAR_THRESHOLD, exclude=None):
+        """推定 Jaccard 係数の高い順に [(アイデアID, 類似度)] を返す"""
+        if sig is None:
+            return []
+        with self._lock:
+            count = len(self._ids)
+            if count == 0:
+                return []
+            similarities = (self._matrix[:count] == sig).mean(axis=1)
+            if exclude in self._rows:
+                similarities[self._rows[exclude]] = -1.0
+            top = np.argpartition(-similarities, min(limit, count) - 1)[:limit]
+            top = top[np.argsort(-similarities[top], kind="stable")]
+            return [(self._ids[i], float(similarities[i])) for i in top if similarities[i] >= min_similarity]
+
+    def near_duplicates(self, sig, threshold=DUPLICATE_THRESHOLD, exclude=None, limit=5):
+        return self.most_similar(sig, limit=limit, min_similarity=threshold, exclude=exclude)
@@ -0,0 +1,459 @@
+# --- 永続ストレージ ---
+# プロジェクト・タスク・アセット（アイデア/キャラクター/世界観）・評価・チームメンバーを
+# SQLite (WALモード) に保存し、再起動後や他のスタッフのセッションからも参照できるようにする。
+# st.session_state はこの内容のキャッシュとして使い、書き込みは変更のあった行だけを行う。
+# 書き込みのたびに revision を進め、各セッションは revision が変わったときだけ読み直す。
+# プロジェクトごとのタスクのバージョン（task_version）も別に数え、チャートのキャッシュのキーに使う。
+# 未完了タスクの締切は DeadlineIndex にも持ち、タスクの書き込みと同時に差分で更新する。
+# アセットと評価の本文は全文検索の索引 (search_docs / search_index) にも同じトランザクションで書き込む。
+# アイデアは MinHash の署名 (idea_signatures) も保存し、類似アイデアの検索に使う。
+# エクスポートは専用の読み取り接続から1件ずつ返し、インポートは1つのトランザクションでまとめて書き込む（archive.py）。
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+
+import page_store
+import search
+from deadlines import DeadlineIndex
+
+DB_PATH = os.path.join(page_store.DATA_DIR, "studio.sqlite3")
+DEFAULT_TEAM_MEMBERS = ["原作者", "作画担当", "アシスタント", "編集者"]
+
+# アセットの種類と、セッション状態のキー・タイトルに使うフィールド
+ASSET_KINDS = {
+    "idea": {"state_key": "idea_bank", "title_field": "title"},
+    "character": {"state_key": "characters", "title_field": "name"},
+    "world": {"state_key": "world_settings", "title_field": "name"},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY, title TEXT, status TEXT, deadline TEXT, created_at TEXT, data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status);
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY, project_id TEXT, position INTEGER, assignee TEXT,
+    start_date TEXT, end_date TEXT, status TEXT, data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks(project_id, position);
+CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(status, end_date);
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee ON tasks(assignee, start_date);
+CREATE TABLE IF NOT EXISTS assets (id TEXT PRIMARY KEY, kind TEXT, title TEXT, created_at TEXT, data TEXT);
+CREATE INDEX IF NOT EXISTS idx_assets_kind ON assets(kind, created_at);
+CREATE TABLE IF NOT EXISTS evaluations (id TEXT PRIMARY KEY, timestamp TEXT, type TEXT, model TEXT, data TEXT);
+CREATE INDEX IF NOT EXISTS idx_evaluations_timestamp ON evaluations(timestamp);
+CREATE TABLE IF NOT EXISTS evaluation_scores (
+    evaluation_id TEXT, project_id TEXT, evaluated_at TEXT, model TEXT, type TEXT,
+    page_number INTEGER, criterion TEXT, score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_project ON evaluation_scores(project_id, evaluated_at);
+CREATE INDEX IF NOT EXISTS idx_scores_evaluation ON evaluation_scores(evaluation_id);
+CREATE TABLE IF NOT EXISTS team_members (name TEXT PRIMARY KEY, position INTEGER);
+CREATE TABLE IF NOT EXISTS idea_signatures (asset_id TEXT PRIMARY KEY, signature BLOB);
+CREATE TABLE IF NOT EXISTS search_docs (id INTEGER PRIMARY KEY, doc_id TEXT UNIQUE, kind TEXT, title TEXT, body TEXT);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(title, body, content='', tokenize='unicode61 remove_diacritics 0');
+"""
+
+
+# エクスポート・インポートの単位。アーカイブ内の NDJSON のファイル名になり、この順で書き込む（タスクはプロジェクトの後）
+RECORD_SECTIONS = ("projects", "tasks", *(spec["state_key"] for spec in ASSET_KINDS.values()), "evaluations")
+_ASSET_SECTIONS = {spec["state_key"]: kind for kind, spec in ASSET_KINDS.items()}
+
+SCORE_COLUMNS = ["evaluation_id", "project_id", "evaluated_at", "model", "type", "page_number", "criterion", "score"]
+
+
+def new_id():
+    return uuid.uuid4().hex
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _task_version_key(project_id):
+    return f"tasks:{project_id}"
+
+
+def _score_rows(result):
+    # 全体評価の点数は page_number を NULL、ページ別評価はページごとに記録する
+    base = (result["id"], result.get("project_id"), result.get("timestamp"), result.get("model"), result.get("type"))
+    rows = [(*base, None, criterion, score) for criterion, score in (result.get("scores") or {}).items()]
+    for page_res in result.get("page_results", []):
+        rows += [(*base, page_res["page_number"], criterion, score) for criterion, score in (page_res.get("scores") or {}).items()]
+    return rows
+
+
+class StudioStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        with self._conn:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'revision'").fetchone() is None:
+                self._conn.execute("INSERT INTO meta VALUES ('revision', 0)")
+                self._conn.executemany("INSERT OR IGNORE INTO team_members VALUES (?, ?)", [(name, i) for i, name in enumerate(DEFAULT_TEAM_MEMBERS)])
+        self._deadlines = None
+        self._deadlines_revision = None
+        self._similar_ideas = None
+        self._similar_ideas_revision = None
+        # 書き込みが確定するたびに (書き込み前の revision, 書き込み後の revision) で呼ばれる
+        self.on_write = None
+        self._ensure_search_index()
+
+    @contextmanager
+    def _write(self):
+        with self._lock, self._conn:
+            revision = self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+            try:
+                yield self._conn
+                self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'revision'")
+            except BaseException:
+                # ロールバックされる書き込みの差分が入っているかもしれないので、次に使うときに作り直す
+                self._deadlines = None
+                self._similar_ideas = None
+                raise
+            # 締切・類似度のインデックスが直前の状態と一致していれば、書き込み中の差分更新で最新のまま保てる
+            if self._deadlines_revision == revision:
+                self._deadlines_revision = revision + 1
+            if self._similar_ideas_revision == revision:
+                self._similar_ideas_revision = revision + 1
+        if self.on_write is not None:
+            self.on_write(revision, revision + 1)
+
+    def revision(self):
+        with self._lock:
+            return self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+
+    # --- 読み込み ---
+    def load_all(self):
+        """セッション状態と同じ形のデータ一式と、その時点の revision を返す"""
+        with self._lock:
+            revision = self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+            projects = [json.loads(data) for (data,) in self._conn.execute("SELECT data FROM projects ORDER BY rowid")]
+            tasks_by_project = {}
+            for project_id, data in self._conn.execute("SELECT project_id, data FROM tasks ORDER BY project_id, position"):
+                tasks_by_project.setdefault(project_id, []).append(json.loads(data))
+            assets = {kind: [] for kind in ASSET_KINDS}
+            for kind, data in self._conn.execute("SELECT kind, data FROM assets ORDER BY rowid"):
+                assets[kind].append(json.loads(data))
+            evaluations = [json.loads(data) for (data,) in self._conn.execute("SELECT data FROM evaluations ORDER BY rowid")]
+            team_members = [name for (name,) in self._conn.execute("SELECT name FROM team_members ORDER BY position")]
+            task_versions = dict(self._conn.execute("SELECT key, value FROM meta WHERE key LIKE 'tasks:%'"))
+        for project in projects:
+            project["tasks"] = tasks_by_project.get(project["id"], [])
+            project["task_version"] = task_versions.get(_task_version_key(project["id"]), 0)
+        state = {
+            "projects": projects, "evaluation_results": evaluations, "team_members": team_members,
+            **{spec["state_key"]: assets[kind] for kind, spec in ASSET_KINDS.items()},
+        }
+        return state, revision
+
+    # --- プロジェクト・タスク ---
+    def save_project(self, project):
+        """プロジェクトとそのタスクをまとめて保存する（新規作成時）"""
+        project.setdefault("id", new_id())
+        project_data = {k: v for k, v in project.items() if k not in ("tasks", "task_version")}
+        with self._write() as conn:
+            self._insert_project(conn, project_data)
+            conn.execute("DELETE FROM tasks WHERE project_id = ?", (project["id"],))
+            for position, task in enumerate(project.get("tasks", [])):
+                self._upsert_task(conn, project["id"], position, task)
+            self._bump_task_version(conn, project)
+            self._update_deadlines("replace_project", project["id"], project.get("tasks", []))
+
+    def _insert_project(self, conn, project_data):
+        conn.execute(
+            "INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?)",
+            (project_data["id"], project_data.get("title"), project_data.get("status"), project_data.get("deadline"), project_data.get("created_at"), _dumps(project_data))
+        )
+
+    def save_task(self, project, task):
+        """タスク1件を追加・更新する。並び順はプロジェクト内のリスト位置に合わせる"""
+        with self._write() as conn:
+            self._upsert_task(conn, project["id"], project["tasks"].index(task), task)
+            self._bump_task_version(conn, project)
+            self._update_deadlines("upsert", project["id"], task)
+
+    def save_tasks(self, project, tasks):
+        """複数のタスクをまとめて更新する（日程の再計算で変わったタスクなど）"""
+        with self._write() as conn:
+            for task in tasks:
+                self._upsert_task(conn, project["id"], project["tasks"].index(task), task)
+                self._update_deadlines("upsert", project["id"], task)
+            self._bump_task_version(conn, project)
+
+    def _upsert_task(self, conn, project_id, position, task):
+        task.setdefault("id", new_id())
+        conn.execute(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (task["id"], project_id, position, task.get("assignee"), task.get("start_date"), task.get("end_date"), task.get("status"), _dumps(task))
+        )
+
+    def delete_task(self, project, task):
+        with self._write() as conn:
+            conn.execute("DELETE FROM tasks WHERE id = ?", (task["id"],))
+            # 残りのタスクの並び順をリスト位置に詰め直す（空いた番号のままだと、次の保存で並び順が重なる）
+            remaining = [other for other in project["tasks"] if other["id"] != task["id"]]
+            conn.executemany("UPDATE tasks SET position = ? WHERE id = ?", [(position, other["id"]) for position, other in enumerate(remaining)])
+            self._bump_task_version(conn, project)
+            self._update_deadlines("remove", task["id"])
+
+    def _bump_task_version(self, conn, project):
+        # プロジェクトのタスクが変わるたびに増やし、セッション側のプロジェクトにも反映する
+        key = _task_version_key(project["id"])
+        conn.execute("INSERT INTO meta VALUES (?, 1) ON CONFLICT(key) DO UPDATE SET value = value + 1", (key,))
+        project["task_version"] = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def load_task_rows(self):
+        """全タスクの (project_id, assignee, start_date, end_date, status)。JSON を展開せず列から読む"""
+        with self._lock:
+            return self._conn.execute("SELECT project_id, assignee, start_date, end_date, status FROM tasks").fetchall()
+
+    def _update_deadlines(self, method, *args):
+        if self._deadlines is not None:
+            getattr(self._deadlines, method)(*args)
+
+    def deadlines(self):
+        """未完了タスクの締切インデックス。他のプロセスが書き込んでいたら作り直す"""
+        with self._lock:
+            revision = self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+            if self._deadlines is None or self._deadlines_revision != revision:
+                rows = self._conn.execute("SELECT project_id, data FROM tasks WHERE status IS NOT '完了'").fetchall()
+                self._deadlines = DeadlineIndex.from_tasks((project_id, json.loads(data)) for project_id, data in rows)
+                self._deadlines_revision = revision
+            return self._deadlines
+
+    # --- アセット（アイデア/キャラクター/世界観） ---
+    def add_asset(self, kind, item):
+        item.setdefault("id", new_id())
+        with self._write() as conn:
+            self._insert_asset(conn, kind, item)
+
+    def _insert_asset(self, conn, kind, item):
+        title = item.get(ASSET_KINDS[kind]["title_field"])
+        conn.execute("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?)", (item["id"], kind, title, item.get("created_at"), _dumps(item)))
+        self._index_document(conn, kind, item)
+        if kind == "idea":
+            self._save_idea_signature(conn, item)
+
+    def delete_asset(self, item):
+        with self._write() as conn:
+            conn.execute("DELETE FROM assets WHERE id = ?", (item["id"],))
+            self._unindex_document(conn, item["id"])
+            conn.execute("DELETE FROM idea_signatures WHERE asset_id = ?", (item["id"],))
+            if self._similar_ideas is not None:
+                self._similar_ideas.remove(item["id"])
+
+    # --- 評価 ---
+    # 点数は評価本体（JSON）とは別に、集計しやすい縦持ちの evaluation_scores にも書き込む
+    def save_evaluation(self, result):
+        result.setdefault("id", new_id())
+        with self._write() as conn:
+            self._insert_evaluation(conn, result)
+
+    def _insert_evaluation(self, conn, result):
+        conn.execute(
+            "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?)",
+            (result["id"], result.get("timestamp"), result.get("type"), result.get("model"), _dumps(result))
+        )
+        conn.execute("DELETE FROM evaluation_scores WHERE evaluation_id = ?", (result["id"],))
+        conn.executemany(f"INSERT INTO evaluation_scores VALUES ({', '.join('?' * len(SCORE_COLUMNS))})", _score_rows(result))
+        self._index_document(conn, "evaluation", result)
+
+    def delete_evaluation(self, result):
+        with self._write() as conn:
+            conn.execute("DELETE FROM evaluations WHERE id = ?", (result["id"],))
+            conn.execute("DELETE FROM evaluation_scores WHERE evaluation_id = ?", (result["id"],))
+            self._unindex_document(conn, result["id"])
+
+    def clear_evaluations(self):
+        with self._write() as conn:
+            conn.execute("DELETE FROM evaluations")
+            conn.execute("DELETE FROM evaluation_scores")
+            for (doc_id,) in conn.execute("SELECT doc_id FROM search_docs WHERE kind = 'evaluation'").fetchall():
+                self._unindex_document(conn, doc_id)
+
+    def load_scores(self, project_id=None):
+        """点数の行を SCORE_COLUMNS の順のタプルで返す（評価日時順）"""
+        query = f"SELECT {', '.join(SCORE_COLUMNS)} FROM evaluation_scores"
+        params = ()
+        if project_id is not None:
+            query += " WHERE project_id = ?"
+            params = (project_id,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY evaluated_at", params).fetchall()
+
+    # --- 類似アイデア ---
+    # similarity は NumPy を使うため、アイデアを保存するか類似度を調べるときに初めて読み込む
+    def _save_idea_signature(self, conn, item):
+        import similarity
+
+        sig = similarity.signature(item.get("content"))
+        if sig is None:
+            # 短すぎて比べられない本文は署名を持たず、類似検索の対象にしない
+            conn.execute("DELETE FROM idea_signatures WHERE asset_id = ?", (item["id"],))
+            if self._similar_ideas is not None:
+                self._similar_ideas.remove(item["id"])
+            return
+        conn.execute("INSERT OR REPLACE INTO idea_signatures VALUES (?, ?)", (item["id"], similarity.to_bytes(sig)))
+        if self._similar_ideas is not None:
+            self._similar_ideas.add(item["id"], sig)
+
+    def similar_ideas(self):
+        """全アイデアの MinHash 署名のインデックス。署名のないアイデアはここで計算して保存する"""
+        import similarity
+
+        with self._lock:
+            revision = self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+            if self._similar_ideas is not None and self._similar_ideas_revision == revision:
+                return self._similar_ideas
+            with self._conn as conn:
+                version = conn.execute("SELECT value FROM meta WHERE key = 'similarity_version'").fetchone()
+                if version is None or version[0] != similarity.SIGNATURE_VERSION:
+                    conn.execute("DELETE FROM idea_signatures")
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('similarity_version', ?)", (similarity.SIGNATURE_VERSION,))
+                missing = conn.execute(
+                    "SELECT a.data FROM assets a LEFT JOIN idea_signatures s ON s.asset_id = a.id WHERE a.kind = 'idea' AND s.asset_id IS NULL"
+                ).fetchall()
+                for (data,) in missing:
+                    item = json.loads(data)
+                    sig = similarity.signature(item.get("content"))
+                    if sig is not None:
+                        conn.execute("INSERT INTO idea_signatures VALUES (?, ?)", (item["id"], similarity.to_bytes(sig)))
+            rows = self._conn.execute("SELECT asset_id, signature FROM idea_signatures").fetchall()
+            self._similar_ideas = similarity.SimilarityIndex.from_signatures(rows)
+            self._similar_ideas_revision = revision
+            return self._similar_ideas
+
+    # --- 全文検索 ---
+    # search_docs に元の文字列、search_index（contentless の FTS5）に bi-gram 化した文字列を持つ。
+    # contentless の行を消すには索引したときと同じ値が要るため、search_docs から作り直して渡す
+    def _index_document(self, conn, kind, item):
+        self._unindex_document(conn, item["id"])
+        title, body = search.document(kind, item)
+        row_id = conn.execute("INSERT INTO search_docs (doc_id, kind, title, body) VALUES (?, ?, ?, ?)", (item["id"], kind, title, body)).lastrowid
+        conn.execute("INSERT INTO search_index (rowid, title, body) VALUES (?, ?, ?)", (row_id, search.index_text(title), search.index_text(body)))
+
+    def _unindex_document(self, conn, doc_id):
+        row = conn.execute("SELECT id, title, body FROM search_docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return
+        row_id, title, body = row
+        conn.execute("INSERT INTO search_index (search_index, rowid, title, body) VALUES ('delete', ?, ?, ?)", (row_id, search.index_text(title), search.index_text(body)))
+        conn.execute("DELETE FROM search_docs WHERE id = ?", (row_id,))
+
+    def _ensure_search_index(self):
+        # 索引がない既存のデータベースや、索引の作り方が変わったときは全件から作り直す（データ自体は変わらないので revision は進めない）
+        with self._lock, self._conn as conn:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'search_version'").fetchone()
+            if version is not None and version[0] == search.INDEX_VERSION:
+                return
+            conn.execute("DELETE FROM search_docs")
+            conn.execute("INSERT INTO search_index (search_index) VALUES ('delete-all')")
+            for kind, data in conn.execute("SELECT kind, data FROM assets ORDER BY rowid").fetchall():
+                self._index_document(conn, kind, json.loads(data))
+            for (data,) in conn.execute("SELECT data FROM evaluations ORDER BY rowid").fetchall():
+                self._index_document(conn, "evaluation", json.loads(data))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('search_version', ?)", (search.INDEX_VERSION,))
+
+    def search(self, query, kind=None, limit=200):
+        """一致したアセット・評価を関連度順に {doc_id, kind, title, snippet} で返す。snippet は一致箇所を太字にした Markdown"""
+        expression = search.match_expression(query)
+        if expression is None:
+            return []
+        sql = ("SELECT d.doc_id, d.kind, d.title, d.body FROM search_index JOIN search_docs d ON d.id = search_index.rowid"
+               " WHERE search_index MATCH ?")
+        params = [expression]
+        if kind is not None:
+            sql += " AND d.kind = ?"
+            params.append(kind)
+        # タイトルの一致を本文より重く見る
+        sql += " ORDER BY bm25(search_index, 2.0, 1.0) LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"doc_id": doc_id, "kind": doc_kind, "title": title, "snippet": search.snippet(body, query) or search.snippet(title, query) or ""}
+            for doc_id, doc_kind, title, body in rows
+        ]
+
+    # --- エクスポート・インポート ---
+    def export_records(self, sections=RECORD_SECTIONS):
+        """(セクション, レコード) を1件ずつ返す。専用の接続の1つの読み取りトランザクションで読むため、
+        途中で他のセッションが書き込んでも結果が混ざらず、書き込みも待たせない"""
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("BEGIN")
+            for section in RECORD_SECTIONS:
+                if section not in sections:
+                    continue
+                if section == "projects":
+                    rows = conn.execute("SELECT data FROM projects ORDER BY rowid")
+                    records = (json.loads(data) for (data,) in rows)
+                elif section == "tasks":
+                    rows = conn.execute("SELECT project_id, position, data FROM tasks ORDER BY project_id, position")
+                    records = ({"project_id": project_id, "position": position, "task": json.loads(data)} for project_id, position, data in rows)
+                elif section == "evaluations":
+                    rows = conn.execute("SELECT data FROM evaluations ORDER BY rowid")
+                    records = (json.loads(data) for (data,) in rows)
+                else:
+                    rows = conn.execute("SELECT data FROM assets WHERE kind = ? ORDER BY rowid", (_ASSET_SECTIONS[section],))
+                    records = (json.loads(data) for (data,) in rows)
+                for record in records:
+                    yield section, record
+        finally:
+            conn.close()
+
+    def import_records(self, records):
+        """export_records の形式の (セクション, レコード) を書き込み、セクションごとの件数を返す。同じIDは上書きする"""
+        counts = {}
+        task_projects = set()
+        with self._write() as conn:
+            for section, record in records:
+                if section == "projects":
+                    self._insert_project(conn, {k: v for k, v in record.items() if k not in ("tasks", "task_version")})
+                elif section == "tasks":
+                    self._upsert_task(conn, record["project_id"], record["position"], record["task"])
+                    task_projects.add(record["project_id"])
+                elif section == "evaluations":
+                    self._insert_evaluation(conn, record)
+                elif section in _ASSET_SECTIONS:
+                    self._insert_asset(conn, _ASSET_SECTIONS[section], record)
+                else:
+                    continue
+                counts[section] = counts.get(section, 0) + 1
+            for project_id in task_projects:
+                self._bump_task_version(conn, {"id": project_id})
+            # 締切インデックスは差分で直さず、次に使うときに作り直す
+            self._deadlines = None
+        return counts
+
+    # --- チームメンバー ---
+    def add_team_member(self, name):
+        with self._write() as conn:
+            conn.execute("INSERT OR IGNORE INTO team_members VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM team_members))", (name,))
+
+    def remove_team_member(self, name):
+        with self._write() as conn:
+            conn.execute("DELETE FROM team_members WHERE name = ?", (name,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = StudioStore(DB_PATH)
+        return _store
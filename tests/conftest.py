@@ -0,0 +1,9 @@
+# テストはリポジトリ直下のモジュールを読み込み、保存先は一時ディレクトリにする（実データを書き換えない）
+import os
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="manga_pro_test_")
+os.environ.setdefault("MANGA_PRO_DATA_DIR", os.path.join(_TMP, "data"))
+os.environ.setdefault("MANGA_PRO_CACHE_DIR", os.path.join(_TMP, "cache"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
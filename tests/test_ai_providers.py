@@ -0,0 +1,36 @@
+import pytest
+
+import ai_providers
+
+
+def test_mock_forgets_inputs_after_success():
+    mock = ai_providers.MockProvider(latency=0, latency_per_image=0)
+    first = mock.generate("mock-editor", "プロンプト", [], {})
+    for i in range(50):
+        mock.generate("mock-editor", f"プロンプト {i}", [], {})
+    assert not mock._attempts
+    # 成功した入力は次の呼び出しでも同じ応答になる
+    assert mock.generate("mock-editor", "プロンプト", [], {}) == first
+
+
+def test_mock_bounds_failing_inputs(monkeypatch):
+    monkeypatch.setattr(ai_providers, "MOCK_TRACKED_ATTEMPTS", 8)
+    mock = ai_providers.MockProvider(latency=0, latency_per_image=0, failure_rate=1.0)
+    for i in range(20):
+        with pytest.raises(ai_providers.MockServiceError):
+            mock.generate("mock-editor", f"プロンプト {i}", [], {})
+    assert len(mock._attempts) == 8
+
+
+def test_mock_retry_sequence_is_deterministic():
+    def outcomes(seed):
+        mock = ai_providers.MockProvider(latency=0, latency_per_image=0, failure_rate=0.5, seed=seed)
+        results = []
+        for _ in range(6):
+            try:
+                results.append(mock.generate("mock-editor", "同じ入力", [], {}))
+            except ai_providers.MockServiceError as e:
+                results.append(e.status_code)
+        return results
+
+    assert outcomes(3) == outcomes(3)
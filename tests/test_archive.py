@@ -0,0 +1,77 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+import archive
+import page_store
+import storage
+
+
+def use_store(monkeypatch, tmp_path, name):
+    store = storage.StudioStore(str(tmp_path / f"{name}.db"))
+    monkeypatch.setattr(storage, "get_store", lambda: store)
+    monkeypatch.setattr(page_store, "PAGE_STORE_DIR", str(tmp_path / f"{name}_pages"))
+    return store
+
+
+def fill(store):
+    project = {"title": "テスト企画", "created_at": "2026-10-19 10:00", "deadline": "2026-12-01", "tasks": [
+        {"id": storage.new_id(), "task_name": name, "assignee": "作画", "status": "未着手", "end_date": "2026-11-01"} for name in ("ネーム", "作画")
+    ]}
+    store.save_project(project)
+    store.add_asset("idea", {"title": "探偵", "content": "記憶を失った探偵の物語", "created_at": "2026-10-19"})
+    store.add_asset("character", {"name": "カラス", "details": "言葉を話す", "created_at": "2026-10-19"})
+    page_id = page_store.put_page(b"\x89PNG fake page")
+    store.save_evaluation({"timestamp": "2026-10-19 10:00:00", "type": "ページ別評価", "page_ids": [page_id],
+                           "page_results": [{"page_number": 1, "result": "良い", "scores": {"構図": 4}}], "project_id": project["id"]})
+    return page_id
+
+
+def exported(store):
+    return [(section, json.dumps(record, ensure_ascii=False, sort_keys=True)) for section, record in store.export_records()]
+
+
+def test_write_read_round_trip(monkeypatch, tmp_path):
+    source = use_store(monkeypatch, tmp_path, "source")
+    page_id = fill(source)
+    buffer = io.BytesIO()
+    manifest = archive.write_archive(buffer)
+    assert manifest["counts"] == {"projects": 1, "tasks": 2, "characters": 1, "world_settings": 0, "idea_bank": 1, "evaluations": 1}
+    assert manifest["pages"] == 1
+
+    target = use_store(monkeypatch, tmp_path, "target")
+    assert not page_store.has_page(page_id)
+    buffer.seek(0)
+    counts, pages = archive.read_archive(buffer)
+    assert counts == {section: count for section, count in manifest["counts"].items() if count}
+    assert pages == 1 and page_store.get_page_bytes(page_id) == b"\x89PNG fake page"
+    assert exported(target) == exported(source)
+    # 読み込んだデータは検索・点数・締切にも反映される
+    assert target.search("探偵")[0]["title"] == "探偵"
+    assert len(target.load_scores(None)) == 1
+    assert target.deadlines().count() == 2
+
+
+def test_selected_sections_without_pages(monkeypatch, tmp_path):
+    fill(use_store(monkeypatch, tmp_path, "source"))
+    buffer = io.BytesIO()
+    manifest = archive.write_archive(buffer, sections=["idea_bank"], include_pages=False)
+    assert manifest["counts"] == {"idea_bank": 1} and manifest["pages"] == 0
+    with zipfile.ZipFile(buffer) as zf:
+        assert sorted(zf.namelist()) == sorted([archive.MANIFEST_NAME, "idea_bank.ndjson"])
+
+
+def test_rejects_newer_format_and_tampered_pages(monkeypatch, tmp_path):
+    use_store(monkeypatch, tmp_path, "target")
+    newer = io.BytesIO()
+    with zipfile.ZipFile(newer, "w") as zf:
+        zf.writestr(archive.MANIFEST_NAME, json.dumps({"format_version": archive.FORMAT_VERSION + 1}))
+    with pytest.raises(archive.ArchiveError):
+        archive.read_archive(newer)
+    tampered = io.BytesIO()
+    with zipfile.ZipFile(tampered, "w") as zf:
+        zf.writestr(archive.PAGES_DIR + "0" * 64, b"not the page")
+    with pytest.raises(archive.ArchiveError):
+        archive.read_archive(tampered)
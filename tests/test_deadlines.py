@@ -0,0 +1,71 @@
+import random
+from datetime import date, timedelta
+
+from deadlines import DeadlineIndex
+
+TODAY = date(2026, 10, 19)
+STATUSES = ["未着手", "進行中", "レビュー中", "完了"]
+
+
+def random_task(rng, task_id):
+    end_date = TODAY + timedelta(days=rng.randint(-10, 30))
+    return {
+        "id": task_id, "task_name": task_id, "assignee": rng.choice(["原作", "作画"]),
+        "status": rng.choice(STATUSES), "end_date": rng.choice([end_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"), None, "不明"]),
+    }
+
+
+def snapshot(index, project_id=None):
+    return (
+        [t["task_id"] for t in index.overdue(TODAY, project_id)],
+        [t["task_id"] for t in index.due_within(7, TODAY, project_id)],
+        [t["task_id"] for t in index.next_deadlines(5, TODAY, project_id)],
+        index.count_due_within(7, TODAY, project_id),
+    )
+
+
+def test_incremental_updates_match_full_rebuild():
+    rng = random.Random(7)
+    tasks = {}
+    index = DeadlineIndex.from_tasks([])
+    for step in range(400):
+        action = rng.random()
+        if action < 0.6 or not tasks:
+            task_id = f"t{rng.randint(0, 60)}"
+            project_id = rng.choice(["p1", "p2"])
+            tasks[task_id] = (project_id, random_task(rng, task_id))
+            index.upsert(project_id, tasks[task_id][1])
+        elif action < 0.85:
+            task_id = rng.choice(sorted(tasks))
+            del tasks[task_id]
+            index.remove(task_id)
+        else:
+            project_id = rng.choice(["p1", "p2"])
+            project_tasks = [random_task(rng, f"{project_id}-{i}") for i in range(rng.randint(0, 5))]
+            tasks = {task_id: row for task_id, row in tasks.items() if row[0] != project_id}
+            tasks.update({task["id"]: (project_id, task) for task in project_tasks})
+            index.replace_project(project_id, project_tasks)
+        rebuilt = DeadlineIndex.from_tasks(tasks.values())
+        for project_id in (None, "p1", "p2"):
+            assert snapshot(index, project_id) == snapshot(rebuilt, project_id), step
+
+
+def test_done_and_undated_tasks_are_not_indexed():
+    index = DeadlineIndex.from_tasks([
+        ("p", {"id": "a", "status": "完了", "end_date": "2026-10-20"}),
+        ("p", {"id": "b", "status": "未着手", "end_date": None}),
+        ("p", {"id": "c", "status": "未着手", "end_date": "2026-10-20"}),
+    ])
+    assert [t["task_id"] for t in index.next_deadlines(5, TODAY)] == ["c"]
+    index.upsert("p", {"id": "c", "status": "完了", "end_date": "2026-10-20"})
+    assert index.count() == 0
+
+
+def test_due_within_includes_the_last_day():
+    index = DeadlineIndex.from_tasks([
+        ("p", {"id": "a", "status": "未着手", "end_date": "2026-10-26"}),
+        ("p", {"id": "b", "status": "未着手", "end_date": "2026-10-27"}),
+        ("p", {"id": "c", "status": "未着手", "end_date": "2026-10-18"}),
+    ])
+    assert [t["task_id"] for t in index.due_within(7, TODAY)] == ["a"]
+    assert [t["task_id"] for t in index.overdue(TODAY)] == ["c"]
@@ -0,0 +1,28 @@
+import evaluation
+
+
+def previous_record(pages):
+    return {
+        "id": "prev", "page_ids": [f"p{i}" for i in range(pages)],
+        "page_results": [{"page_number": i + 1, "page_info": f"P.{i + 1}", "result": f"r{i}"} for i in range(pages)],
+    }
+
+
+def test_reuses_only_unchanged_pages_by_default():
+    diffs = [
+        {"status": "unchanged", "previous_index": 0}, {"status": "similar", "previous_index": 1},
+        {"status": "changed", "previous_index": 2}, {"status": "new", "previous_index": None},
+    ]
+    infos = [f"P.{i + 1}" for i in range(4)]
+    reused = evaluation.reused_page_results(previous_record(3), diffs, range(4), infos)
+    assert list(reused) == [0]
+    assert reused[0]["reused_match"] == "unchanged"
+    reused = evaluation.reused_page_results(previous_record(3), diffs, range(4), infos, include_similar=True)
+    assert sorted(reused) == [0, 1]
+    assert reused[1]["result"] == "r1" and reused[1]["reused_match"] == "similar"
+
+
+def test_reused_result_takes_new_page_number():
+    diffs = [{"status": "new", "previous_index": None}, {"status": "unchanged", "previous_index": 0}]
+    reused = evaluation.reused_page_results(previous_record(1), diffs, [1], ["表紙", "P.2"])
+    assert reused[1]["page_number"] == 2 and reused[1]["page_info"] == "P.2" and reused[1]["reused_from"] == "prev"
@@ -0,0 +1,51 @@
+import threading
+import time
+
+import jobs
+
+
+def wait_for(queue, session_id, status):
+    for _ in range(100):
+        job_list = queue.list_jobs(session_id)
+        if job_list and job_list[0]["status"] == status:
+            return job_list[0]
+        time.sleep(0.02)
+    raise AssertionError(f"{status} になりませんでした: {queue.list_jobs(session_id)}")
+
+
+def test_second_queue_keeps_running_jobs_of_live_owner(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first = jobs.JobQueue(path)
+    release = threading.Event()
+    first.submit("t", "長いジョブ", lambda job: release.wait(5), session_id="s1")
+    wait_for(first, "s1", "running")
+    # 別のプロセス（ベンチマークなど）が同じDBでキューを作っても、実行中のジョブは失敗にならない
+    second = jobs.JobQueue(path)
+    assert second.list_jobs("s1")[0]["status"] == "running"
+    release.set()
+    wait_for(first, "s1", "done")
+
+
+def test_jobs_of_dead_owner_are_failed(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first = jobs.JobQueue(path)
+    release = threading.Event()
+    first.submit("t", "中断されるジョブ", lambda job: release.wait(5), session_id="s1")
+    wait_for(first, "s1", "running")
+    # heartbeat の途絶えた別のオーナーのジョブにする
+    with first._lock:
+        first._conn.execute("UPDATE jobs SET owner = 'dead', heartbeat = ?", (time.time() - jobs.STALE_SECONDS - 1,))
+        first._conn.commit()
+    second = jobs.JobQueue(path)
+    assert second.list_jobs("s1")[0]["status"] == "failed"
+    release.set()
+
+
+def test_list_jobs_only_shows_own_session(tmp_path):
+    queue = jobs.JobQueue(str(tmp_path / "jobs.db"))
+    queue.submit("t", "A", lambda job: None, session_id="s1")
+    queue.submit("t", "B", lambda job: None, session_id="s2")
+    wait_for(queue, "s1", "done")
+    assert [j["title"] for j in queue.list_jobs("s1")] == ["A"]
+    assert [j["title"] for j in queue.list_jobs("s2")] == ["B"]
+    assert not queue.has_active("s1")
@@ -0,0 +1,42 @@
+import glob
+import os
+import tempfile
+
+import pytest
+
+import page_raster
+
+fitz = pytest.importorskip("fitz")
+
+
+def make_pdf(pages):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page(width=200, height=280).insert_text((40, 60), f"page {i + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def leftover_pdfs():
+    return glob.glob(os.path.join(tempfile.gettempdir(), "manga_pro_*.pdf"))
+
+
+@pytest.mark.parametrize("pages", [2, page_raster.INLINE_RENDER_PAGES + 2])
+def test_rasterize_removes_temporary_pdf(pages, monkeypatch):
+    before = set(leftover_pdfs())
+    pdf = make_pdf(pages)
+    first = list(page_raster.rasterize_pdf(pdf, scale=0.5))
+    assert [page for page, _ in first] == list(range(pages))
+    assert set(leftover_pdfs()) == before
+    # すべて描画済みなら一時ファイルも作らない
+    monkeypatch.setattr(tempfile, "mkstemp", lambda **kwargs: pytest.fail("描画済みのPDFを書き出しました"))
+    assert list(page_raster.rasterize_pdf(pdf, scale=0.5)) == first
+
+
+def test_abandoned_iteration_removes_temporary_pdf():
+    before = set(leftover_pdfs())
+    pages = page_raster.rasterize_pdf(make_pdf(page_raster.INLINE_RENDER_PAGES + 3), scale=0.4)
+    next(pages)
+    pages.close()
+    assert set(leftover_pdfs()) == before
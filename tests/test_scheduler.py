@@ -0,0 +1,102 @@
+import pytest
+
+import scheduler
+
+
+def make_task(task_id, assignee, duration, depends_on=(), **extra):
+    return {"id": task_id, "task_name": task_id, "assignee": assignee, "duration": duration, "depends_on": list(depends_on), "status": "未着手", **extra}
+
+
+def dates(sched):
+    return {task_id: (task["start_date"], task["end_date"]) for task_id, task in sched.tasks.items()}
+
+
+def fresh_dates(tasks, **kwargs):
+    # 同じタスクから組み直した結果（差分更新の正解）
+    copied = [dict(task, depends_on=list(task["depends_on"])) for task in tasks]
+    sched = scheduler.Scheduler(copied, **kwargs)
+    sched.reschedule()
+    return dates(sched)
+
+
+def test_same_assignee_tasks_do_not_overlap():
+    tasks = [make_task("A", "作画", 3), make_task("B", "作画", 2), make_task("C", "原作", 4)]
+    sched = scheduler.Scheduler(tasks, project_start="2026-10-19")
+    sched.reschedule()
+    first, second = sorted(("A", "B"), key=sched.es.get)
+    assert sched.es[second] >= sched.ef[first]
+    assert sched.tasks["C"]["start_date"] == "2026-10-19"
+
+
+def test_dependencies_start_after_predecessor():
+    tasks = [make_task("A", "原作", 3), make_task("B", "作画", 2, ["A"])]
+    sched = scheduler.Scheduler(tasks, project_start="2026-10-19")
+    sched.reschedule()
+    assert sched.tasks["B"]["start_date"] == "2026-10-22"
+    assert sched.critical_path() == ["A", "B"]
+
+
+def test_shortening_blocking_task_pulls_follower_back():
+    tasks = [make_task("Y", "作画", 5), make_task("X", "作画", 2)]
+    sched = scheduler.Scheduler(tasks, project_start="2026-10-19")
+    sched.reschedule()
+    assert sched.tasks["X"]["start_date"] == "2026-10-24"
+    sched.tasks["Y"]["duration"] = 1
+    assert sched.update("Y") == {"Y", "X"}
+    assert sched.tasks["X"]["start_date"] == "2026-10-20"
+    # 平準化で後ろにずれた日付が保存されていても、組み直せば前に戻る
+    assert fresh_dates(tasks, project_start="2026-10-19")["X"][0] <= "2026-10-20"
+
+
+def test_removing_blocking_task_pulls_follower_back():
+    tasks = [make_task("Y", "作画", 5), make_task("X", "作画", 2)]
+    sched = scheduler.Scheduler(tasks, project_start="2026-10-19")
+    sched.reschedule()
+    assert "X" in sched.remove_task("Y")
+    assert sched.tasks["X"]["start_date"] == "2026-10-19"
+
+
+def test_not_before_is_kept():
+    tasks = [make_task("A", "作画", 2, not_before="2026-11-01")]
+    sched = scheduler.Scheduler(tasks, project_start="2026-10-19")
+    sched.reschedule()
+    assert sched.tasks["A"]["start_date"] == "2026-11-01"
+
+
+def test_pinned_task_keeps_recorded_start():
+    tasks = [make_task("A", "作画", 2, status="進行中", start_date="2026-10-25")]
+    sched = scheduler.Scheduler(tasks, project_start="2026-10-19")
+    sched.reschedule()
+    assert sched.tasks["A"]["start_date"] == "2026-10-25"
+
+
+def test_update_matches_full_reschedule():
+    tasks = [
+        make_task("A", "原作", 3), make_task("B", "作画", 4, ["A"]), make_task("C", "作画", 2, ["A"]),
+        make_task("D", "仕上げ", 2, ["B", "C"]), make_task("E", "原作", 1),
+    ]
+    sched = scheduler.Scheduler(tasks, project_start="2026-10-19", deadline="2026-11-30")
+    sched.reschedule()
+    sched.tasks["A"]["duration"] = 6
+    sched.update("A")
+    assert dates(sched) == fresh_dates(tasks, project_start="2026-10-19", deadline="2026-11-30")
+
+
+def test_add_task_after_remove_gets_unique_rank():
+    tasks = [make_task("A", "作画", 1), make_task("B", "作画", 1), make_task("C", "作画", 1)]
+    sched = scheduler.Scheduler(tasks, project_start="2026-10-19")
+    sched.reschedule()
+    sched.remove_task("A")
+    sched.add_task(make_task("D", "作画", 1))
+    assert len(set(sched.rank.values())) == len(sched.tasks)
+    sched.tasks["B"]["duration"] = 2
+    sched.update("B")
+
+
+def test_cycle_is_rejected():
+    tasks = [make_task("A", "原作", 1), make_task("B", "作画", 1, ["A"])]
+    sched = scheduler.Scheduler(tasks, project_start="2026-10-19")
+    assert sched.would_cycle("A", ["B"])
+    sched.tasks["A"]["depends_on"] = ["B"]
+    with pytest.raises(scheduler.ScheduleError):
+        sched.update("A")
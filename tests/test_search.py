@@ -0,0 +1,34 @@
+import search
+import storage
+
+
+def test_index_text_and_match_expression():
+    assert search.index_text("探偵ＡＢ") == "探偵 偵a ab b"
+    assert search.match_expression("サイバー 探") == '"サイ イバ バー" AND "探"*'
+    assert search.match_expression("  !? ") is None
+
+
+def test_snippet_marks_matches_and_escapes_markdown():
+    text = "前置き" * 30 + "記憶を失った*探偵*が街を歩く"
+    snippet = search.snippet(text, "探偵")
+    assert snippet.startswith("…") and "**探偵**" in snippet and "\\*" in snippet
+    assert search.snippet("関係ない本文", "探偵") is None
+
+
+def test_store_search_follows_writes(tmp_path):
+    store = storage.StudioStore(str(tmp_path / "studio.db"))
+    idea = {"title": "サイバー探偵", "content": "記憶を失った探偵の物語", "created_at": "2026-10-19"}
+    world = {"name": "港町", "content": "探偵事務所が並ぶ港町", "created_at": "2026-10-19"}
+    store.add_asset("idea", idea)
+    store.add_asset("world", world)
+    assert {hit["doc_id"] for hit in store.search("探偵")} == {idea["id"], world["id"]}
+    # タイトルの一致が上に来る
+    assert store.search("探偵")[0]["doc_id"] == idea["id"]
+    assert [hit["doc_id"] for hit in store.search("探偵", kind="world")] == [world["id"]]
+    idea["content"] = "海辺の日常"
+    idea["title"] = "和菓子屋"
+    store.add_asset("idea", idea)
+    assert [hit["doc_id"] for hit in store.search("探偵")] == [world["id"]]
+    store.delete_asset(world)
+    assert store.search("探偵") == []
+    assert store.search("和菓子")[0]["doc_id"] == idea["id"]
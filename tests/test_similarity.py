@@ -0,0 +1,59 @@
+import numpy as np
+
+import similarity
+import storage
+
+BASE = "記憶を失った探偵が、サイバーパンクの街で自分の過去を追う。相棒は言葉を話すカラス。"
+
+
+def test_identical_and_unrelated_texts():
+    sig = similarity.signature(BASE)
+    assert sig.dtype == np.uint32 and sig.shape == (similarity.NUM_PERM,)
+    index = similarity.SimilarityIndex()
+    index.add("same", similarity.signature(BASE))
+    index.add("other", similarity.signature("海辺の町で和菓子屋を継いだ姉妹の、四季を通じた日常コメディ。"))
+    assert index.near_duplicates(sig) == [("same", 1.0)]
+    assert [item_id for item_id, _ in index.most_similar(sig)] == ["same"]
+
+
+def test_small_edit_is_near_duplicate():
+    edited = BASE.replace("カラス", "黒猫")
+    estimate = float((similarity.signature(BASE) == similarity.signature(edited)).mean())
+    assert estimate >= similarity.DUPLICATE_THRESHOLD
+
+
+def test_texts_without_shingles_never_match():
+    for text in ("", "あ", "ab", "!?"):
+        assert similarity.signature(text) is None
+    index = similarity.SimilarityIndex()
+    index.add("idea", similarity.signature(BASE))
+    assert index.most_similar(similarity.signature("")) == []
+    assert index.near_duplicates(None) == []
+
+
+def test_remove_and_exclude():
+    index = similarity.SimilarityIndex()
+    for i in range(20):
+        index.add(f"i{i}", similarity.signature(f"{BASE} 第{i}話"))
+    index.remove("i3")
+    index.remove("i19")
+    assert len(index) == 18
+    found = [item_id for item_id, _ in index.most_similar(similarity.signature(f"{BASE} 第5話"), limit=20, exclude="i5")]
+    assert "i5" not in found and "i3" not in found and "i19" not in found
+    assert len(found) == 17
+
+
+def test_signatures_round_trip_through_bytes():
+    rows = [(f"i{i}", similarity.to_bytes(similarity.signature(f"{BASE} {i}"))) for i in range(3)]
+    index = similarity.SimilarityIndex.from_signatures(rows)
+    assert np.array_equal(similarity.from_bytes(rows[1][1]), similarity.signature(f"{BASE} 1"))
+    assert index.most_similar(similarity.signature(f"{BASE} 1"), limit=1)[0] == ("i1", 1.0)
+
+
+def test_store_skips_short_ideas(tmp_path):
+    store = storage.StudioStore(str(tmp_path / "studio.db"))
+    for content in ("", "短", BASE):
+        store.add_asset("idea", {"title": "t", "content": content, "created_at": "2026-10-19"})
+    index = store.similar_ideas()
+    assert len(index) == 1
+    assert index.near_duplicates(similarity.signature("")) == []
@@ -0,0 +1,43 @@
+import storage
+
+
+def make_store(tmp_path):
+    return storage.StudioStore(str(tmp_path / "studio.db"))
+
+
+def make_project(task_names):
+    tasks = [{"id": storage.new_id(), "task_name": name, "assignee": "作画", "status": "未着手"} for name in task_names]
+    return {"title": "テスト", "created_at": "2026-10-19 10:00", "tasks": tasks}
+
+
+def loaded_task_names(store):
+    studio_data, _ = store.load_all()
+    return [task["task_name"] for task in studio_data["projects"][0]["tasks"]]
+
+
+def test_task_order_survives_delete_and_save(tmp_path):
+    store = make_store(tmp_path)
+    project = make_project(["A", "B", "C", "D", "E"])
+    store.save_project(project)
+    removed = project["tasks"][1]
+    project["tasks"].remove(removed)
+    store.delete_task(project, removed)
+    # 削除の後に後ろのタスクを1件ずつ保存しても並び順が重ならない
+    store.save_task(project, project["tasks"][2])
+    store.save_tasks(project, [project["tasks"][1]])
+    assert loaded_task_names(store) == ["A", "C", "D", "E"]
+    positions = [position for (position,) in store._conn.execute("SELECT position FROM tasks ORDER BY position")]
+    assert positions == [0, 1, 2, 3]
+    added = {"id": storage.new_id(), "task_name": "F", "assignee": "作画", "status": "未着手"}
+    project["tasks"].append(added)
+    store.save_task(project, added)
+    assert loaded_task_names(store) == ["A", "C", "D", "E", "F"]
+
+
+def test_revision_advances_on_each_write(tmp_path):
+    store = make_store(tmp_path)
+    calls = []
+    store.on_write = lambda before, after: calls.append((before, after))
+    revision = store.revision()
+    store.add_team_member("新人")
+    assert store.revision() == revision + 1 and calls == [(revision, revision + 1)]
@@ -0,0 +1,45 @@
+import pandas as pd
+
+import workload
+
+ROWS = [
+    ("p1", "作画", "2026-10-19", "2026-10-22", "進行中"),
+    ("p1", "作画", "2026-10-20", "2026-10-21", "未着手"),
+    ("p2", None, "2026-10-21", "2026-10-21", "未着手"),
+    ("p2", "原作", "不明", "2026-10-25", "未着手"),
+]
+
+
+def naive_daily_load(frame):
+    # 日ごと・タスクごとに数えた正解
+    days = pd.date_range(frame["start"].min(), frame["end"].max() - pd.Timedelta(days=1), freq="D")
+    return {
+        (day, assignee): int(((frame["assignee"] == assignee) & (frame["start"] <= day) & (frame["end"] > day)).sum())
+        for day in days for assignee in frame["assignee"].unique()
+    }
+
+
+def test_task_frame_drops_unreadable_dates_and_fills_assignee():
+    frame = workload.task_frame(ROWS)
+    assert len(frame) == 3
+    assert workload.UNASSIGNED in set(frame["assignee"])
+    # 開始日と同じ終了日は1日の作業として扱う
+    unassigned = frame[frame["assignee"] == workload.UNASSIGNED].iloc[0]
+    assert unassigned["end"] - unassigned["start"] == pd.Timedelta(days=1)
+
+
+def test_daily_load_matches_naive_count():
+    frame = workload.task_frame(ROWS)
+    daily = workload.daily_load(frame)
+    expected = naive_daily_load(frame)
+    assert {(day, assignee): int(daily.loc[day, assignee]) for day, assignee in expected} == expected
+    assert daily.loc["2026-10-20", "作画"] == 2
+
+
+def test_daily_load_clips_to_range_and_utilization():
+    frame = workload.task_frame(ROWS)
+    daily = workload.daily_load(frame, start="2026-10-20", end="2026-10-22")
+    assert list(daily.index) == list(pd.date_range("2026-10-20", periods=2, freq="D"))
+    weekly = workload.utilization(daily, "週", capacity=2.0)
+    assert weekly.loc["2026-10-19", "作画"] == 0.75
+    assert workload.daily_load(workload.task_frame([])).empty
@@ -0,0 +1,56 @@
+# --- 作業負荷の集計 ---
+# 全プロジェクトのタスクを1つの DataFrame (task_frame) にまとめ、担当者 × 日 の同時担当タスク数を
+# 差分配列の累積和でまとめて求める（タスクごと・日ごとのループをしない）。
+# 期間ごと（日/週/月）の稼働率に直して、1日あたりの対応可能タスク数を超える割り当てを見つける。
+
+import numpy as np
+import pandas as pd
+
+TASK_COLUMNS = ["project_id", "assignee", "start_date", "end_date", "status"]
+UNASSIGNED = "未割当"
+BUCKETS = {"日": "D", "週": "W-MON", "月": "MS"}
+
+
+def task_frame(rows):
+    """storage の (project_id, assignee, start_date, end_date, status) の行から作業期間の DataFrame を作る"""
+    frame = pd.DataFrame(rows, columns=TASK_COLUMNS)
+    frame["assignee"] = frame["assignee"].fillna(UNASSIGNED)
+    frame["start"] = pd.to_datetime(frame["start_date"], format="%Y-%m-%d", errors="coerce")
+    frame["end"] = pd.to_datetime(frame["end_date"], format="%Y-%m-%d", errors="coerce")
+    frame = frame.dropna(subset=["start", "end"])
+    # 終了日は「開始日 + 期間」で保存しているため [start, end) を作業日とする。同日・逆転は1日扱い
+    frame["end"] = frame["end"].where(frame["end"] > frame["start"], frame["start"] + pd.Timedelta(days=1))
+    return frame.reset_index(drop=True)
+
+
+def daily_load(frame, start=None, end=None):
+    """index が日付、列が担当者の DataFrame。値はその日に担当している（期間中の）タスク数"""
+    if frame.empty:
+        return pd.DataFrame()
+    origin = pd.Timestamp(start) if start is not None else frame["start"].min()
+    last = pd.Timestamp(end) if end is not None else frame["end"].max()
+    days = (last - origin).days
+    if days <= 0:
+        return pd.DataFrame()
+    codes, assignees = pd.factorize(frame["assignee"])
+    # 期間外にはみ出す部分は切り落とす（開始と終了が同じ位置になったタスクは数に入らない）
+    starts = (frame["start"] - origin).dt.days.clip(0, days).to_numpy()
+    ends = (frame["end"] - origin).dt.days.clip(0, days).to_numpy()
+    diff = np.zeros((len(assignees), days + 1), dtype=np.int32)
+    np.add.at(diff, (codes, starts), 1)
+    np.add.at(diff, (codes, ends), -1)
+    load = np.cumsum(diff, axis=1)[:, :days]
+    return pd.DataFrame(load.T, index=pd.date_range(origin, periods=days, freq="D"), columns=assignees)
+
+
+def utilization(daily, bucket="週", capacity=1.0):
+    """期間ごとの平均同時タスク数を capacity（1日あたりの対応可能タスク数）で割った稼働率。1 を超えると過剰割り当て"""
+    if daily.empty:
+        return daily
+    # 週は月曜始まりとし、各期間は開始日のラベルで表す
+    return daily.resample(BUCKETS[bucket], label="left", closed="left").mean() / capacity
+
+
+def status_counts(frame):
+    """担当者 × ステータスのタスク数"""
+    return frame.groupby(["assignee", "status"]).size().unstack(fill_value=0)